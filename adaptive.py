@@ -0,0 +1,178 @@
+# adaptive.py - Trump Watcher
+# Adaptive poll interval driven by a learned hour-of-week posting-rate model
+
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+HOURS_PER_WEEK = 7 * 24
+DEFAULT_HALF_LIFE = 28 * 24 * 3600    # older posts count half as much after four weeks
+DEFAULT_BURST_WINDOW = 15 * 60        # poll at the minimum interval this long after a detection
+MIN_OBSERVATIONS = 20                 # below this the model is too cold to trust
+
+
+def parse_timestamp(value) -> datetime:
+    # ISO-8601 post timestamp -> aware local datetime; falls back to now
+    if value:
+        try:
+            return datetime.fromisoformat(str(value).replace("Z", "+00:00")).astimezone()
+        except ValueError:
+            pass
+    return datetime.now().astimezone()
+
+
+def hour_of_week(when: datetime) -> int:
+    return when.weekday() * 24 + when.hour
+
+
+class PostingRateModel:
+    """
+    Online histogram of post arrivals by (weekday, hour) in local time.
+    Counts decay exponentially with DEFAULT_HALF_LIFE so the model follows
+    changes in posting habits. Persisted as a small JSON file.
+    """
+
+    def __init__(self, path: str = None, half_life: float = DEFAULT_HALF_LIFE):
+        self.path = path
+        self.half_life = half_life
+        self.counts = [0.0] * HOURS_PER_WEEK
+        self.observations = 0
+        self.updated = time.time()
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            counts = data.get("counts") or []
+            if len(counts) == HOURS_PER_WEEK:
+                self.counts = [float(c) for c in counts]
+                self.observations = int(data.get("observations", 0))
+                self.updated = float(data.get("updated", time.time()))
+        except (OSError, ValueError) as e:
+            log.warning("Posting-rate model not loaded (%s); starting fresh.", e)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = {"counts": self.counts, "observations": self.observations, "updated": self.updated}
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log.warning("Failed to save posting-rate model: %s", e)
+
+    def _decay(self, now: float) -> None:
+        factor = 0.5 ** ((now - self.updated) / self.half_life)
+        if factor < 0.999:
+            self.counts = [c * factor for c in self.counts]
+            self.updated = now
+
+    def record_post(self, timestamp=None) -> None:
+        when = parse_timestamp(timestamp)
+        with self._lock:
+            self._decay(time.time())
+            self.counts[hour_of_week(when)] += 1.0
+            self.observations += 1
+
+    def activity(self, when: datetime = None) -> float:
+        """
+        Relative posting rate for the hour containing `when`: 1.0 is the
+        weekly average, 0.0 means never seen a post in that hour. The
+        neighbouring hours are blended in so one-off posts don't dominate.
+        Returns 1.0 while the model is still cold.
+        """
+        when = when or datetime.now().astimezone()
+        with self._lock:
+            total = sum(self.counts)
+            if self.observations < MIN_OBSERVATIONS or total <= 0:
+                return 1.0
+            h = hour_of_week(when)
+            smoothed = (0.25 * self.counts[(h - 1) % HOURS_PER_WEEK]
+                        + 0.5 * self.counts[h]
+                        + 0.25 * self.counts[(h + 1) % HOURS_PER_WEEK])
+            return smoothed / (total / HOURS_PER_WEEK)
+
+    def share(self, when: datetime = None) -> float:
+        # Fraction of weekly posts expected in this hour (uniform while cold)
+        return self.activity(when) / HOURS_PER_WEEK
+
+
+class AdaptiveInterval:
+    """
+    Chooses the next poll interval: min_interval during a burst (right
+    after a detection), otherwise base_interval scaled down in historically
+    busy hours and up in quiet ones, clamped to [min_interval, max_interval].
+
+    Also tracks what that trade-off costs: the effective poll rate and the
+    expected detection delay (half the interval, weighted by how likely a
+    post is at the time each interval was chosen).
+    """
+
+    def __init__(self, model: PostingRateModel, base_interval: float,
+                 min_interval: float, max_interval: float,
+                 burst_window: float = DEFAULT_BURST_WINDOW):
+        self.model = model
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.burst_window = burst_window
+        self.last_detection = 0.0
+        self.started = time.time()
+        self.polls = 0
+        self._weighted_delay = 0.0
+        self._weight = 0.0
+
+    def on_detection(self, timestamp=None) -> None:
+        self.last_detection = time.time()
+        self.model.record_post(timestamp)
+
+    def next_interval(self) -> float:
+        now = datetime.now().astimezone()
+        if time.time() - self.last_detection < self.burst_window:
+            interval = self.min_interval
+        else:
+            activity = self.model.activity(now)
+            if activity <= 0:
+                interval = self.max_interval
+            else:
+                # sqrt keeps a 4x busier hour from quartering the interval
+                interval = self.base_interval / math.sqrt(activity)
+            interval = min(self.max_interval, max(self.min_interval, interval))
+
+        share = self.model.share(now)
+        self.polls += 1
+        self._weighted_delay += share * interval / 2
+        self._weight += share
+        return interval
+
+    def effective_poll_rate(self) -> float:
+        # Polls per hour since start
+        hours = max((time.time() - self.started) / 3600, 1 / 3600)
+        return self.polls / hours
+
+    def estimated_detection_delay(self) -> float:
+        # Seconds from post to detection, expected over the posting-rate model
+        return self._weighted_delay / self._weight if self._weight else self.base_interval / 2
+
+    def summary(self) -> str:
+        fixed_rate = 3600 / self.base_interval
+        return (f"adaptive polling: {self.effective_poll_rate():.1f} polls/h "
+                f"(fixed {fixed_rate:.0f}/h), est. detection delay "
+                f"{self.estimated_detection_delay():.1f}s (fixed {self.base_interval / 2:.1f}s)")
@@ -0,0 +1,370 @@
+# archive.py - Trump Watcher
+# Local post archive: SQLite + FTS5 full-text index, streaming ingest, history backfill and search
+#
+#   python archive.py search "tariffs"                 # newest matches first
+#   python archive.py search "border NEAR wall" --rank # best matches first (FTS5 query syntax)
+#   python archive.py backfill --max-pages=100         # page back through the account's history
+#   python archive.py stats
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from extraction import post_raw_text, normalize, hash_post
+from truth_api import DEFAULT_ACCOUNT, TruthApiClient, status_to_post
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_BATCH_SIZE = 500          # rows per transaction when ingesting a stream
+BACKFILL_PAGE_LIMIT = 40          # statuses per API page
+BACKFILL_PAGE_DELAY = 1.0         # seconds between API pages (be polite)
+DEFAULT_SEARCH_LIMIT = 20
+SNIPPET_TOKENS = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id          INTEGER PRIMARY KEY,       -- the numeric status id, so id order is time order; rows without
+                                           -- one count down from -1 and never collide with a status id
+    key         TEXT NOT NULL UNIQUE,      -- account:status_id (or account:h:hash without an id)
+    account     TEXT NOT NULL,
+    status_id   TEXT,
+    timestamp   TEXT,                      -- the post's own ISO-8601 time, if known
+    text        TEXT NOT NULL,
+    hash        TEXT NOT NULL,
+    media       TEXT,                      -- JSON list of {type, url}
+    update_of   TEXT,
+    first_seen  TEXT NOT NULL,
+    edited_at   TEXT
+);
+CREATE INDEX IF NOT EXISTS posts_account_time ON posts(account, timestamp);
+"""
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    text, content='posts', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts(posts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE OF text ON posts BEGIN
+    INSERT INTO posts_fts(posts_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO posts_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+# Edits keep the status id: replace the text (the FTS trigger re-indexes it).
+# Rows without a numeric status id take the next id below zero.
+NEXT_LOCAL_ID = "min(0, coalesce((SELECT min(id) FROM posts), 0)) - 1"
+UPSERT_SQL = f"""
+INSERT INTO posts (id, key, account, status_id, timestamp, text, hash, media, update_of, first_seen)
+VALUES (coalesce(:rowid, {NEXT_LOCAL_ID}), :key, :account, :status_id, :timestamp, :text, :hash, :media, :update_of, :seen_at)
+ON CONFLICT(key) DO UPDATE SET
+    text = excluded.text, hash = excluded.hash, media = excluded.media, edited_at = excluded.first_seen
+WHERE posts.hash != excluded.hash
+"""
+
+
+class ArchiveError(Exception):
+    # The archive database could not be opened or written
+    pass
+
+
+def archive_record(post: dict, account: str = DEFAULT_ACCOUNT) -> dict:
+    """
+    Flatten a scraped / API / prepared post into an archive row, or None if
+    it has no content. Posts that already went through prepare_post keep
+    their normalized text and hash.
+    """
+    raw_text = post.get("raw_text") or post_raw_text(post)
+    if not raw_text:
+        return None
+    digest = post.get("hash") or hash_post(normalize(raw_text))
+    status_id = str(post.get("id") or "") or None
+    return {
+        "rowid": int(status_id) if status_id and status_id.isdigit() else None,
+        "key": f"{account}:{status_id}" if status_id else f"{account}:h:{digest}",
+        "account": account,
+        "status_id": status_id,
+        "timestamp": post.get("timestamp") or None,
+        "text": raw_text,
+        "hash": digest,
+        "media": json.dumps(post.get("media") or []),
+        "update_of": post.get("update_of") or None,
+        "seen_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def iter_records(posts, account: str = DEFAULT_ACCOUNT):
+    # Generator stage: posts -> archive rows (pinned and empty posts dropped)
+    for post in posts:
+        if post.get("pinned"):
+            continue
+        record = archive_record(post, account)
+        if record is not None:
+            yield record
+
+
+def iter_history(client: TruthApiClient, max_id: str = None, max_pages: int = None,
+                 page_limit: int = BACKFILL_PAGE_LIMIT, delay: float = BACKFILL_PAGE_DELAY):
+    """
+    Generator stage: page backwards through the account's statuses with
+    max_id, yielding posts newest first. Only one page is held at a time.
+    """
+    pages = 0
+    while max_pages is None or pages < max_pages:
+        statuses = client.fetch_statuses(max_id=max_id, limit=page_limit) or []
+        pages += 1
+        ids = [str(s.get("id", "")) for s in statuses if str(s.get("id", "")).isdigit()]
+        for status in statuses:
+            yield status_to_post(status)
+        if not ids:
+            return
+        oldest = min(ids, key=int)
+        if oldest == max_id:
+            return
+        max_id = oldest
+        if delay:
+            time.sleep(delay)
+
+
+# ----------------------------
+# Archive
+# ----------------------------
+class PostArchive:
+    """
+    SQLite file with one row per status (edits update it in place) and an
+    external-content FTS5 index kept in sync by triggers. Writes go through
+    ingest(), which consumes any iterable of archive rows in batched
+    transactions, so a long stream never sits in memory. Without FTS5 in
+    the local SQLite build, search falls back to LIKE.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+            try:
+                self.conn.executescript(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError as e:
+                log.warning("SQLite has no FTS5 (%s); archive search will be slower.", e)
+                self.fts = False
+        except (OSError, sqlite3.Error) as e:
+            raise ArchiveError(f"Cannot open archive {path}: {e}")
+
+    def ingest(self, records, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        # Write rows from an iterable, one transaction per batch; returns rows written or edited
+        written = 0
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                written += self._write(batch)
+                batch = []
+        if batch:
+            written += self._write(batch)
+        return written
+
+    def _write(self, batch: list) -> int:
+        with self._lock:
+            try:
+                with self.conn:
+                    # rowcount excludes the FTS trigger writes and unchanged duplicates
+                    return max(self.conn.executemany(UPSERT_SQL, batch).rowcount, 0)
+            except sqlite3.Error as e:
+                raise ArchiveError(f"Archive write failed: {e}")
+
+    def oldest_status_id(self, account: str = DEFAULT_ACCOUNT):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT status_id FROM posts WHERE account = ? AND status_id GLOB '[0-9]*' "
+                "ORDER BY length(status_id), status_id LIMIT 1", (account,)).fetchone()
+        return row[0] if row else None
+
+    def count(self, account: str = None) -> int:
+        with self._lock:
+            if account:
+                return self.conn.execute("SELECT count(*) FROM posts WHERE account = ?", (account,)).fetchone()[0]
+            return self.conn.execute("SELECT count(*) FROM posts").fetchone()[0]
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT, account: str = None,
+               rank: bool = False) -> list:
+        """
+        Full-text search (FTS5 query syntax: words, "phrases", prefix*,
+        AND/OR/NOT, NEAR). Newest first, or best match first with rank=True.
+        Input that is not valid FTS5 syntax is retried as plain words.
+        """
+        if not self.fts:
+            return self._search_like(query, limit, account)
+        try:
+            return self._search_fts(query, limit, account, rank)
+        except sqlite3.OperationalError:
+            quoted = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+            return self._search_fts(quoted, limit, account, rank) if quoted else []
+
+    def _search_fts(self, match: str, limit: int, account: str, rank: bool) -> list:
+        # Order and limit on ids first, then build snippets for just those rows
+        # (a snippet per match before the sort dominates broad queries)
+        sql = "SELECT p.id FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid WHERE posts_fts MATCH ?"
+        args = [match]
+        if account:
+            sql += " AND p.account = ?"
+            args.append(account)
+        # newest first is rowid order, which FTS5 can walk backwards and stop at the limit
+        # (rows without a status id come after every row with one)
+        sql += " ORDER BY " + ("bm25(posts_fts)" if rank else "posts_fts.rowid DESC")
+        sql += " LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            ids = [r[0] for r in self.conn.execute(sql, args)]
+            if not ids:
+                return []
+            rows = self.conn.execute(
+                "SELECT p.id, p.account, p.status_id, p.timestamp, p.first_seen, "
+                f"snippet(posts_fts, 0, '[', ']', '…', {SNIPPET_TOKENS}) "
+                "FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid "
+                f"WHERE posts_fts MATCH ? AND posts_fts.rowid IN ({','.join('?' * len(ids))})",
+                [match] + ids).fetchall()
+        by_id = {r[0]: r[1:] for r in rows}
+        return [self._row(by_id[i]) for i in ids if i in by_id]
+
+    def _search_like(self, query: str, limit: int, account: str) -> list:
+        sql = ("SELECT account, status_id, timestamp, first_seen, substr(text, 1, 160) "
+               "FROM posts WHERE text LIKE ?")
+        args = [f"%{query}%"]
+        if account:
+            sql += " AND account = ?"
+            args.append(account)
+        sql += " ORDER BY id DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        return [self._row(r) for r in rows]
+
+    @staticmethod
+    def _row(row) -> dict:
+        account, status_id, timestamp, first_seen, snippet = row
+        return {"account": account, "status_id": status_id, "timestamp": timestamp or first_seen,
+                "snippet": snippet}
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+class ArchiveSink:
+    # Adapter so a sinks.SinkWorker can batch archive rows off the monitor thread
+    def __init__(self, archive: PostArchive):
+        self.name = "archive"
+        self.archive = archive
+
+    def deliver(self, batch: list) -> None:
+        self.archive.ingest(batch)
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+# ----------------------------
+# Command line
+# ----------------------------
+def backfill(archive: PostArchive, client: TruthApiClient, account: str, max_pages: int = None,
+             resume: bool = False, batch_size: int = DEFAULT_BATCH_SIZE, delay: float = BACKFILL_PAGE_DELAY) -> dict:
+    # Stream the account's history into the archive; returns counts and throughput
+    max_id = archive.oldest_status_id(account) if resume else None
+    start = time.perf_counter()
+    seen = 0
+
+    def counted(posts):
+        nonlocal seen
+        for post in posts:
+            seen += 1
+            yield post
+
+    written = archive.ingest(
+        iter_records(counted(iter_history(client, max_id, max_pages, delay=delay)), account), batch_size)
+    elapsed = time.perf_counter() - start
+    return {"statuses": seen, "written": written, "seconds": elapsed,
+            "posts_per_sec": seen / elapsed if elapsed else 0.0}
+
+
+def main(argv=None) -> int:
+    from config import API_BASE, USER_AGENT, ARCHIVE_PATH
+
+    parser = argparse.ArgumentParser(description="Search or backfill the local post archive")
+    parser.add_argument("--db", default=ARCHIVE_PATH, help="archive database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="full-text search (FTS5 syntax)")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=DEFAULT_SEARCH_LIMIT)
+    search.add_argument("--account")
+    search.add_argument("--rank", action="store_true", help="best match first instead of newest first")
+    search.add_argument("--json", action="store_true", help="print JSON lines")
+
+    fill = commands.add_parser("backfill", help="page back through an account's history via the API")
+    fill.add_argument("--account", default=DEFAULT_ACCOUNT)
+    fill.add_argument("--max-pages", type=int, default=None, help="stop after this many API pages")
+    fill.add_argument("--resume", action="store_true", help="continue below the oldest archived status")
+    fill.add_argument("--batch", type=int, default=DEFAULT_BATCH_SIZE, help="rows per transaction")
+    fill.add_argument("--delay", type=float, default=BACKFILL_PAGE_DELAY, help="seconds between pages")
+    fill.add_argument("--api-base", default=API_BASE)
+
+    commands.add_parser("stats", help="row counts")
+    args = parser.parse_args(argv)
+
+    try:
+        archive = PostArchive(args.db)
+    except ArchiveError as e:
+        print(e, file=sys.stderr)
+        return 1
+    try:
+        if args.command == "search":
+            start = time.perf_counter()
+            rows = archive.search(args.query, args.limit, args.account, args.rank)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            for row in rows:
+                if args.json:
+                    print(json.dumps(row, ensure_ascii=False))
+                else:
+                    print(f"{row['timestamp'] or '-':<26} {row['account']}/{row['status_id'] or '-'}\n"
+                          f"    {row['snippet']}")
+            print(f"{len(rows)} results in {elapsed_ms:.1f} ms", file=sys.stderr)
+        elif args.command == "backfill":
+            client = TruthApiClient(args.account, base_url=args.api_base, user_agent=USER_AGENT)
+            try:
+                result = backfill(archive, client, args.account, args.max_pages, args.resume,
+                                  args.batch, args.delay)
+            finally:
+                client.close()
+            print(f"{result['statuses']} statuses read, {result['written']} rows written in "
+                  f"{result['seconds']:.1f}s ({result['posts_per_sec']:.0f} posts/s); "
+                  f"{archive.count(args.account)} archived for @{args.account}")
+        else:
+            print(f"{archive.count()} posts archived in {args.db} (full-text index: {'FTS5' if archive.fts else 'none'})")
+    except ArchiveError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        archive.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# async_monitor.py - Trump Watcher
+# Asyncio engine: watch many Truth Social accounts on one shared headless browser
+
+import asyncio
+import time
+
+from playwright.async_api import async_playwright
+
+from extraction import EXTRACT_POSTS_JS, prepare_post, record_extract_time
+from scheduler import PollJob, PollScheduler
+from readiness import PhaseTimer, async_load_feed, min_statuses
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+ACCOUNT_URL = "https://truthsocial.com/@{handle}"
+DEFAULT_CONCURRENCY = 4          # accounts polled at the same time
+DEFAULT_PAGE_MAX_AGE = 10 * 60   # recycle an account's context after this many seconds
+MIN_READY_POSTS = 2              # a load is ready once this many non-pinned posts are present
+
+
+class AccountState:
+    # Everything the engine tracks for one watched account
+    def __init__(self, handle: str, seen, interval: float = None):
+        self.handle = handle.lstrip("@")
+        self.interval = interval         # seconds between polls (None = engine default)
+        self.url = ACCOUNT_URL.format(handle=self.handle)
+        self.seen = seen                 # SeenStore (or any set-like) for this account
+        self.context = None
+        self.page = None
+        self.opened_at = 0.0
+        self.last_poll = 0.0             # time.time() of the last completed poll
+        self.last_poll_ms = 0.0
+        self.last_error = None
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.polls = 0
+        self.posts_found = 0
+
+    def summary(self) -> str:
+        return (f"@{self.handle}: {self.polls} polls, {self.posts_found} new posts, "
+                f"{self.errors} errors, last poll {self.last_poll_ms:.0f} ms")
+
+
+class AsyncMonitor:
+    """
+    Polls N accounts concurrently using the async Playwright API.
+    All accounts share one Chromium; each gets its own lightweight context
+    and page. An asyncio.Semaphore caps how many polls run at once, and a
+    PollScheduler decides when each account is due (per-account interval,
+    jitter, backoff after errors).
+
+    on_post(state, post, label) is called from a worker thread for every new
+    post (post is a prepare_post() dict), so a slow notifier never stalls the
+    event loop. should_stop() is checked at least once a second.
+    """
+
+    def __init__(self, accounts: list, on_post, should_stop, *,
+                 poll_interval: int = 30, concurrency: int = DEFAULT_CONCURRENCY,
+                 page_max_age: float = DEFAULT_PAGE_MAX_AGE,
+                 launch_kwargs: dict = None, user_agent: str = None,
+                 blocked_resource_types=("image", "font", "media")):
+        self.accounts = accounts
+        self.on_post = on_post
+        self.should_stop = should_stop
+        self.poll_interval = poll_interval
+        self.concurrency = concurrency
+        self.page_max_age = page_max_age
+        self.launch_kwargs = dict(launch_kwargs or {})
+        self.user_agent = user_agent
+        self.blocked_resource_types = tuple(blocked_resource_types)
+        self.browser = None
+        self.scheduler = PollScheduler()
+        self.phase_timer = PhaseTimer()
+        self._semaphore = None
+
+    # ----------------------------
+    # Browser + per-account pages
+    # ----------------------------
+    async def _block(self, route, request):
+        if request.resource_type in self.blocked_resource_types:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _open_account(self, state: AccountState) -> None:
+        headers = {"user-agent": self.user_agent} if self.user_agent else None
+        state.context = await self.browser.new_context(extra_http_headers=headers)
+        await state.context.route("**/*", self._block)
+        state.page = page = await state.context.new_page()
+        await async_load_feed(
+            page, lambda: page.goto(state.url, wait_until="domcontentloaded"),
+            min_statuses(MIN_READY_POSTS), self.phase_timer,
+        )
+        state.opened_at = time.time()
+        log.debug("Opened page for @%s", state.handle)
+
+    async def _close_account(self, state: AccountState) -> None:
+        if state.context:
+            try:
+                await state.context.close()
+            except Exception as e:
+                log.warning("Error closing context for @%s: %s", state.handle, e)
+        state.context = None
+        state.page = None
+
+    # ----------------------------
+    # Polling
+    # ----------------------------
+    async def _load_feed(self, page) -> None:
+        await async_load_feed(
+            page, lambda: page.reload(wait_until="domcontentloaded"),
+            min_statuses(MIN_READY_POSTS), self.phase_timer,
+        )
+
+    def _select_new(self, state: AccountState, scraped: list) -> list:
+        new_posts = []
+        for post in scraped:
+            if post.get("pinned"):
+                continue
+            prepared, _ = prepare_post(post)
+            if prepared is None or prepared["hash"] in state.seen:
+                continue
+            state.seen.add(prepared["hash"])
+            new_posts.append(prepared)
+        return new_posts
+
+    async def _poll(self, state: AccountState) -> None:
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                if state.page is None or time.time() - state.opened_at >= self.page_max_age:
+                    await self._close_account(state)
+                    await self._open_account(state)
+                else:
+                    await self._load_feed(state.page)
+
+                first_run = len(state.seen) == 0
+                extract_start = time.perf_counter()
+                scraped = await state.page.evaluate(EXTRACT_POSTS_JS) or []
+                record_extract_time((time.perf_counter() - extract_start) * 1000)
+                new_posts = self._select_new(state, scraped)
+
+                # first run: notify the latest only, the rest are already marked seen
+                to_notify = new_posts[:1] if first_run else new_posts
+                label = f"Most recent @{state.handle} post" if first_run else f"New @{state.handle} post"
+                loop = asyncio.get_running_loop()
+                for post in to_notify:
+                    await loop.run_in_executor(None, self.on_post, state, post, label)
+
+                state.posts_found += len(to_notify)
+                state.consecutive_errors = 0
+            except Exception as e:
+                state.errors += 1
+                state.consecutive_errors += 1
+                state.last_error = str(e)
+                log.warning("Error polling @%s: %s", state.handle, e)
+                # start the next poll from a fresh context; the scheduler backs off
+                await self._close_account(state)
+                raise
+            finally:
+                state.polls += 1
+                state.last_poll = time.time()
+                state.last_poll_ms = (time.perf_counter() - start) * 1000
+
+    async def _run_job(self, job: PollJob) -> None:
+        start = time.perf_counter()
+        try:
+            await job.func()
+        except Exception as e:
+            self.scheduler.complete(job, False, time.perf_counter() - start, str(e))
+        else:
+            self.scheduler.complete(job, True, time.perf_counter() - start)
+
+    async def _dispatch(self) -> None:
+        # Start every due job as its own task; wake at least once a second
+        tasks = set()
+        while not self.should_stop():
+            job = self.scheduler.pop_due()
+            if job is not None:
+                task = asyncio.create_task(self._run_job(job))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                continue
+            delay = self.scheduler.next_delay()
+            await asyncio.sleep(1.0 if delay is None else min(1.0, delay))
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self) -> None:
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with async_playwright() as p:
+            self.browser = await p.chromium.launch(headless=True, **self.launch_kwargs)
+            log.info("Async monitor watching %s accounts, concurrency %s, polling every %ss",
+                     len(self.accounts), self.concurrency, self.poll_interval)
+            # stagger the first polls so accounts don't all reload at once
+            step = self.poll_interval / max(len(self.accounts), 1)
+            for i, state in enumerate(self.accounts):
+                job = PollJob(f"@{state.handle}", lambda state=state: self._poll(state),
+                              state.interval or self.poll_interval)
+                self.scheduler.add(job, delay=i * step)
+            try:
+                await self._dispatch()
+            finally:
+                for state in self.accounts:
+                    await self._close_account(state)
+                await self.browser.close()
+                self.browser = None
+        for state in self.accounts:
+            log.info("%s", state.summary())
+        for line in self.scheduler.summary().splitlines() + self.phase_timer.summary().splitlines():
+            log.info("%s", line)
+
+    def run_forever(self) -> None:
+        # Blocking entry point for a background thread
+        asyncio.run(self.run())
@@ -0,0 +1,127 @@
+# bench_archive.py - Trump Watcher
+# Archive benchmark: streaming ingest throughput and full-text query latency
+#
+#   python bench/bench_archive.py                 # 20k synthetic posts built from bench/corpus
+#   python bench/bench_archive.py --posts=100000
+#
+# Posts are generated on the fly from the saved feed snapshots (text varied per
+# post, unique status ids), so ingest runs the same generator pipeline as
+# `archive.py backfill` without any network access.
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from archive import PostArchive, iter_records  # noqa: E402
+from bench_pipeline import CORPUS_DIR, parse_snapshot  # noqa: E402
+from scheduler import percentile  # noqa: E402
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_POSTS = 20000
+BATCH_SIZES = (1, 100, 500, 2000)
+SINGLE_ROW_POSTS = 2000           # batch size 1 is slow; time it on fewer posts
+MEMORY_POSTS = 5000               # posts streamed again under tracemalloc for the peak
+QUERY_REPEAT = 200
+QUERIES = (
+    ("term", "tariffs", False),
+    ("phrase", '"border wall"', False),
+    ("prefix", "elect*", False),
+    ("boolean", "china AND trade NOT biden", False),
+    ("ranked", "great america", True),
+    ("rare", "zebra", False),
+)
+FILLER = ("tariffs", "china", "trade", "border", "wall", "election", "elections", "great", "america",
+          "biden", "fake", "news", "rally", "ohio", "economy", "jobs", "zebra")
+
+
+def load_texts(corpus_dir: str) -> list:
+    texts = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.endswith(".html"):
+            with open(os.path.join(corpus_dir, name), encoding="utf-8") as f:
+                texts.extend(p["text"] for p in parse_snapshot(f.read()) if p["text"] and not p["pinned"])
+    if not texts:
+        raise SystemExit(f"No post text in {corpus_dir}")
+    return texts
+
+
+def synthetic_posts(texts: list, count: int, seed: int = 1):
+    # Generator of unique posts, newest first, like a backfill stream
+    rng = random.Random(seed)
+    for i in range(count):
+        words = " ".join(rng.choice(FILLER) for _ in range(rng.randint(2, 8)))
+        yield {"id": str(10 ** 17 - i), "text": f"{rng.choice(texts)}\n{words}",
+               "timestamp": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00Z"}
+
+
+def bench_ingest(texts: list, count: int, batch_size: int, tmp_dir: str) -> dict:
+    path = os.path.join(tmp_dir, f"ingest_{batch_size}.db")
+    archive = PostArchive(path)
+    start = time.perf_counter()
+    written = archive.ingest(iter_records(synthetic_posts(texts, count)), batch_size)
+    elapsed = time.perf_counter() - start
+    db_kib = os.path.getsize(path) / 1024
+
+    archive.close()
+
+    # peak memory of the same stream into a scratch file, traced separately so tracing does not skew the timing
+    scratch = PostArchive(os.path.join(tmp_dir, f"memory_{batch_size}.db"))
+    tracemalloc.start()
+    scratch.ingest(iter_records(synthetic_posts(texts, min(count, MEMORY_POSTS))), batch_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    scratch.close()
+    return {"posts": written, "posts_per_sec": written / elapsed, "peak_kib": peak / 1024, "db_kib": db_kib}
+
+
+def bench_queries(archive: PostArchive, repeat: int) -> dict:
+    results = {}
+    for name, query, rank in QUERIES:
+        archive.search(query, rank=rank)          # warm-up
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = archive.search(query, rank=rank)
+            times.append(time.perf_counter() - start)
+        results[name] = {"query": query, "hits": len(rows), "p50_ms": 1000 * percentile(times, 50),
+                         "p95_ms": 1000 * percentile(times, 95)}
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Archive ingest throughput and search latency")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="directory of saved feed *.html snapshots")
+    parser.add_argument("--posts", type=int, default=DEFAULT_POSTS)
+    parser.add_argument("--repeat", type=int, default=QUERY_REPEAT, help="runs per query")
+    args = parser.parse_args(argv)
+
+    texts = load_texts(args.corpus)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'ingest':<16}{'posts':>9}{'posts/s':>12}{'peak KiB':>10}{'db KiB':>10}")
+        for batch_size in BATCH_SIZES:
+            count = min(args.posts, SINGLE_ROW_POSTS) if batch_size == 1 else args.posts
+            r = bench_ingest(texts, count, batch_size, tmp_dir)
+            print(f"{f'batch {batch_size}':<16}{r['posts']:>9}{r['posts_per_sec']:>12,.0f}"
+                  f"{r['peak_kib']:>10.1f}{r['db_kib']:>10.0f}")
+
+        archive = PostArchive(os.path.join(tmp_dir, f"ingest_{BATCH_SIZES[-1]}.db"))
+        print(f"\n{'query':<10}{'hits':>6}{'p50 ms':>9}{'p95 ms':>9}  ({archive.count()} posts, "
+              f"{'FTS5' if archive.fts else 'LIKE'}, {args.repeat} runs, newest-first unless ranked)")
+        for name, r in bench_queries(archive, args.repeat).items():
+            print(f"{name:<10}{r['hits']:>6}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}  {r['query']}")
+        archive.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+# bench_pipeline.py - Trump Watcher
+# Offline benchmark of the extraction -> filter -> normalize -> hash pipeline
+#
+#   python bench/bench_pipeline.py                    # compare against bench/baselines.json
+#   python bench/bench_pipeline.py --update-baseline  # record new baselines on this machine
+#
+# Stage costs are compared as multiples of a fixed calibration loop timed in
+# the same process, alongside each stage, so baselines recorded on one
+# machine still apply on a faster or slower one.
+#
+# The corpus is saved feed HTML (bench/corpus/*.html): pinned posts, video-only
+# and image-only posts, cookie / sign-up banners and long threads. The browser
+# stage loads each snapshot into a local headless page and runs the real
+# in-page extractor; it is skipped when Playwright (or its Chromium) is missing.
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from html.parser import HTMLParser
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from extraction import (  # noqa: E402
+    scrape_feed, post_raw_text, find_boilerplate, normalize, hash_post, prepare_post,
+)
+from simhash_index import simhash  # noqa: E402
+
+# ----------------------------
+# Constants
+# ----------------------------
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines.json")
+DEFAULT_REPEAT = 7            # timing runs per stage; the fastest counts
+DEFAULT_NUMBER = 20           # passes over the corpus per timing run
+DEFAULT_THRESHOLD = 0.25      # >25% costlier (relative to calibration) than the baseline = regression
+BROWSER_NUMBER = 5
+CALIBRATION_TEXTS = [" ".join(f"Word{(i * 7 + j) % 53}" for j in range(40)) for i in range(100)]
+_CALIBRATION_RE = re.compile(r"\w+")
+
+
+# ----------------------------
+# Offline snapshot parser (same output shape as extraction.scrape_feed)
+# ----------------------------
+class _FeedParser(HTMLParser):
+    # Mirrors STATUS_EXTRACT_FN closely enough to feed the Python stages without a browser
+    TEXT_TAGS = {"p", "span", "a", "h1", "h2", "h3", "blockquote"}
+    VOID_TAGS = {"img", "source", "br", "hr", "meta", "link", "input"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.posts = []
+        self._post = None
+        self._depth = 0           # open elements inside the current status wrapper
+        self._text_depth = None   # depth of the outermost open text element
+        self._buf = []
+        self._raw = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self._post is None:
+            if tag == "div" and "status__wrapper" in (attrs.get("class") or "").split():
+                self._post = {"id": "", "author": "", "text": "", "media": [], "pinned": False,
+                              "timestamp": "", "_parts": []}
+                self._depth = 0
+                self._raw = []
+            return
+        if tag not in self.VOID_TAGS:
+            self._depth += 1
+        if tag == "a" and not self._post["id"]:
+            href = attrs.get("href") or ""
+            if "/posts/" in href:
+                self._post["id"] = href.rsplit("/posts/", 1)[1].split("?")[0].split("/")[0]
+        elif tag == "time" and not self._post["timestamp"]:
+            self._post["timestamp"] = attrs.get("datetime") or attrs.get("title") or ""
+        elif tag in ("source", "video") and attrs.get("src"):
+            self._post["media"].append({"type": "video", "url": attrs["src"].split("?")[0]})
+        elif tag == "img" and attrs.get("src"):
+            self._post["media"].append({"type": "image", "url": attrs["src"].split("?")[0]})
+        if tag in self.TEXT_TAGS and self._text_depth is None:
+            self._text_depth = self._depth
+            self._buf = []
+
+    def handle_endtag(self, tag):
+        if self._post is None or tag in self.VOID_TAGS:
+            return
+        if self._text_depth is not None and self._depth == self._text_depth:
+            text = " ".join("".join(self._buf).split())
+            if len(text) > 10:
+                self._post["_parts"].append(text)
+            self._text_depth = None
+        if self._depth == 0:
+            post = self._post
+            post["text"] = "\n".join(post.pop("_parts"))
+            post["pinned"] = "Pinned Truth" in "".join(self._raw)
+            self.posts.append(post)
+            self._post = None
+            return
+        self._depth -= 1
+
+    def handle_data(self, data):
+        if self._post is None:
+            return
+        self._raw.append(data)
+        if self._text_depth is not None:
+            self._buf.append(data)
+
+
+def parse_snapshot(html: str) -> list:
+    parser = _FeedParser()
+    parser.feed(html)
+    parser.close()
+    return parser.posts
+
+
+# ----------------------------
+# Measurement
+# ----------------------------
+def _time_passes(func, items: list, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        for item in items:
+            func(item)
+    return time.perf_counter() - start
+
+
+def measure(func, items: list, posts_per_pass: int, repeat: int, number: int) -> dict:
+    # Best-of-`repeat` wall time for `number` passes (after one warm-up pass), plus peak
+    # traced memory for one pass. Each repeat is paired with a calibration run right
+    # before it; the cost relative to the machine is the median of the paired ratios,
+    # so a slow stretch of machine time slows both sides of a pair.
+    for item in items:
+        func(item)
+    best = float("inf")
+    ratios = []
+    for _ in range(repeat):
+        calibration = _time_passes(_calibration_step, CALIBRATION_TEXTS, number) / len(CALIBRATION_TEXTS)
+        elapsed = _time_passes(func, items, number)
+        best = min(best, elapsed)
+        ratios.append(elapsed / posts_per_pass / calibration)
+    per_post = best / (number * posts_per_pass)
+
+    tracemalloc.start()
+    for item in items:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"us_per_post": per_post * 1e6, "posts_per_sec": 1 / per_post, "peak_kib": peak / 1024,
+            "relative": statistics.median(ratios)}
+
+
+def _calibration_step(text: str) -> str:
+    # Fixed mix of what the stages do: regex, str methods, dict updates, hashing
+    counts = {}
+    for word in _CALIBRATION_RE.findall(text.lower()):
+        counts[word] = counts.get(word, 0) + 1
+    return hashlib.sha256(" ".join(sorted(counts)).encode("utf-8")).hexdigest()
+
+
+def calibrate(repeat: int, number: int) -> float:
+    # µs per calibration item on this machine, right now
+    best = min(_time_passes(_calibration_step, CALIBRATION_TEXTS, number) for _ in range(repeat))
+    return best * 1e6 / (number * len(CALIBRATION_TEXTS))
+
+
+def browser_stage(snapshots: dict, repeat: int, post_count: int):
+    # Time scrape_feed() against each snapshot loaded into a local headless page
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        return None, "playwright not installed"
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            page = browser.new_page()
+            best = float("inf")
+            for _ in range(repeat):
+                elapsed = 0.0
+                for _ in range(BROWSER_NUMBER):
+                    for html in snapshots.values():
+                        page.set_content(html)
+                        start = time.perf_counter()
+                        scrape_feed(page)
+                        elapsed += time.perf_counter() - start
+                best = min(best, elapsed)
+            browser.close()
+    except Exception as e:
+        return None, f"browser unavailable ({str(e).splitlines()[0]})"
+    per_post = best / (BROWSER_NUMBER * post_count)
+    return {"us_per_post": per_post * 1e6, "posts_per_sec": 1 / per_post, "peak_kib": 0.0}, None
+
+
+def run(corpus_dir: str, repeat: int, number: int, use_browser: bool) -> dict:
+    snapshots = {}
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            snapshots[os.path.basename(path)] = f.read()
+    if not snapshots:
+        raise SystemExit(f"No *.html snapshots in {corpus_dir}")
+
+    posts = [post for html in snapshots.values() for post in parse_snapshot(html)]
+    unpinned = [p for p in posts if not p["pinned"]]
+    raw_texts = [t for t in map(post_raw_text, unpinned) if t]
+    normalized = [normalize(t) for t in raw_texts]
+    n_posts = len(posts)
+    print(f"corpus: {len(snapshots)} snapshots, {n_posts} statuses "
+          f"({n_posts - len(unpinned)} pinned, {len(raw_texts)} with content)")
+
+    results = {}
+    if use_browser:
+        result, skipped = browser_stage(snapshots, repeat, n_posts)
+        if result:
+            results["extract (browser)"] = result
+        else:
+            print(f"extract (browser): skipped - {skipped}")
+    htmls = list(snapshots.values())
+    results["parse (offline)"] = measure(parse_snapshot, htmls, n_posts, repeat, max(number // 4, 1))
+    results["boilerplate"] = measure(find_boilerplate, raw_texts, len(raw_texts), repeat, number)
+    results["normalize"] = measure(normalize, raw_texts, len(raw_texts), repeat, number)
+    results["hash"] = measure(hash_post, normalized, len(normalized), repeat, number)
+    results["simhash"] = measure(simhash, normalized, len(normalized), repeat, number)
+    results["prepare_post"] = measure(prepare_post, unpinned, len(unpinned), repeat, number)
+    return results
+
+
+def compare(results: dict, baselines: dict, threshold: float, calibration_us: float) -> list:
+    """
+    Print the table; return the names of stages that regressed. Costs are
+    compared in calibration units (us/post over the calibration loop's
+    us/item); the baseline column is the baseline's relative cost converted
+    back to us on this machine.
+    """
+    regressions = []
+    print(f"\ncalibration: {calibration_us:.2f} us per item (stage costs below are compared as multiples of it)")
+    print(f"\n{'stage':<20}{'us/post':>10}{'posts/s':>12}{'peak KiB':>10}{'x calib':>9}{'baseline':>10}{'change':>9}")
+    for name, r in results.items():
+        base = baselines.get(name, {}).get("relative")
+        change = ""
+        if base:
+            delta = r["relative"] / base - 1
+            change = f"{100 * delta:+.0f}%"
+            if delta > threshold:
+                regressions.append(name)
+                change += " !"
+        print(f"{name:<20}{r['us_per_post']:>10.2f}{r['posts_per_sec']:>12,.0f}{r['peak_kib']:>10.1f}"
+              f"{r['relative']:>9.2f}{(f'{base * calibration_us:.2f}' if base else '-'):>10}{change:>9}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the post extraction pipeline")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="directory of saved feed *.html snapshots")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baselines JSON file")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--number", type=int, default=DEFAULT_NUMBER)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown per post before a stage counts as regressed (0.25 = 25%%)")
+    parser.add_argument("--no-browser", action="store_true", help="skip the headless browser stage")
+    parser.add_argument("--update-baseline", action="store_true", help="write these results as the new baselines")
+    args = parser.parse_args(argv)
+
+    results = run(args.corpus, args.repeat, args.number, not args.no_browser)
+    calibration_us = calibrate(args.repeat, args.number)
+    for r in results.values():
+        # the browser stage has its own timing loop
+        r.setdefault("relative", r["us_per_post"] / calibration_us)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baselines = json.load(f)
+    regressions = compare(results, baselines, args.threshold, calibration_us)
+
+    if args.update_baseline:
+        baselines.update({name: {k: round(v, 3) for k, v in r.items()} for name, r in results.items()})
+        baselines["calibration"] = {"us_per_item": round(calibration_us, 3)}   # for reference only
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaselines written to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"\nREGRESSION (> {100 * args.threshold:.0f}% slower): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# bench_rules.py - Trump Watcher
+# Rule engine benchmark: per-post cost as the rule count and the post length grow
+#
+#   python bench/bench_rules.py                   # 10 .. 5000 phrase rules over bench/corpus posts
+#   python bench/bench_rules.py --regex=20        # plus 20 regex rules in the first table
+#
+# Phrases are drawn from the corpus vocabulary (so some of them fire) plus
+# made-up words. The compiled RuleSet is timed against the obvious loop of
+# one substring test / re.search per rule. Two more tables show where the
+# per-phrase substring scan stops beating the trie regex (SCAN_MAX_PHRASES)
+# and how the cost grows with thousands of regex rules (linearly: each one
+# is its own pass over the post).
+
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from rules import Rule, RuleSet, PRIORITY, TAG, SCAN_MAX_PHRASES  # noqa: E402
+from bench_archive import load_texts  # noqa: E402
+from bench_pipeline import CORPUS_DIR  # noqa: E402
+
+# ----------------------------
+# Constants
+# ----------------------------
+RULE_COUNTS = (10, 100, 500, 1000, 2500, 5000)
+PHRASES_PER_RULE = 2
+POST_LENGTHS = (250, 1000, 4000)  # characters, for the per-character table
+DEFAULT_REPEAT = 5                # timing runs; the fastest counts
+NAIVE_MAX_RULES = 2500            # the per-rule loop is slow; skip it above this
+PHRASE_COUNTS = (2, 8, 16, 24, 32, 64, 128)   # scan vs trie crossover table
+REGEX_COUNTS = (10, 100, 1000, 2500)
+FIRING_EVERY = 20                 # one rule in 20 is built from corpus words and can fire
+REGEX_TEMPLATES = (r"\b{w}s?\b", r"{w}\s+\w+", r"\b\d{{2,}}\s*{w}")
+
+
+def make_rules(vocab: list, count: int, regex_count: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    junk = lambda: "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))  # noqa: E731
+    rules = []
+    for i in range(count):
+        # a watchlist is mostly terms that are absent from any given post
+        word = (lambda: rng.choice(vocab)) if i % FIRING_EVERY == 0 else junk
+        phrases = [" ".join(word() for _ in range(rng.randint(1, 2))) for _ in range(PHRASES_PER_RULE)]
+        rules.append(Rule(f"rule{i}", PRIORITY if i % 10 == 0 else TAG, phrases=phrases))
+    for i in range(regex_count):
+        template = REGEX_TEMPLATES[i % len(REGEX_TEMPLATES)]
+        rules.append(Rule(f"regex{i}", TAG, regex=[template.format(w=re.escape(rng.choice(vocab)))]))
+    return rules
+
+
+def naive_match(rules: list, compiled: dict, text: str) -> list:
+    # One pass per rule: what the boilerplate loop used to do, generalised
+    low = text.lower()
+    return [r for r in rules if any(p in low for p in r.phrases) or any(c.search(text) for c in compiled[r.name])]
+
+
+def best_time(fn, texts: list, repeat: int) -> float:
+    # Fastest of `repeat` passes over texts, in seconds per text
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rule engine cost vs rule count and post length")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="directory of saved feed *.html snapshots")
+    parser.add_argument("--regex", type=int, default=0, help="regex rules added to every rule set")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args(argv)
+
+    texts = load_texts(args.corpus)
+    vocab = sorted({w for t in texts for w in re.findall(r"[a-z]{4,}", t.lower())})
+    chars = sum(map(len, texts)) / len(texts)
+    print(f"{len(texts)} corpus posts, {chars:.0f} chars on average, {args.regex} regex rules\n")
+
+    print(f"{'rules':>6}{'compile ms':>12}{'us/post':>10}{'naive us/post':>15}{'hits/post':>11}")
+    for count in RULE_COUNTS:
+        rules = make_rules(vocab, count, args.regex)
+        start = time.perf_counter()
+        rule_set = RuleSet(rules)
+        compile_ms = 1000 * (time.perf_counter() - start)
+        per_post = best_time(rule_set.match, texts, args.repeat)
+        hits = sum(len(rule_set.match(t)) for t in texts) / len(texts)
+        naive = "-"
+        if count <= NAIVE_MAX_RULES:
+            compiled = {r.name: [re.compile(s, re.IGNORECASE) for s in r.regex] for r in rules}
+            naive = f"{1e6 * best_time(lambda t: naive_match(rules, compiled, t), texts, args.repeat):,.1f}"
+        print(f"{count:>6}{compile_ms:>12.1f}{1e6 * per_post:>10.1f}{naive:>15}{hits:>11.1f}")
+
+    # the substring scan vs the trie regex, forced either way, around SCAN_MAX_PHRASES
+    print(f"\n{'phrases':>8}{'scan us/post':>14}{'trie us/post':>14}  (default: scan up to {SCAN_MAX_PHRASES})")
+    for count in PHRASE_COUNTS:
+        rules = make_rules(vocab, count // PHRASES_PER_RULE, 0)
+        scan = best_time(RuleSet(rules, scan_max_phrases=10 ** 9).match, texts, args.repeat)
+        trie = best_time(RuleSet(rules, scan_max_phrases=0).match, texts, args.repeat)
+        print(f"{count:>8}{1e6 * scan:>14.1f}{1e6 * trie:>14.1f}")
+
+    # regex rules are one pass each: cost per regex rule should stay flat as they grow
+    print(f"\n{'regex':>6}{'compile ms':>12}{'us/post':>10}{'us/rule':>10}")
+    for count in REGEX_COUNTS:
+        start = time.perf_counter()
+        rule_set = RuleSet(make_rules(vocab, 0, count))
+        compile_ms = 1000 * (time.perf_counter() - start)
+        per_post = best_time(rule_set.match, texts, max(args.repeat // 2, 1))
+        print(f"{count:>6}{compile_ms:>12.1f}{1e6 * per_post:>10.1f}{1e6 * per_post / count:>10.2f}")
+
+    # cost per character should stay flat as posts get longer (one pass over the text)
+    rule_set = RuleSet(make_rules(vocab, RULE_COUNTS[-1], args.regex))
+    joined = "\n".join(texts)
+    print(f"\n{'chars':>6}{'us/post':>10}{'ns/char':>10}  ({RULE_COUNTS[-1]} rules)")
+    for length in POST_LENGTHS:
+        posts = [joined[i:i + length] for i in range(0, max(len(joined) - length, 1), length)][:200]
+        per_post = best_time(rule_set.match, posts, args.repeat)
+        print(f"{length:>6}{1e6 * per_post:>10.1f}{1e9 * per_post / length:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
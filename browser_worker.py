@@ -0,0 +1,327 @@
+# browser_worker.py - Trump Watcher
+# Headless browser in a supervised child process: pipe RPC with deadlines, heartbeat, kill-and-respawn
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+
+import psutil
+
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_OP_DEADLINE = 30.0        # seconds any one page operation may take before the worker is killed
+LAUNCH_DEADLINE = 60.0            # browser launch + first navigation
+CLOSE_DEADLINE = 10.0
+DEADLINE_MARGIN = 5.0             # added to an operation's own Playwright timeout
+HEARTBEAT_INTERVAL = 1.0          # worker -> shared timestamp
+HEARTBEAT_TIMEOUT = 15.0          # no heartbeat for this long = the worker process is wedged
+REPLY_POLL = 0.5                  # seconds between liveness checks while waiting for a reply
+MAX_RESTARTS = 5                  # respawns allowed per RESTART_WINDOW
+RESTART_WINDOW = 10 * 60
+PAGE_METHODS = ("evaluate", "reload", "goto", "wait_for_function")
+
+# Spawn (not fork) everywhere: the parent has threads, and Windows has nothing else
+_mp = multiprocessing.get_context("spawn")
+
+worker_stats = {
+    "spawns": 0,        # worker processes started
+    "restarts": 0,      # respawns after a hang / crash
+    "hangs": 0,         # operations that missed their deadline or lost the heartbeat
+    "crashes": 0,       # worker processes that died on their own
+    "calls": 0,
+}
+
+
+class BrowserWorkerError(Exception):
+    # A page operation failed in (or could not reach) the worker
+    pass
+
+
+class BrowserHangError(BrowserWorkerError):
+    # Deadline missed or heartbeat lost; the worker tree has been killed
+    pass
+
+
+class BrowserCrashError(BrowserWorkerError):
+    # The worker process died or its pipe broke mid-call
+    pass
+
+
+class RestartLimitError(BrowserWorkerError):
+    # Too many respawns recently; the caller should back off
+    pass
+
+
+# ----------------------------
+# Child process
+# ----------------------------
+def _beat(heartbeat, stop: threading.Event) -> None:
+    while not stop.is_set():
+        heartbeat.value = time.time()
+        stop.wait(HEARTBEAT_INTERVAL)
+
+
+def _serve(conn, page) -> None:
+    # Answer ("call", ...) messages with page until ("close",) or the pipe closes
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message[0] == "close":
+            break
+        _, method, args, kwargs = message
+        try:
+            if method not in PAGE_METHODS:
+                raise ValueError(f"Unsupported page method {method!r}")
+            result = getattr(page, method)(*args, **kwargs)
+            # navigation responses and JS handles do not cross the pipe
+            conn.send(("ok", result if method == "evaluate" else None))
+        except Exception as e:
+            conn.send(("error", type(e).__name__, str(e)))
+
+
+def _worker_main(conn, heartbeat, options: dict) -> None:
+    """
+    Worker process entry point: launch Chromium, open the page, then serve
+    ("call", method, args, kwargs) / ("close",) messages until closed.
+    Replies are ("ok", result) or ("error", exception type, message).
+    """
+    stop = threading.Event()
+    threading.Thread(target=_beat, args=(heartbeat, stop), name="heartbeat", daemon=True).start()
+    playwright = browser = None
+    try:
+        from playwright.sync_api import sync_playwright
+        playwright = sync_playwright().start()
+        browser = playwright.chromium.launch(
+            executable_path=options.get("executable_path"), headless=True, args=options.get("args") or [])
+        context = browser.new_context(extra_http_headers={"user-agent": options.get("user_agent", "")})
+        page = context.new_page()
+        page.set_default_timeout(options["page_timeout"] * 1000)
+        blocked = tuple(options.get("blocked_resource_types") or ())
+
+        def _block(route, req):
+            if req.resource_type in blocked:
+                return route.abort()
+            return route.continue_()
+        page.route("**/*", _block)
+        if options.get("url"):
+            page.goto(options["url"], wait_until="domcontentloaded")
+        conn.send(("ready", os.getpid()))
+    except Exception as e:
+        conn.send(("error", type(e).__name__, str(e)))
+        stop.set()
+        return
+
+    _serve(conn, page)
+    try:
+        browser.close()
+        playwright.stop()
+    except Exception:
+        pass
+    stop.set()
+    try:
+        conn.send(("closed", None))
+    except (OSError, EOFError):
+        pass
+
+
+# ----------------------------
+# Supervisor (monitor side)
+# ----------------------------
+class BrowserWorker:
+    """
+    Owns one worker process and its browser tree. Every call has a
+    deadline; a missed deadline, a lost heartbeat or a dead worker kills
+    the whole process tree (psutil) and respawns it, at most MAX_RESTARTS
+    times per RESTART_WINDOW. A stuck page costs one deadline: the call
+    fails, and the next one runs on a fresh worker.
+    """
+
+    def __init__(self, options: dict, op_deadline: float = DEFAULT_OP_DEADLINE,
+                 launch_deadline: float = LAUNCH_DEADLINE, on_spawn=None, target=_worker_main):
+        # Playwright's own timeout fires first, so a slow page fails cleanly before the deadline kills it
+        self.options = {"page_timeout": max(op_deadline - DEADLINE_MARGIN, 1), **options}
+        self.op_deadline = op_deadline
+        self.launch_deadline = launch_deadline
+        self.on_spawn = on_spawn              # callback() after each (re)spawn, e.g. sampler.refresh_roots
+        self.target = target                  # child entry point(conn, heartbeat, options); must be importable
+        self._process = None
+        self._conn = None
+        self._heartbeat = _mp.Value("d", 0.0, lock=False)
+        self._restarts = deque()
+        self._lock = threading.Lock()
+        self.last_error = None
+
+    @property
+    def pid(self):
+        return self._process.pid if self._process else None
+
+    def start(self) -> None:
+        with self._lock:
+            self._spawn()
+
+    def _spawn(self) -> None:
+        parent_conn, child_conn = _mp.Pipe()
+        self._heartbeat.value = time.time()
+        process = _mp.Process(target=self.target, args=(child_conn, self._heartbeat, self.options),
+                              name="browser-worker", daemon=True)
+        process.start()
+        child_conn.close()
+        self._process, self._conn = process, parent_conn
+        worker_stats["spawns"] += 1
+        try:
+            reply = self._reply(self.launch_deadline, "launch")
+        except BrowserWorkerError:
+            self._kill_tree()
+            raise
+        if reply[0] != "ready":
+            self._kill_tree()
+            raise BrowserWorkerError(f"Browser worker failed to start: {reply[1]}: {reply[2]}")
+        log.debug("Browser worker %s ready", process.pid)
+        if self.on_spawn:
+            self.on_spawn()
+
+    def _reply(self, deadline: float, what: str):
+        # Wait for the next message, watching the deadline, the heartbeat and the process
+        until = time.monotonic() + deadline
+        while True:
+            try:
+                if self._conn.poll(REPLY_POLL):
+                    return self._conn.recv()
+            except (EOFError, OSError):
+                pass
+            if not self._process.is_alive():
+                worker_stats["crashes"] += 1
+                exitcode = self._process.exitcode
+                self._kill_tree()
+                raise BrowserCrashError(f"Browser worker died during {what} (exit {exitcode})")
+            if time.monotonic() >= until:
+                worker_stats["hangs"] += 1
+                self._kill_tree()
+                raise BrowserHangError(f"{what} missed its {deadline:.0f}s deadline; worker killed")
+            if time.time() - self._heartbeat.value > HEARTBEAT_TIMEOUT:
+                worker_stats["hangs"] += 1
+                self._kill_tree()
+                raise BrowserHangError(f"Browser worker stopped responding during {what}; worker killed")
+
+    def _kill_tree(self) -> None:
+        # Kill the worker and everything under it (Playwright driver, headless_shell processes)
+        process, self._process = self._process, None
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+        if process is None:
+            return
+        try:
+            root = psutil.Process(process.pid)
+            procs = root.children(recursive=True) + [root]
+        except psutil.NoSuchProcess:
+            procs = []
+        for proc in procs:
+            try:
+                proc.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        _, alive = psutil.wait_procs(procs, timeout=5)
+        for proc in alive:
+            log.warning("Browser process %s survived kill", proc.pid)
+        process.join(1)
+
+    def _restart(self, reason: str) -> None:
+        now = time.monotonic()
+        while self._restarts and now - self._restarts[0] > RESTART_WINDOW:
+            self._restarts.popleft()
+        if len(self._restarts) >= MAX_RESTARTS:
+            raise RestartLimitError(f"Browser worker restarted {len(self._restarts)} times in "
+                                    f"{RESTART_WINDOW // 60} min; not restarting yet ({reason})")
+        self._restarts.append(now)
+        worker_stats["restarts"] += 1
+        log.warning("Restarting browser worker: %s", reason)
+        self._kill_tree()
+        self._spawn()
+
+    def call(self, method: str, *args, deadline: float = None, **kwargs):
+        """
+        Run page.<method>(*args, **kwargs) in the worker and return its
+        (picklable) result. A hang raises BrowserHangError after one
+        deadline, with the tree already killed; the next call respawns. A
+        worker that crashed is respawned and the call retried once.
+        """
+        deadline = deadline or self.op_deadline
+        with self._lock:
+            worker_stats["calls"] += 1
+            for attempt in (1, 2):
+                if self._process is None:
+                    self._restart(self.last_error or "worker not running")
+                try:
+                    try:
+                        self._conn.send(("call", method, args, kwargs))
+                    except (OSError, EOFError) as e:
+                        self._kill_tree()
+                        raise BrowserCrashError(f"Browser worker pipe broken during {method}: {e}")
+                    reply = self._reply(deadline, method)
+                except BrowserWorkerError as e:
+                    self.last_error = str(e)
+                    log.warning("%s", e)
+                    if attempt == 2 or not isinstance(e, BrowserCrashError):
+                        raise
+                    continue
+                if reply[0] == "ok":
+                    return reply[1]
+                raise BrowserWorkerError(f"{reply[1]}: {reply[2]}")
+
+    def close(self) -> None:
+        # Ask the worker to close its browser; kill the tree if it does not within CLOSE_DEADLINE
+        with self._lock:
+            if self._process is None:
+                return
+            try:
+                self._conn.send(("close",))
+                self._reply(CLOSE_DEADLINE, "close")
+                self._process.join(CLOSE_DEADLINE)
+            except (BrowserWorkerError, OSError, EOFError) as e:
+                log.warning("Browser worker did not close cleanly: %s", e)
+            self._kill_tree()
+
+
+class RemotePage:
+    """
+    The subset of the Playwright Page API the monitor uses (evaluate, goto,
+    reload, wait_for_function), forwarded to a BrowserWorker. Each call's
+    deadline is its own Playwright timeout plus a margin, or the worker's
+    default.
+    """
+
+    def __init__(self, worker: BrowserWorker):
+        self.worker = worker
+
+    def evaluate(self, expression: str, arg=None):
+        return self.worker.call("evaluate", expression, arg)
+
+    def goto(self, url: str, **kwargs):
+        return self.worker.call("goto", url, deadline=self._deadline(kwargs), **kwargs)
+
+    def reload(self, **kwargs):
+        return self.worker.call("reload", deadline=self._deadline(kwargs), **kwargs)
+
+    def wait_for_function(self, expression: str, arg=None, timeout: float = None):
+        return self.worker.call("wait_for_function", expression, arg=arg, timeout=timeout,
+                                deadline=self._deadline({"timeout": timeout}))
+
+    def _deadline(self, kwargs: dict):
+        timeout = kwargs.get("timeout")
+        return timeout / 1000 + DEADLINE_MARGIN if timeout else None
+
+
+def worker_summary() -> str:
+    s = worker_stats
+    return (f"browser worker: {s['spawns']} spawns, {s['restarts']} restarts, {s['hangs']} hangs, "
+            f"{s['crashes']} crashes, {s['calls']} calls")
@@ -0,0 +1,170 @@
+# catchup.py - Trump Watcher
+# Gap recovery: after an outage, crawl the timeline back to the last post we handled
+
+import json
+import os
+import threading
+import time
+
+from extraction import scrape_feed
+from readiness import SCROLL_JS, min_statuses, wait_for
+from truth_api import status_to_post
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_MAX_PAGES = 20            # scroll steps / API pages per catch-up
+DEFAULT_MAX_SECONDS = 90          # wall-clock budget per catch-up
+SCROLL_WAIT = 5                   # seconds to wait for more statuses after each scroll
+API_PAGE_LIMIT = 40
+GAP_FACTOR = 1.5                  # a gap is > this many poll intervals (covers jitter + poll time)
+
+
+def id_newer(status_id: str, last_id: str) -> bool:
+    # Status ids are increasing integers; anything else can only be compared for equality
+    if not status_id:
+        return False
+    if not last_id:
+        return True
+    if status_id.isdigit() and last_id.isdigit():
+        return int(status_id) > int(last_id)
+    return status_id != last_id
+
+
+class CatchupState:
+    """
+    Persisted high-water mark: the newest status id handled and the wall
+    time of the last successful poll. Wall time (not monotonic) so a
+    machine that slept shows up as a gap. due() is True once the last
+    poll is further back than gap_threshold seconds.
+    """
+
+    def __init__(self, path: str = None, gap_threshold: float = 60.0):
+        self.path = path
+        self.gap_threshold = gap_threshold
+        self.last_id = None
+        self.last_poll = None
+        self.catchups = 0
+        self.recovered = 0
+        self.truncated = 0            # catch-ups that hit a cap before reaching last_id
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.last_id = data.get("last_id") or None
+            self.last_poll = float(data["last_poll"]) if data.get("last_poll") else None
+        except (OSError, ValueError, TypeError) as e:
+            log.warning("Catch-up state not loaded (%s); starting fresh.", e)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = {"last_id": self.last_id, "last_poll": self.last_poll}
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log.warning("Failed to save catch-up state: %s", e)
+
+    def gap(self) -> float:
+        # Seconds since the last successful poll (0 if there never was one)
+        return time.time() - self.last_poll if self.last_poll else 0.0
+
+    def due(self) -> bool:
+        return bool(self.last_id) and self.gap() > self.gap_threshold
+
+    def observe(self, posts: list) -> None:
+        # Advance last_id to the newest non-pinned status among handled posts
+        with self._lock:
+            for post in posts:
+                status_id = str(post.get("id") or "")
+                if not post.get("pinned") and id_newer(status_id, self.last_id):
+                    self.last_id = status_id
+
+    def mark_poll(self) -> None:
+        self.last_poll = time.time()
+        self.save()
+
+    def record(self, recovered: int, complete: bool) -> None:
+        self.catchups += 1
+        self.recovered += recovered
+        if not complete:
+            self.truncated += 1
+
+    def summary(self) -> str:
+        return (f"catch-up: {self.catchups} runs, {self.recovered} statuses recovered, "
+                f"{self.truncated} stopped at a cap")
+
+
+# ----------------------------
+# Crawlers (both return statuses newer than last_id, newest first, and
+# whether last_id was reached)
+# ----------------------------
+def crawl_feed(page, last_id: str, max_pages: int = DEFAULT_MAX_PAGES,
+               max_seconds: float = DEFAULT_MAX_SECONDS, timer=None):
+    """
+    Scroll the loaded feed down step by step, collecting statuses by id,
+    until one at or below last_id is in view, the feed stops growing, or a
+    cap is hit. Statuses are keyed by id so a virtualised list that drops
+    items off the top loses nothing already read.
+    """
+    deadline = time.monotonic() + max_seconds
+    found = {}
+    order = []
+    for step in range(max_pages + 1):
+        before = len(found)
+        reached = False
+        posts = scrape_feed(page)
+        for post in posts:
+            status_id = str(post.get("id") or "")
+            if post.get("pinned"):
+                continue
+            if status_id and not id_newer(status_id, last_id):
+                reached = True
+                continue
+            key = status_id or post.get("text", "")
+            if key not in found:
+                found[key] = post
+                order.append(key)
+        if reached:
+            return [found[k] for k in order], True
+        if step == max_pages or time.monotonic() >= deadline:
+            break
+        if step and len(found) == before:
+            log.debug("Catch-up: feed stopped growing after %s scrolls", step)
+            break
+        non_pinned = sum(1 for p in posts if not p.get("pinned"))
+        page.evaluate(SCROLL_JS)
+        wait_for(page, min_statuses(non_pinned + 1, min(SCROLL_WAIT, max(deadline - time.monotonic(), 0.1))),
+                 timer)
+    return [found[k] for k in order], False
+
+
+def crawl_api(client, last_id: str, max_pages: int = DEFAULT_MAX_PAGES,
+              max_seconds: float = DEFAULT_MAX_SECONDS):
+    # Page backwards with since_id=last_id / max_id until an empty page
+    deadline = time.monotonic() + max_seconds
+    posts = []
+    max_id = None
+    for _ in range(max_pages):
+        statuses = client.fetch_statuses(since_id=last_id, max_id=max_id, limit=API_PAGE_LIMIT) or []
+        page_posts = [status_to_post(s) for s in statuses]
+        posts.extend(p for p in page_posts if id_newer(p["id"], last_id))
+        ids = [p["id"] for p in page_posts if p["id"]]
+        if not ids or len(statuses) < API_PAGE_LIMIT:
+            return posts, True
+        max_id = min(ids, key=lambda i: int(i) if i.isdigit() else 0)
+        if time.monotonic() >= deadline:
+            break
+    return posts, False
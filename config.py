@@ -0,0 +1,169 @@
+# config.py - Trump Watcher
+# App identity, constants and command-line options (no Windows-only imports)
+
+import os
+import sys
+
+from truth_api import API_BASE_URL
+
+# ----------------------------
+# App identity & shortcut config
+# ----------------------------
+APP_ID        = "TrumpWatcher"        # AppUserModelID for toasts
+SHORTCUT_NAME = f"{APP_ID}.lnk"       # name of the Start-Menu shortcut
+ICON_REL_PATH = "icon/trump_watch_icon.ico"  # relative path to your .ico
+
+# ----------------------------
+# Constants
+# ----------------------------
+TRUTH_URL = "https://truthsocial.com/@realDonaldTrump"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36 Edg/135.0.0.0"
+)
+POLL_INTERVAL    = 30        # seconds between polls
+RESTART_AFTER_FAILURES = 3    # relaunch the browser after this many failed polls in a row
+MIN_READY_POSTS  = 2          # a load is ready once this many non-pinned posts are in the DOM
+READY_TIMEOUT    = 10         # seconds to wait for that before scrolling and retrying
+FRESH_PAGE_MAX_AGE = 5        # a page loaded this recently is polled without another reload
+# Per-user data directory for state that survives restarts
+APP_DATA_DIR = os.path.join(
+    os.getenv("APPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "TrumpWatcher"
+)
+SEEN_STORE_PATH = os.path.join(APP_DATA_DIR, "seen_posts.bin")
+SIMHASH_INDEX_PATH = os.path.join(APP_DATA_DIR, "simhash_index.jsonl")
+
+# ----------------------------
+# Headless Browser Args and resource control
+# ----------------------------
+# Optional Chromium launch flags
+BROWSER_ARGS = [
+    "--disable-gpu",                # drop the GPU process
+    "--disable-extensions",         # drop extension helper
+    "--disable-dev-shm-usage",      # reduce shared-memory usage
+    "--renderer-process-limit=1"    # only one renderer (instead of 3)
+]
+
+BLOCKED_RESOURCE_TYPES = ["image", "font", "media"]
+
+# Browser rotation thresholds (0 disables a trigger); see rotation.py
+MAX_PAGE_AGE     = 60 * 60    # seconds a browser may live regardless of memory
+MAX_HEADLESS_RSS = 800        # MB across headless_shell processes
+MAX_PROCESS_RSS  = 400        # MB for TrumpWatcher itself
+
+# ----------------------------
+# Debug flag setting
+# ----------------------------
+
+DEBUG_MODE = "--debug" in sys.argv
+
+# ----------------------------
+# Command-line options
+# ----------------------------
+def get_arg_value(name: str, default=None):
+    # Return the value of a --name=value argument, or default
+    prefix = name + "="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return default
+
+# Headless service: no tray, toasts or Start-Menu shortcut; runs in the foreground until SIGINT/SIGTERM
+DAEMON_MODE = "--daemon" in sys.argv
+
+# Poll the statuses JSON API instead of a headless browser (falls back if blocked)
+USE_API = "--api" in sys.argv
+API_BASE = get_arg_value("--api-base", API_BASE_URL)
+
+# Watch several accounts on one shared browser: --accounts=realDonaldTrump,other:120
+# (an optional :seconds suffix sets that account's poll interval)
+ACCOUNTS = [a.strip().lstrip("@") for a in get_arg_value("--accounts", "").split(",") if a.strip()]
+ACCOUNT_CONCURRENCY = int(get_arg_value("--concurrency", "4"))
+
+# Override the rotation thresholds: --max-page-age=S --max-browser-mb=MB --max-process-mb=MB
+MAX_PAGE_AGE = float(get_arg_value("--max-page-age", MAX_PAGE_AGE))
+MAX_HEADLESS_RSS = float(get_arg_value("--max-browser-mb", MAX_HEADLESS_RSS))
+MAX_PROCESS_RSS = float(get_arg_value("--max-process-mb", MAX_PROCESS_RSS))
+
+# Isolated mode: the browser runs in a supervised worker process; every page operation has a
+# deadline (--op-deadline=S) and a hung worker's whole process tree is killed and respawned.
+# Sniff and live mode need in-process page callbacks, so they are off in isolated mode.
+ISOLATED_MODE = "--isolated" in sys.argv
+WORKER_OP_DEADLINE = float(get_arg_value("--op-deadline", "30"))
+
+# Read posts from the page's own timeline API responses; DOM scraping becomes the fallback
+SNIFF_MODE = "--sniff" in sys.argv and not ISOLATED_MODE
+
+# Include a short word diff in "Updated post" notifications
+SHOW_EDIT_DIFF = "--no-edit-diff" not in sys.argv
+
+# Live mode: keep the page open and let a MutationObserver push new posts;
+# full reloads become a slow heartbeat
+LIVE_MODE = "--live" in sys.argv and not ISOLATED_MODE
+LIVE_PUMP_INTERVAL = 2          # seconds between checks for pushed posts
+LIVE_HEARTBEAT = 5 * 60         # seconds between full reloads in live mode
+
+# Adaptive polling: faster after a detection and in historically busy hours
+ADAPTIVE_MODE = "--adaptive" in sys.argv
+MIN_POLL_INTERVAL = float(get_arg_value("--min-interval", "10"))
+MAX_POLL_INTERVAL = float(get_arg_value("--max-interval", "300"))
+
+# Notifications: backend (toast / stdout / none), burst coalescing window and toast rate limit
+NOTIFY_BACKEND = get_arg_value("--notify", "toast" if sys.platform == "win32" and not DAEMON_MODE else "stdout")
+COALESCE_WINDOW = float(get_arg_value("--coalesce-window", "3"))
+MAX_TOASTS_PER_MINUTE = int(get_arg_value("--max-toasts-per-minute", "6"))
+
+# Logging: --debug lowers the level to DEBUG and keeps a rotating posts log in APP_DATA_DIR;
+# --log-json writes JSON lines, --log-file=PATH also writes a rotating log file
+LOG_JSON = "--log-json" in sys.argv
+LOG_FILE = get_arg_value("--log-file")
+POSTS_LOG_PATH = os.path.join(APP_DATA_DIR, "posts_log.txt")
+
+# Delivery sinks: forward every detected post to webhooks / a JSON-lines file / a command
+WEBHOOK_URLS = [u for u in get_arg_value("--webhook", "").split(",") if u]
+WEBHOOK_FORMAT = get_arg_value("--webhook-format", "json")
+SINK_FILE = get_arg_value("--sink-file")
+SINK_COMMAND = get_arg_value("--sink-command")
+
+# Rules file (JSON): blacklist phrases that suppress posts, keyword / regex watchlists that
+# raise a post's notification priority or tag it; used when present in APP_DATA_DIR or given
+RULES_PATH = get_arg_value("--rules")
+if RULES_PATH is None and os.path.exists(os.path.join(APP_DATA_DIR, "rules.json")):
+    RULES_PATH = os.path.join(APP_DATA_DIR, "rules.json")
+
+# Local archive of every post seen (SQLite + full-text index); search it with `python archive.py search ...`
+ARCHIVE_MODE = "--no-archive" not in sys.argv
+ARCHIVE_PATH = get_arg_value("--archive", os.path.join(APP_DATA_DIR, "archive.db"))
+
+# Gap recovery: after an outage (crash, sleep, error backoff) crawl back to the last handled
+# post and notify what was missed, oldest first; capped per run by scroll steps / API pages and time
+CATCHUP_MODE = "--no-catchup" not in sys.argv
+CATCHUP_MAX_PAGES = int(get_arg_value("--catchup-pages", "20"))
+CATCHUP_MAX_SECONDS = float(get_arg_value("--catchup-seconds", "90"))
+CATCHUP_STATE_PATH = os.path.join(APP_DATA_DIR, "catchup.json")
+
+# Prometheus / OpenMetrics endpoint on 127.0.0.1:PORT/metrics (0 = off)
+METRICS_PORT = int(get_arg_value("--metrics-port", "0"))
+
+# Phase tracing: record poll / browser spans into a ring buffer, saved as Chrome trace JSON
+# on exit, from the tray menu or on SIGUSR1 (--daemon); --trace=PATH picks the file
+TRACE_PATH = get_arg_value("--trace")
+TRACE_MODE = "--trace" in sys.argv or TRACE_PATH is not None
+
+# ----------------------------
+# Bundled resources
+# ----------------------------
+# Resource path management
+def resource_path(relative_path: str) -> str:
+    # Resolve a resource path that works both in development and when bundled
+    try:
+        base_path = sys._MEIPASS  # type: ignore (PyInstaller bundle)
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+# Bundled Windows headless shell; elsewhere (Linux, containers, dev checkouts) Playwright's own browser
+HEADLESS_PATH = resource_path("ms-playwright/chromium_headless_shell/chrome-win/headless_shell.exe")
+if not os.path.exists(HEADLESS_PATH):
+    HEADLESS_PATH = None
@@ -0,0 +1,316 @@
+# extraction.py - Trump Watcher
+# In-page post extraction: one page.evaluate per poll returns structured posts
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+
+from rules import Rule, RuleSet, SUPPRESS
+
+# ----------------------------
+# Constants
+# ----------------------------
+STATUS_SELECTOR = "div.status__wrapper"
+
+# Substrings that mark cookie banners / sign-up prompts rather than real posts
+BOILERPLATE = (
+    "New to Truth?", "Join Truth Social", "Create Account",
+    "Truth Social uses cookies", "session cookies",
+    "automated attacks", "Learn more",
+)
+
+# Compiled once: standalone URL / domain lines, and punctuation stripped for line dedupe
+URL_LINE_RE = re.compile(r'^(https?://|www\.|[\w\-]+\.\w{2,})')
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+WATERMARK_SIZE = 50              # recent status ids (+ fingerprints) sent to the page per poll
+
+VIDEO_PREFIX = "[Video post]"
+IMAGE_PREFIX = "[Image post]"
+
+# ----------------------------
+# In-page JavaScript
+# ----------------------------
+# Turns a single div.status__wrapper into a plain object. Only the outermost
+# text-bearing element is read, so a <span> inside a <p> (or a <p> inside a
+# <blockquote>) is not collected twice.
+STATUS_EXTRACT_FN = r"""
+(block) => {
+    const TAGS = "p, span, a, h1, h2, h3, blockquote";
+    const stripQuery = (u) => (u || "").split("?")[0];
+
+    const pinned = block.innerHTML.includes("Pinned Truth");
+    const author = ((block.innerText || "").trim().split("\n")[0] || "").trim();
+
+    // status id: explicit data attribute, else the post permalink
+    let id = block.getAttribute("data-id") || "";
+    if (!id) {
+        for (const link of block.querySelectorAll('a[href*="/posts/"]')) {
+            const m = (link.getAttribute("href") || "").match(/\/posts\/(\d+)/);
+            if (m) { id = m[1]; break; }
+        }
+    }
+
+    const timeEl = block.querySelector("time");
+    const timestamp = timeEl
+        ? (timeEl.getAttribute("datetime") || timeEl.getAttribute("title") || "")
+        : "";
+
+    const parts = [];
+    for (const el of block.querySelectorAll(TAGS)) {
+        const outer = el.parentElement && el.parentElement.closest(TAGS);
+        if (outer && block.contains(outer)) continue;
+        const t = (el.innerText || "").trim();
+        if (t.length > 10) parts.push(t);
+    }
+
+    const media = [];
+    for (const v of block.querySelectorAll("video")) {
+        const src = v.querySelector("source");
+        const url = stripQuery((src && src.getAttribute("src")) || v.getAttribute("src"));
+        if (url) media.push({type: "video", url});
+    }
+    for (const img of block.querySelectorAll("img")) {
+        const url = stripQuery(img.getAttribute("src"));
+        if (url) media.push({type: "image", url});
+    }
+
+    return {id, author, text: parts.join("\n"), media, pinned, timestamp};
+}
+"""
+
+# Extract every status wrapper currently in the DOM in a single round trip
+EXTRACT_POSTS_JS = (
+    "() => Array.from(document.querySelectorAll(" + repr(STATUS_SELECTOR) + "), "
+    + STATUS_EXTRACT_FN.strip() + ")"
+)
+
+# Top-of-feed fast path: arg is {status id: fingerprint} for recently processed
+# statuses. Blocks are extracted newest first until the first one whose id is
+# known and whose fingerprint (FNV-1a of its text + media) is unchanged - on an
+# unchanged feed that is the very first block. Edited posts keep their id but
+# get a new fingerprint, so they are still returned.
+EXTRACT_NEW_POSTS_JS = (
+    "(known) => {\n"
+    "    const extract = " + STATUS_EXTRACT_FN.strip() + ";\n"
+    + r"""
+    const fingerprint = (post) => {
+        const s = post.text + "\u0000" + post.media.map((m) => m.url).join("\u0000");
+        let h = 0x811c9dc5;
+        for (let i = 0; i < s.length; i++) {
+            h ^= s.charCodeAt(i);
+            h = Math.imul(h, 0x01000193);
+        }
+        return (h >>> 0).toString(16);
+    };
+    const posts = [];
+    let scanned = 0, stopped = false;
+    for (const block of document.querySelectorAll(""" + repr(STATUS_SELECTOR) + r""")) {
+        const post = extract(block);
+        scanned++;
+        if (post.pinned) continue;
+        post.fp = fingerprint(post);
+        if (post.id && known[post.id] === post.fp) { stopped = true; break; }
+        posts.push(post);
+    }
+    return {posts, scanned, stopped};
+}"""
+)
+
+# ----------------------------
+# Per-poll timing counters
+# ----------------------------
+extract_stats = {
+    "polls": 0,        # number of scrape_feed() calls
+    "last_ms": 0.0,    # duration of the most recent extract phase
+    "total_ms": 0.0,   # cumulative extract time
+    "max_ms": 0.0,     # slowest extract phase seen
+}
+
+
+def record_extract_time(elapsed_ms: float) -> None:
+    extract_stats["polls"] += 1
+    extract_stats["last_ms"] = elapsed_ms
+    extract_stats["total_ms"] += elapsed_ms
+    extract_stats["max_ms"] = max(extract_stats["max_ms"], elapsed_ms)
+
+
+def extract_summary() -> str:
+    polls = extract_stats["polls"]
+    mean = extract_stats["total_ms"] / polls if polls else 0.0
+    return (f"extract phase: {polls} polls, last {extract_stats['last_ms']:.1f} ms, "
+            f"mean {mean:.1f} ms, max {extract_stats['max_ms']:.1f} ms")
+
+# ----------------------------
+# Extraction
+# ----------------------------
+def scrape_feed(page) -> list:
+    """
+    Return every status on the page as a dict with keys
+    id, author, text, media, pinned, timestamp - in one page.evaluate.
+    """
+    start = time.perf_counter()
+    posts = page.evaluate(EXTRACT_POSTS_JS) or []
+    record_extract_time((time.perf_counter() - start) * 1000)
+    return posts
+
+
+def scrape_new_posts(page, watermark: "FeedWatermark") -> list:
+    """
+    Like scrape_feed(), but only returns statuses newer than (or edited
+    since) the watermark, newest first; [] when the top of the feed is
+    unchanged. Call watermark.update() once the posts have been handled.
+    """
+    start = time.perf_counter()
+    result = page.evaluate(EXTRACT_NEW_POSTS_JS, watermark.known()) or {}
+    record_extract_time((time.perf_counter() - start) * 1000)
+    posts = result.get("posts") or []
+    watermark.record_scan(posts, result.get("scanned", 0), result.get("stopped", False))
+    return posts
+
+
+class FeedWatermark:
+    """
+    The most recently processed status ids with their in-page fingerprints
+    (newest last), used by scrape_new_posts() to stop scanning the feed at
+    the first unchanged status it has already handled. Also counts how often
+    a poll was answered by the top block alone (the fast path).
+    """
+
+    def __init__(self, size: int = WATERMARK_SIZE):
+        self.size = size
+        self._known = OrderedDict()
+        self.polls = 0
+        self.hits = 0            # polls where the top status was known and unchanged
+        self.blocks_scanned = 0
+        self.last_scanned = 0
+
+    def known(self) -> dict:
+        return dict(self._known)
+
+    def record_scan(self, posts: list, scanned: int, stopped: bool) -> None:
+        self.polls += 1
+        self.blocks_scanned += scanned
+        self.last_scanned = scanned
+        if stopped and not posts:
+            self.hits += 1
+
+    def update(self, posts: list) -> None:
+        # Remember handled posts (oldest first, so the newest end up at the end)
+        for post in reversed(posts):
+            if post.get("id") and post.get("fp"):
+                self._known.pop(post["id"], None)
+                self._known[post["id"]] = post["fp"]
+        while len(self._known) > self.size:
+            self._known.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        return self.hits / self.polls if self.polls else 0.0
+
+    def summary(self) -> str:
+        mean = self.blocks_scanned / self.polls if self.polls else 0.0
+        return (f"feed fast path: {self.hits}/{self.polls} polls unchanged at the top "
+                f"({100 * self.hit_rate():.0f}%), {mean:.1f} blocks scanned per poll")
+
+
+def post_raw_text(post: dict):
+    # Text if there is any, otherwise a video / image placeholder; None if empty
+    text = (post.get("text") or "").strip()
+    if text:
+        return text
+    media = post.get("media") or []
+    for kind, prefix in (("video", VIDEO_PREFIX), ("image", IMAGE_PREFIX)):
+        for item in media:
+            if item.get("type") == kind:
+                return f"{prefix} {item.get('url', '')}"
+    return None
+
+
+# Rules applied by prepare_post(); the monitor adds the user's rules (--rules) with set_rules()
+# (exact case, like the page's own banners: "we will learn more" in a post is not one)
+BOILERPLATE_RULE = Rule("boilerplate", SUPPRESS, phrases=BOILERPLATE, case_sensitive=True)
+rules = RuleSet([BOILERPLATE_RULE])
+
+
+def set_rules(rule_set: RuleSet) -> None:
+    global rules
+    rules = rule_set
+
+
+def find_boilerplate(text: str):
+    # Return the first suppressing rule's match in text, or None
+    hit = rules.check(text).suppressed_by
+    return hit.text if hit else None
+
+
+def is_media_placeholder(text: str) -> bool:
+    return text.startswith((VIDEO_PREFIX, IMAGE_PREFIX))
+
+
+# ----------------------------
+# Normalization & hashing
+# ----------------------------
+def normalize(text: str) -> str:
+    # Lowercase, strip punctuation, remove duplicate lines for hashing
+    lines = [line.strip() for line in text.splitlines()]
+    seen = set()
+    filtered = []
+    for line in lines:
+        if not line:
+            continue
+        # skip standalone URLs or domains
+        if len(line.split()) <= 1 and URL_LINE_RE.match(line):
+            continue
+        norm = PUNCTUATION_RE.sub('', line.lower())
+        if norm in seen:
+            continue
+        seen.add(norm)
+        filtered.append(line)
+    return "\n".join(filtered).strip()
+
+def hash_post(text: str) -> str:
+    # Compute SHA-256 hash of normalized text
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def status_key(post: dict):
+    # Dedupe key for the post's status id (same format as hash_post), or None
+    status_id = str(post.get("id") or "")
+    if not status_id:
+        return None
+    return hash_post("status:" + status_id)
+
+
+def prepare_post(post: dict, keep_short: bool = False):
+    """
+    Run one scraped post through the content filters and rules and hash it.
+    Returns (post + raw_text/normalized/hash, None), or (None, reason) if
+    the post should be skipped. Priority / tag rule hits add
+    post["priority"] = True / post["tags"]. With keep_short=True, tiny
+    text-only posts come back prepared with post["short"] = True (worth
+    archiving, not notifying).
+    """
+    raw_text = post_raw_text(post)
+    if raw_text is None:
+        return None, "No content found in block"
+
+    verdict = rules.check(raw_text)
+    if verdict.suppressed_by:
+        hit = verdict.suppressed_by
+        return None, f"Blacklisted content ({hit.text!r}, rule {hit.rule.name!r})"
+
+    # skip tiny text-only posts
+    short = len(raw_text.split()) < 3 and not is_media_placeholder(raw_text)
+    if short and not keep_short:
+        return None, "Very short text post"
+
+    normalized = normalize(raw_text)
+    prepared = dict(post, raw_text=raw_text, normalized=normalized, hash=hash_post(normalized))
+    if short:
+        prepared["short"] = True
+    if verdict.priority:
+        prepared["priority"] = True
+    if verdict.tags:
+        prepared["tags"] = verdict.tags
+    return prepared, None
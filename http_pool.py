@@ -0,0 +1,121 @@
+# http_pool.py - Trump Watcher
+# Small keep-alive HTTP(S) connection pool built on http.client
+
+import gzip
+import http.client
+import queue
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_TIMEOUT = 15          # seconds per request
+DEFAULT_POOL_SIZE = 2         # idle connections kept per pool
+
+
+class HttpResponse:
+    # Fully-read response so the connection can go straight back to the pool
+    def __init__(self, status: int, headers: dict, body: bytes, elapsed_ms: float):
+        self.status = status
+        self.headers = headers        # lower-cased header names
+        self.body = body
+        self.elapsed_ms = elapsed_ms
+
+    def header(self, name: str, default=None):
+        return self.headers.get(name.lower(), default)
+
+
+class HttpPool:
+    """
+    Reuses persistent connections to a single scheme://host:port.
+    Safe to share between threads; each request checks a connection out
+    of the pool and returns it afterwards (or drops it on error).
+    """
+
+    def __init__(self, base_url: str, size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT, default_headers: dict = None):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {base_url!r}")
+        self.base_url = base_url.rstrip("/")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.default_headers = dict(default_headers or {})
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "connections_opened": 0, "errors": 0, "bytes_in": 0}
+
+    def _new_connection(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.stats["connections_opened"] += 1
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _checkin(self, conn) -> None:
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(self, method: str, path: str, headers: dict = None, body: bytes = None) -> HttpResponse:
+        # Send one request; a stale pooled connection is retried once on a fresh one
+        all_headers = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+        all_headers.update(self.default_headers)
+        all_headers.update(headers or {})
+        url = self.base_path + path
+
+        conn, reused = self._checkout()
+        while True:
+            start = time.perf_counter()
+            try:
+                conn.request(method, url, body=body, headers=all_headers)
+                resp = conn.getresponse()
+                data = resp.read()
+                break
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if reused:
+                    # the server may have closed an idle keep-alive socket
+                    conn, reused = self._new_connection(), False
+                    continue
+                with self._lock:
+                    self.stats["errors"] += 1
+                raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_in"] += len(data)
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+
+        encoding = resp_headers.get("content-encoding", "")
+        if encoding == "gzip":
+            data = gzip.decompress(data)
+        elif encoding == "deflate":
+            data = zlib.decompress(data)
+
+        return HttpResponse(resp.status, resp_headers, data, elapsed_ms)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
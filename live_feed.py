@@ -0,0 +1,106 @@
+# live_feed.py - Trump Watcher
+# Push-style detection: a MutationObserver in the feed page hands new statuses to Python
+
+import threading
+import time
+
+from extraction import STATUS_EXTRACT_FN, STATUS_SELECTOR
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+LIVE_BINDING = "__trumpWatcherPush"   # window function exposed via expose_binding
+FLUSH_DELAY_MS = 250                  # let a freshly inserted status finish rendering
+
+# Installed as an init script (so it survives reloads) and evaluated once on
+# the current document. New or re-rendered status wrappers are batched and
+# pushed to Python as extracted post objects.
+LIVE_OBSERVER_JS = (
+    "(() => {\n"
+    "    if (window.__trumpWatcherObserver) return;\n"
+    "    const SEL = " + repr(STATUS_SELECTOR) + ";\n"
+    "    const extract = " + STATUS_EXTRACT_FN.strip() + ";\n"
+    "    const FLUSH_DELAY_MS = " + str(FLUSH_DELAY_MS) + ";\n"
+    "    const BINDING = " + repr(LIVE_BINDING) + ";\n"
+    + r"""
+    const pending = new Set();
+    let timer = null;
+
+    const flush = () => {
+        timer = null;
+        const posts = [];
+        for (const node of pending) {
+            if (node.isConnected) posts.push(extract(node));
+        }
+        pending.clear();
+        if (posts.length && window[BINDING]) window[BINDING](posts);
+    };
+
+    const collect = (node) => {
+        if (node.nodeType !== 1) return;
+        const wrapper = node.closest(SEL);
+        if (wrapper) { pending.add(wrapper); return; }
+        node.querySelectorAll(SEL).forEach((n) => pending.add(n));
+    };
+
+    const start = () => {
+        window.__trumpWatcherObserver = new MutationObserver((mutations) => {
+            for (const m of mutations) m.addedNodes.forEach(collect);
+            if (pending.size && !timer) timer = setTimeout(flush, FLUSH_DELAY_MS);
+        });
+        window.__trumpWatcherObserver.observe(document.body, {childList: true, subtree: true});
+    };
+
+    if (document.body) start();
+    else document.addEventListener("DOMContentLoaded", start);
+})();
+"""
+)
+
+
+class LiveFeed:
+    """
+    Keeps the feed page open and collects statuses pushed by the in-page
+    MutationObserver. With the sync Playwright API, binding callbacks are
+    only delivered while Playwright is servicing a call, so the monitor
+    calls pump() regularly and then drain()s what arrived.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self._pending = []
+        self._lock = threading.Lock()
+        self.installed_at = 0.0
+        self.pushes = 0
+        self.posts_pushed = 0
+        self.last_push = 0.0
+
+    def install(self) -> None:
+        self.page.expose_binding(LIVE_BINDING, self._on_push)
+        self.page.add_init_script(LIVE_OBSERVER_JS)
+        self.page.evaluate(LIVE_OBSERVER_JS)
+        self.installed_at = time.time()
+        log.debug("Live feed observer installed.")
+
+    def _on_push(self, source, posts) -> None:
+        with self._lock:
+            self._pending.append(posts or [])
+            self.pushes += 1
+            self.posts_pushed += len(posts or [])
+            self.last_push = time.time()
+
+    def pump(self, wait_ms: int = 50) -> None:
+        # Give Playwright a chance to dispatch queued binding calls
+        self.page.wait_for_timeout(wait_ms)
+
+    def drain(self) -> list:
+        # Everything pushed since the last drain, newest first like the feed
+        with self._lock:
+            batches, self._pending = self._pending, []
+        return [post for batch in reversed(batches) for post in batch]
+
+    def summary(self) -> str:
+        return f"live feed: {self.pushes} pushes, {self.posts_pushed} statuses pushed"
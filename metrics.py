@@ -0,0 +1,251 @@
+# metrics.py - Trump Watcher
+# Counters, gauges and histograms served in the Prometheus text format on localhost
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+METRICS_HOST = "127.0.0.1"            # never exposed beyond this machine
+METRICS_PATH = "/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _label_str(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# ----------------------------
+# Metric types
+# ----------------------------
+class _Metric:
+    """
+    Base for one metric family. Values are kept per label-value tuple;
+    every update takes a short lock so the monitor thread, worker threads
+    and the scrape thread can share a metric.
+
+    fn, when given, is called at scrape time instead of keeping a value:
+    it returns a number, or {label-value tuple: number} for labelled metrics.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), fn=None):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.fn = fn
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def _samples(self) -> list:
+        # [(suffix, label string, value)]
+        if self.fn is not None:
+            try:
+                result = self.fn()
+            except Exception as e:
+                log.debug("Metric %s callback failed: %s", self.name, e)
+                return []
+            if result is None:
+                return []
+            items = result.items() if isinstance(result, dict) else [((), result)]
+            return [("", _label_str(self.labels, key), value) for key, value in items]
+        with self._lock:
+            items = list(self._values.items())
+        return [("", _label_str(self.labels, key), value) for key, value in items]
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    # Monotonically increasing total
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    # Current value that can go up and down
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    # Cumulative buckets + _sum + _count, as Prometheus expects
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+        samples = []
+        for key, counts, total, count in items:
+            running = 0
+            for bound, n in zip(self.buckets, counts):
+                running += n
+                le = f'le="{_format_value(bound)}"'
+                samples.append(("_bucket", _label_str(self.labels, key, le), running))
+            samples.append(("_sum", _label_str(self.labels, key), total))
+            samples.append(("_count", _label_str(self.labels, key), count))
+        return samples
+
+
+class MetricsRegistry:
+    # Named metric families, rendered together for a scrape
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: tuple = (), fn=None) -> Counter:
+        return self._register(Counter(self.prefix + name, help_text, labels, fn))
+
+    def gauge(self, name: str, help_text: str, labels: tuple = (), fn=None) -> Gauge:
+        return self._register(Gauge(self.prefix + name, help_text, labels, fn))
+
+    def histogram(self, name: str, help_text: str, labels: tuple = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# ----------------------------
+# HTTP endpoint
+# ----------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None     # set on the per-server subclass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in (METRICS_PATH, "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        log.debug("metrics %s - %s", self.address_string(), fmt % args)
+
+
+class MetricsServer:
+    """
+    Serves registry.render() at http://127.0.0.1:<port>/metrics from a
+    daemon thread. Values are rendered per scrape, so callback metrics
+    cost nothing between scrapes.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = METRICS_HOST):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self) -> bool:
+        # Returns False (and logs) if the port cannot be bound
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        except OSError as e:
+            log.warning("Metrics endpoint disabled — cannot listen on %s:%s (%s)", self.host, self.port, e)
+            return False
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        log.info("Metrics at http://%s:%s%s", self.host, self.port, METRICS_PATH)
+        return True
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,992 @@
+# monitor.py - Trump Watcher
+# Monitoring core: browser / API polling, extraction, dedupe and notification dispatch.
+# Free of Windows-only imports so it runs headless on Linux (see --daemon).
+
+import gc
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import psutil
+from playwright.sync_api import sync_playwright
+
+import extraction
+from extraction import (
+    scrape_new_posts, FeedWatermark, prepare_post, status_key, VIDEO_PREFIX, IMAGE_PREFIX,
+)
+from truth_api import TruthApiClient, ApiBlockedError, DEFAULT_ACCOUNT
+from catchup import CatchupState, crawl_feed, crawl_api, GAP_FACTOR
+from seen_store import SeenStore
+from async_monitor import AsyncMonitor, AccountState
+from scheduler import PollScheduler, PollJob
+from adaptive import PostingRateModel, AdaptiveInterval, parse_timestamp
+from live_feed import LiveFeed
+from rotation import RotationManager
+from resource_sampler import ResourceSampler
+from response_sniffer import TimelineSniffer
+from readiness import PhaseTimer, load_feed, min_statuses
+from simhash_index import SimHashIndex, short_diff
+from sinks import SinkManager, SinkWorker, WebhookSink, FileSink, CommandSink, post_payload
+from archive import PostArchive, ArchiveSink, ArchiveError, archive_record
+from rules import RuleError, load_rules
+from browser_worker import BrowserWorker, RemotePage, worker_stats, worker_summary
+from notifier import (
+    NotificationDispatcher, Notice, ToastBackend, StdoutBackend, NullBackend,
+)
+from metrics import MetricsRegistry, MetricsServer
+from tracing import Tracer
+from watcher_log import get_logger, POSTS_LOGGER
+from config import (
+    ACCOUNTS, ACCOUNT_CONCURRENCY, ADAPTIVE_MODE, API_BASE, APP_DATA_DIR, APP_ID, ARCHIVE_MODE, ARCHIVE_PATH,
+    BLOCKED_RESOURCE_TYPES, BROWSER_ARGS, CATCHUP_MAX_PAGES, CATCHUP_MAX_SECONDS, CATCHUP_MODE,
+    CATCHUP_STATE_PATH, COALESCE_WINDOW, HEADLESS_PATH, ISOLATED_MODE,
+    LIVE_HEARTBEAT, LIVE_MODE, LIVE_PUMP_INTERVAL, MAX_HEADLESS_RSS, MAX_PAGE_AGE,
+    MAX_POLL_INTERVAL, MAX_PROCESS_RSS, METRICS_PORT, MAX_TOASTS_PER_MINUTE, MIN_POLL_INTERVAL,
+    MIN_READY_POSTS, NOTIFY_BACKEND, RULES_PATH, FRESH_PAGE_MAX_AGE, POLL_INTERVAL, READY_TIMEOUT, RESTART_AFTER_FAILURES,
+    SEEN_STORE_PATH, SHOW_EDIT_DIFF, SIMHASH_INDEX_PATH, SINK_COMMAND, SINK_FILE, SNIFF_MODE, TRACE_MODE, TRACE_PATH, TRUTH_URL,
+    USER_AGENT, USE_API, WEBHOOK_FORMAT, WEBHOOK_URLS, WORKER_OP_DEADLINE, resource_path,
+)
+
+log = get_logger(__name__)
+posts_log = logging.getLogger(POSTS_LOGGER)
+
+# ----------------------------
+# Global Variables
+# ----------------------------
+exit_flag = False               # Signals the background monitor loop (and tray icon) to stop and exit cleanly
+exit_event = threading.Event()  # Same signal as exit_flag, for waits that should wake up on Exit
+browser_context = None          # global handle for the currently running browser context
+
+# ----------------------------
+# Startup milestones (seconds since the process was created, so interpreter
+# start-up and the PyInstaller unpack are included)
+# ----------------------------
+PROCESS_START = psutil.Process(os.getpid()).create_time()
+startup_marks = {}
+
+# ----------------------------
+# Tracking run time and peak memory usage
+# ----------------------------
+RUN_START = datetime.now()
+MAX_HEADLESS_MEM = 0.0
+MAX_TRUMPWATCHER_MEM = 0.0
+
+# ----------------------------
+# Poll scheduler (shared by the API and browser loops)
+# ----------------------------
+scheduler = PollScheduler(on_complete=lambda job, ok, duration: record_poll(job, ok, duration))
+
+# Posting-rate model for --adaptive (None = fixed POLL_INTERVAL)
+adaptive_interval = None
+if ADAPTIVE_MODE:
+    adaptive_interval = AdaptiveInterval(
+        PostingRateModel(os.path.join(APP_DATA_DIR, "posting_rate.json")),
+        POLL_INTERVAL, MIN_POLL_INTERVAL, MAX_POLL_INTERVAL,
+    )
+
+# SimHash index of recent posts (persisted): near-duplicates are dropped, edits reported as updates
+similar_posts = SimHashIndex(SIMHASH_INDEX_PATH)
+
+# Span recorder for --trace (a no-op while disabled); the tray can toggle it at runtime
+tracer = Tracer(enabled=TRACE_MODE)
+
+# Recently processed status ids + fingerprints: unchanged polls stop at the top block
+watermark = FeedWatermark()
+
+# Newest handled status id + time of the last good poll (persisted) for gap recovery
+catchup = CatchupState(CATCHUP_STATE_PATH, gap_threshold=GAP_FACTOR * POLL_INTERVAL)
+
+# Per-phase wait times (navigate, readiness waits, scroll, extract) for slow-poll triage;
+# each phase is also a trace span
+phase_timer = PhaseTimer(tracer=tracer)
+
+# Background RSS / CPU / handle sampler for our process and our browser tree
+sampler = ResourceSampler(on_sample=lambda sample: update_peak_memory(sample))
+
+# Notification dispatcher (created by start_notifier(); notify() only enqueues)
+notifier = None
+
+# Set once Windows knows our AUMID shortcut: main clears it while the shortcut is
+# checked / rebuilt; the notifier's worker holds the first toast until then (the
+# monitor loop itself never waits for it)
+shortcut_ready = threading.Event()
+shortcut_ready.set()
+SHORTCUT_WAIT = 15.0              # seconds the first toast waits for the shortcut
+
+# Delivery sinks (created by start_sinks(); None when no sink flags are given or none could be
+# built); each sink has its own worker thread
+sinks = None
+
+# Local archive of every post seen (created by start_sinks()); rows are batched into SQLite on
+# the sink worker's thread
+archive = None
+
+# Boilerplate filter + the user's suppress / priority / tag rules, one compiled matcher
+if RULES_PATH:
+    try:
+        extraction.set_rules(load_rules(RULES_PATH, base=[extraction.BOILERPLATE_RULE]))
+    except RuleError as e:
+        log.warning("Rules not loaded, using the built-in boilerplate filter only: %s", e)
+
+# Browser rotation: restart only when thresholds are crossed, pre-warming the replacement
+rotation = RotationManager(
+    lambda: get_headless_memory_mb(), lambda: get_trumpwatcher_memory_mb(),
+    max_headless_mb=MAX_HEADLESS_RSS, max_process_mb=MAX_PROCESS_RSS,
+    max_page_age=MAX_PAGE_AGE, after_teardown=lambda: perform_garbage_collection(),
+)
+
+# ----------------------------
+# Seen-post store (persistent, bounded, thread-safe)
+# ----------------------------
+try:
+    seen_hashes = SeenStore(SEEN_STORE_PATH)
+except OSError as e:
+    log.warning("Could not open seen store at %s (%s); using memory only.", SEEN_STORE_PATH, e)
+    seen_hashes = SeenStore()
+
+# ----------------------------
+# Metrics (always recorded; served only with --metrics-port)
+# ----------------------------
+metrics = MetricsRegistry("trumpwatcher_")
+metrics_server = None
+poll_seconds = metrics.histogram("poll_duration_seconds", "Wall time of each scheduled job run", ("job",))
+poll_errors = metrics.counter("poll_errors_total", "Failed scheduled job runs", ("job",))
+last_poll_ok = metrics.gauge("last_poll_success_timestamp_seconds", "Unix time of the last successful poll")
+posts_detected = metrics.counter("posts_detected_total", "New or updated posts detected", ("label",))
+posts_notified = metrics.counter("posts_notified_total", "Posts included in a notification that was shown")
+detection_lag = metrics.histogram(
+    "detection_lag_seconds", "Notification time minus the post's own timestamp (new posts only)",
+    buckets=(5, 10, 15, 30, 45, 60, 90, 120, 300, 600, 1800, 3600),
+)
+metrics.gauge("consecutive_errors", "Consecutive failed runs per job", ("job",),
+              fn=lambda: {(name,): job.failures for name, job in scheduler.jobs.items()})
+metrics.counter("feed_scans_total", "DOM polls of the feed", fn=lambda: watermark.polls)
+metrics.counter("feed_fast_path_hits_total", "DOM polls answered by the unchanged top status alone",
+                fn=lambda: watermark.hits)
+metrics.counter("rule_hits_total", "Posts each rule fired on", ("rule",),
+                fn=lambda: {(name,): count for name, count in extraction.rules.hits.items()})
+metrics.gauge("seen_posts", "Entries in the dedupe store", fn=lambda: len(seen_hashes))
+metrics.counter("browser_rotations_total", "Browser restarts by the rotation manager", fn=lambda: rotation.rotations)
+metrics.counter("browser_worker_restarts_total", "Browser worker respawns after a hang or crash (--isolated)",
+                fn=lambda: worker_stats["restarts"])
+metrics.counter("browser_worker_hangs_total", "Browser worker operations that missed a deadline or heartbeat",
+                fn=lambda: worker_stats["hangs"])
+metrics.gauge("headless_rss_bytes", "Resident memory of the headless browser tree",
+              fn=lambda: get_headless_memory_mb() * 1024 * 1024)
+metrics.gauge("process_rss_bytes", "Resident memory of this process",
+              fn=lambda: get_trumpwatcher_memory_mb() * 1024 * 1024)
+metrics.counter("notifications_dropped_total", "Notices dropped because the notification queue was full",
+                fn=lambda: notifier.dropped if notifier else 0)
+metrics.gauge("start_time_seconds", "Unix time the process was created", fn=lambda: PROCESS_START)
+
+def perform_garbage_collection():
+    # Force a full Python GC pass.
+    # Call this after you tear down your browser context
+    # whenever you want to free up memory.
+    try:
+        log.debug("Running garbage collection…")
+        with tracer.span("gc"):
+            gc.collect()
+        log.debug("Garbage collection complete.")
+    except Exception as e:
+        log.warning("Garbage collection failed: %s", e)
+
+
+def get_headless_memory_mb() -> float:
+    # Combined RSS (MB) of the headless browser tree we launched, measured now.
+    # Only our own browser's processes are read (tracked by PID in the sampler).
+    return sampler.browser_rss_mb()
+
+
+def update_peak_memory(sample) -> None:
+    # ResourceSampler callback: keep the peak memory globals current
+    global MAX_HEADLESS_MEM, MAX_TRUMPWATCHER_MEM
+    MAX_HEADLESS_MEM = max(MAX_HEADLESS_MEM, sample.browser_rss_mb)
+    MAX_TRUMPWATCHER_MEM = max(MAX_TRUMPWATCHER_MEM, sample.self_rss_mb)
+
+
+def get_trumpwatcher_memory_mb() -> float:
+    # Return the RSS memory usage of the running TrumpWatcher.exe process in MB,
+    # with debug output.
+    try:
+        proc = psutil.Process(os.getpid())
+        return proc.memory_info().rss / (1024 * 1024)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return 0.0
+
+def get_run_time_minutes() -> float:
+    #Returns the total run time in minutes since startup.
+    return (datetime.now() - RUN_START).total_seconds() / 60
+
+def mark_startup(name: str) -> None:
+    # Record a startup milestone the first time it is reached
+    if name not in startup_marks:
+        startup_marks[name] = time.time() - PROCESS_START
+        log.info("Startup: %s after %.2fs", name, startup_marks[name])
+
+
+def startup_summary() -> str:
+    marks = sorted(startup_marks.items(), key=lambda kv: kv[1])
+    return "startup: " + (", ".join(f"{name} {t:.2f}s" for name, t in marks) or "no milestones")
+
+
+def record_poll(job: PollJob, ok: bool, duration: float) -> None:
+    # Scheduler callback: poll duration / error metrics
+    poll_seconds.observe(duration, job=job.name)
+    if ok:
+        last_poll_ok.set(time.time())
+    else:
+        poll_errors.inc(job=job.name)
+
+
+def record_notified(batch: list) -> None:
+    # Notifier callback: count shown posts and how long after posting they were shown
+    now = time.time()
+    for notice in batch:
+        posts_notified.inc()
+        timestamp = notice.post.get("timestamp")
+        # edits keep the original timestamp, so they would only inflate the lag
+        if timestamp and not notice.post.get("update_of"):
+            detection_lag.observe(max(now - parse_timestamp(timestamp).timestamp(), 0.0))
+
+
+def start_metrics() -> None:
+    # Serve the metrics registry on localhost when --metrics-port is given
+    global metrics_server
+    if METRICS_PORT and metrics_server is None:
+        metrics_server = MetricsServer(metrics, METRICS_PORT)
+        if not metrics_server.start():
+            metrics_server = None
+
+
+def report_summary():
+    # Print summary of peak memory usage and total run time.
+    log.info("%s", startup_summary())
+    log.info("Peak headless_shell.exe memory: %.1f MB", MAX_HEADLESS_MEM)
+    log.info("Peak TrumpWatcher.exe memory: %.1f MB", MAX_TRUMPWATCHER_MEM)
+    runtime = get_run_time_minutes()
+    log.info("Total run time: %.1f minutes", runtime)
+    log.info("%s", extraction.extract_summary())
+    if watermark.polls:
+        log.info("%s", watermark.summary())
+    if catchup.catchups:
+        log.info("%s", catchup.summary())
+    if worker_stats["spawns"]:
+        log.info("%s", worker_summary())
+    log.info("%s", seen_hashes.summary())
+    log.info("%s", similar_posts.summary())
+    log.info("%s", extraction.rules.summary())
+    if notifier:
+        log.info("%s", notifier.summary())
+    if sinks:
+        for line in sinks.summary().splitlines():
+            log.info("%s", line)
+    if archive:
+        log.info("%s", archive.summary())
+    for line in scheduler.summary().splitlines():
+        log.info("%s", line)
+    if adaptive_interval:
+        log.info("%s", adaptive_interval.summary())
+    log.info("%s", rotation.summary())
+    if tracer.recorded:
+        log.info("%s", tracer.summary())
+    for line in sampler.summary().splitlines():
+        log.info("%s", line)
+    for line in phase_timer.summary().splitlines():
+        log.info("%s", line)
+
+def seed_seen_hashes(page):
+    """
+    On the very first poll, mark everything already in the feed as seen,
+    but notify once on the most‐recent post.
+    """
+    seed_from_posts(extract_posts_from_page(page))
+
+
+def seed_from_posts(posts: list):
+    # Shared by the browser and API backends; posts come from select_new_posts()
+    if not posts:
+        log.debug("No posts found on initial poll.")
+        return
+
+    # Notify on the very latest post only
+    latest = posts[0]
+    raw, norm, h = latest["raw_text"], latest["normalized"], latest["hash"]
+    seen_hashes.add(h)
+    if status_key(latest):
+        seen_hashes.add(status_key(latest))
+    notify(raw, norm, "Most recent Trump post")
+    log.debug("Most recent post notified → Hash: %s", h)
+
+    # Mark the rest as seen so we don’t re-notify them
+    for later in posts[1:]:
+        seen_hashes.add(later["hash"])
+        if status_key(later):
+            seen_hashes.add(status_key(later))
+    log.debug("Seeded seen_hashes with %s posts.", len(posts))
+
+
+# ----------------------------
+# Core functionality
+# ----------------------------
+
+# ----------------------------
+# Post extraction
+# ----------------------------
+def extract_posts_from_page(page) -> list:
+    """
+    Scrape TruthSocial for @realDonaldTrump.
+    - With --sniff, uses the timeline API responses the page itself fetched.
+    - Otherwise one page.evaluate returns the status blocks above the first
+      known, unchanged one (the watermark) - usually none at all.
+    - Skips pinned posts.
+    - On the very first call (seen_hashes is empty), returns exactly one post.
+    - Thereafter, returns every post not yet in seen_hashes.
+    Each returned post is the scraped dict plus raw_text, normalized and hash.
+    """
+    # 1) Prefer the timeline JSON the page fetched itself (--sniff)
+    sniffer = getattr(page, "_sniffer", None)
+    if sniffer:
+        with tracer.span("sniff"):
+            sniffed = sniffer.collect()
+        if sniffed is not None:
+            log.debug("Using %s statuses from timeline payloads (%.1f ms)", len(sniffed), sniffer.last_ms)
+            new_posts = select_new_posts(sniffed)
+            catchup.observe(sniffed)
+            return new_posts
+        log.debug("No timeline payload captured — falling back to DOM scraping")
+
+    # 2) Grab the feed items newer than the watermark in a single round trip
+    with tracer.span("extract"):
+        all_posts = scrape_new_posts(page, watermark)
+    log.debug("Found %s new or changed status blocks of %s scanned (%.1f ms)",
+              len(all_posts), watermark.last_scanned, extraction.extract_stats['last_ms'])
+    if not all_posts:
+        return []
+    new_posts = select_new_posts(all_posts)
+    watermark.update(all_posts)
+    catchup.observe(all_posts)
+    return new_posts
+
+
+def select_new_posts(all_posts: list) -> list:
+    # Filter, normalize, hash and dedupe scraped (or API) posts, newest first
+    with tracer.span("dedupe", posts=len(all_posts)):
+        return _select_new_posts(all_posts)
+
+
+def _select_new_posts(all_posts: list) -> list:
+    new_posts = []
+    initial_run = len(seen_hashes) == 0
+
+    for idx, post in enumerate(all_posts):
+        # 2) Drop the pinned post
+        if post.get("pinned"):
+            log.debug("Skipping pinned post (html contains “Pinned Truth”)")
+            continue
+        log.debug("Block %s first line (author): %r", idx, post.get('author'))
+
+        # 3-6) text / media fallback, boilerplate + short-post filters, normalize, hash
+        # (short posts are kept for the archive)
+        prepared, reason = prepare_post(post, keep_short=archive is not None)
+        if prepared is None:
+            log.debug("%s—skipping", reason)
+            continue
+        h = prepared["hash"]
+        if h in seen_hashes:
+            log.debug("Duplicate post (hash=%s)—skipping", h)
+            continue
+        # new text (a new post or an edit): archive it once, whatever happens below
+        archive_post(prepared)
+        if prepared.get("short"):
+            log.debug("Very short text post—archived, not notified")
+            seen_hashes.add(h)
+            continue
+
+        # near-duplicates and edits of recent posts (SimHash index)
+        key = status_key(prepared)
+        kind, match = similar_posts.classify(prepared["normalized"], prepared.get("id") or None)
+        if kind == "duplicate":
+            log.debug("Near-duplicate of an earlier post (hash=%s)—skipping", h)
+            seen_hashes.add(h)
+            continue
+        if kind == "updated":
+            prepared["update_of"] = match.key
+            if SHOW_EDIT_DIFF:
+                prepared["diff"] = short_diff(match.text, prepared["normalized"])
+            log.debug("Post edited (was hash=%s): %s", match.key, prepared.get('diff', ''))
+        elif key and key in seen_hashes:
+            log.debug("Already-seen status id %s—skipping", prepared['id'])
+            seen_hashes.add(h)
+            continue
+
+        # 7) record & return
+        seen_hashes.add(h)
+        if key:
+            seen_hashes.add(key)
+        similar_posts.add(h, prepared["normalized"], prepared.get("id") or None)
+        new_posts.append(prepared)
+        log.debug("Queued new post (hash=%s)", h)
+
+        # 8) on the _first_ run, stop after one
+        if initial_run:
+            break
+
+    return new_posts
+
+
+
+def check_for_new_posts(page):
+    # Scrape the latest posts, dedupe by hash, and fire notifications.
+    # Uses extract_posts_from_page() and notify(), and the global seen_hashes.
+
+    try:
+        # page is already at TRUTH_URL on first poll;
+        # all reloads happen in the loop below
+        notify_new_posts(extract_posts_from_page(page))
+    except Exception as e:
+        log.warning("Error in check_for_new_posts: %s", e)
+
+
+def catch_up(crawl) -> None:
+    """
+    After a gap, crawl back to the last handled status and notify what was
+    missed, oldest first. crawl(last_id) returns (posts newest first,
+    reached_last_id) - see catchup.crawl_feed / crawl_api.
+    """
+    gap = catchup.gap()
+    log.info("No poll for %.0fs — catching up to status %s", gap, catchup.last_id)
+    with tracer.span("catchup", gap=round(gap)):
+        posts, complete = crawl(catchup.last_id)
+    new_posts = select_new_posts(posts)
+    notify_new_posts(new_posts[::-1])
+    watermark.update(posts)
+    catchup.observe(posts)
+    catchup.record(len(new_posts), complete)
+    if complete:
+        log.info("Catch-up done: %s missed posts in %s statuses", len(new_posts), len(posts))
+    else:
+        log.warning("Catch-up stopped at its page/time cap after %s statuses; older missed posts "
+                    "were not recovered", len(posts))
+
+
+def notify_new_posts(new_posts: list):
+    # Fire a notification for each post returned by select_new_posts()
+    try:
+        if not new_posts:
+            log.debug("No new posts found.")
+            return
+
+        for post in new_posts:
+            tracer.instant("post detected", hash=post["hash"])
+            raw_text, normalized_text, h = post["raw_text"], post["normalized"], post["hash"]
+            log.debug("New post detected -> Hash: %s", h)
+            seen_hashes.add(h)
+            if adaptive_interval:
+                adaptive_interval.on_detection(post.get("timestamp"))
+                adaptive_interval.model.save()
+
+            # derive a label for the notification
+            if post.get("update_of"):
+                label = "Updated Trump post"
+                if post.get("diff"):
+                    normalized_text = f"Edited: {post['diff']}\n{normalized_text}"
+            elif raw_text.startswith(VIDEO_PREFIX):
+                label = "Video post"
+            elif raw_text.startswith(IMAGE_PREFIX):
+                label = "Image post"
+            else:
+                label = "New Trump post"
+            if post.get("priority"):
+                label = f"Priority: {label}"
+            posts_detected.inc(label=label)
+
+            # Fire your notification with the right label
+            notify(raw_text, normalized_text, label, post=post, priority=post.get("priority", False))
+            publish_post(post, label)
+
+    except Exception as e:
+        log.warning("Error in notify_new_posts: %s", e)
+
+def start_notifier() -> NotificationDispatcher:
+    # Build the notification backend and start the dispatcher's worker thread
+    global notifier
+    if notifier is None:
+        if NOTIFY_BACKEND == "toast":
+            backend = ToastBackend(
+                APP_ID,
+                resource_path("icon/trump_watch_icon.ico"),   # small ICO for the toast
+                resource_path("icon/trump_watch_icon.png"),   # 256×256 hero image
+            )
+        elif NOTIFY_BACKEND == "none":
+            backend = NullBackend()
+        else:
+            backend = StdoutBackend()
+        notifier = NotificationDispatcher(
+            backend, coalesce_window=COALESCE_WINDOW, max_per_minute=MAX_TOASTS_PER_MINUTE,
+            summary_title="{count} new posts" if ACCOUNTS else "{count} new Trump posts",
+            on_shown=record_notified, ready=shortcut_ready, ready_timeout=SHORTCUT_WAIT,
+        )
+        notifier.start()
+    return notifier
+
+
+def start_sinks() -> None:
+    # Build the delivery sinks and the archive and start their workers; a sink whose
+    # configuration is bad is logged and left out instead of stopping the watcher
+    global sinks, archive
+    if sinks is None and (WEBHOOK_URLS or SINK_FILE or SINK_COMMAND):
+        manager = SinkManager(os.path.join(APP_DATA_DIR, "dead_letter.jsonl"))
+        for webhook_url in WEBHOOK_URLS:
+            try:
+                manager.add(WebhookSink(webhook_url, WEBHOOK_FORMAT))
+            except ValueError as e:
+                log.warning("Webhook sink disabled: %s", e)
+        if SINK_FILE:
+            manager.add(FileSink(SINK_FILE))
+        if SINK_COMMAND:
+            manager.add(CommandSink(SINK_COMMAND))
+        sinks = manager if manager.workers else None
+    if archive is None and ARCHIVE_MODE:
+        try:
+            archive = SinkWorker(ArchiveSink(PostArchive(ARCHIVE_PATH)), batch_size=100, batch_wait=2.0)
+            archive.start()
+        except ArchiveError as e:
+            log.warning("Post archive disabled: %s", e)
+
+
+def archive_post(post: dict, account: str = DEFAULT_ACCOUNT) -> None:
+    # Queue the post for the archive (edits update the stored text; repeats are ignored)
+    if archive:
+        record = archive_record(post, account)
+        if record:
+            archive.put(record)
+
+
+def publish_post(post: dict, label: str, url: str = TRUTH_URL) -> None:
+    # Queue the post for every configured delivery sink
+    if sinks:
+        sinks.publish(post_payload(post, label, url))
+
+
+# Notify function - hands the post to the notification dispatcher (never blocks on the toast)
+def notify(post_text: str, normalized_text: str, label: str = "New Trump post",
+           url: str = TRUTH_URL, post: dict = None, priority: bool = False) -> None:
+    log.info("Notify: %s", label)
+    with tracer.span("notify", label=label):
+        start_notifier().submit(Notice(label, normalized_text, url, post, priority))
+
+    # Full details go to the rotating posts log in DEBUG mode (no-op otherwise)
+    posts_log.info("\n[%s] [%s]\nRaw Extracted:\n%s\n\nNormalized for Hashing:\n%s\n%s",
+                   datetime.now(), label, post_text, normalized_text, "-" * 40)
+
+
+# ----------------------------
+# Browser launch + preload
+# ----------------------------
+def start_browser(p=None):
+    """
+    Launch headless Chromium, navigate to Truth Social, block images/fonts/media,
+    then scroll until at least 2 posts are in the DOM.
+    Pass an already-started Playwright instance to launch alongside a running
+    browser (used to pre-warm a replacement during rotation).
+    """
+    global browser_context
+    if ISOLATED_MODE:
+        return start_isolated_browser()
+    with tracer.span("start_browser"):
+        log.debug("Launching headless browser…")
+        own_playwright = p is None
+        if own_playwright:
+            with tracer.span("playwright.start"):
+                p = sync_playwright().start()
+        browser = None
+        try:
+            with tracer.span("launch"):
+                browser = p.chromium.launch(
+                    executable_path=HEADLESS_PATH,
+                    headless=True,
+                    args=BROWSER_ARGS,
+                )
+            with tracer.span("new_context"):
+                browser_context = browser.new_context(
+                    extra_http_headers={"user-agent": USER_AGENT}
+                )
+                page = browser_context.new_page()
+
+            # capture the timeline JSON the page fetches (before the first navigation)
+            if SNIFF_MODE:
+                page._sniffer = TimelineSniffer(page)
+
+            # block images/fonts/media
+            def _block(route, req):
+                if req.resource_type in ("image", "font", "media"):
+                    return route.abort()
+                return route.continue_()
+            page.route("**/*", _block)
+
+            # go to the feed and wait (scrolling if needed) until 2 posts are in the DOM
+            load_feed(
+                page, lambda: page.goto(TRUTH_URL, wait_until="domcontentloaded"),
+                min_statuses(MIN_READY_POSTS, READY_TIMEOUT), phase_timer, attempts=5,
+            )
+
+            # hang onto these for restarts
+            page._playwright = p
+            page._browser   = browser
+
+            # track the new browser's process tree by PID
+            sampler.refresh_roots()
+            log.debug("Browser launched successfully.")
+            return browser_context, page
+        except Exception:
+            # don't leave Chromium and the driver running behind a failed start
+            steps = [("browser.close", browser.close)] if browser else []
+            if own_playwright:
+                steps.append(("playwright.stop", p.stop))
+            for name, step in steps:
+                try:
+                    step()
+                except Exception as e:
+                    log.warning("Error during browser cleanup (%s): %s", name, e)
+            raise
+
+
+def start_isolated_browser():
+    """
+    --isolated: launch the browser in a supervised worker process. The
+    worker opens TRUTH_URL itself; here we only wait for the feed. Returns
+    (worker, page) where page is a RemotePage whose calls have deadlines.
+    """
+    global browser_context
+    with tracer.span("start_browser", isolated=True):
+        log.debug("Launching headless browser in a worker process…")
+        worker = BrowserWorker(
+            {
+                "executable_path": HEADLESS_PATH, "args": BROWSER_ARGS, "user_agent": USER_AGENT,
+                "blocked_resource_types": BLOCKED_RESOURCE_TYPES, "url": TRUTH_URL,
+            },
+            op_deadline=WORKER_OP_DEADLINE,
+            on_spawn=sampler.refresh_roots,   # a respawned worker means a new browser tree
+        )
+        with tracer.span("launch"):
+            worker.start()
+        browser_context = worker
+        page = RemotePage(worker)
+        # the worker already navigated; just wait (scrolling if needed) for 2 posts
+        load_feed(
+            page, lambda: None,
+            min_statuses(MIN_READY_POSTS, READY_TIMEOUT), phase_timer, attempts=5,
+        )
+        log.debug("Browser worker %s launched successfully.", worker.pid)
+        return worker, page
+
+
+def close_browser(context, stop_playwright: bool = True):
+    # stop_playwright=False keeps the driver running for a pre-warmed replacement
+    if isinstance(context, BrowserWorker):
+        with tracer.span("worker.close"):
+            context.close()
+        return
+    log.debug("Closing browser context.")
+    try:
+        # grab handles from the passed‐in context
+        pages = context.pages or []
+    except Exception:
+        pages = []
+    page  = pages[0] if pages else None
+    browser = getattr(page, "_browser", None)
+    p       = getattr(page, "_playwright", None)
+
+    # close the context, then tear down browser + playwright; each step on its own so a
+    # dead driver or browser still gets the later steps (and the driver process stopped)
+    steps = [("context.close", context.close)]
+    if browser:
+        steps.append(("browser.close", browser.close))
+    if p and stop_playwright:
+        steps.append(("playwright.stop", p.stop))
+    ok = True
+    for name, step in steps:
+        try:
+            with tracer.span(name):
+                step()
+        except Exception as e:
+            ok = False
+            log.warning("Error during browser cleanup (%s): %s", name, e)
+    if ok:
+        log.debug("Browser context closed successfully.")
+
+
+# ----------------------------
+# Poll + restart loop
+# ----------------------------
+def attach_live_feed(page):
+    # In --live mode, install the MutationObserver push channel on a fresh page
+    if not LIVE_MODE:
+        return None
+    live = LiveFeed(page)
+    try:
+        live.install()
+    except Exception as e:
+        log.warning("Failed to install live feed observer: %s", e)
+        return None
+    return live
+
+
+def adapt_interval(job: PollJob) -> None:
+    # In --adaptive mode, pick the next poll interval from the posting-rate model
+    # (live mode keeps its slow heartbeat)
+    if adaptive_interval and not LIVE_MODE:
+        job.interval = adaptive_interval.next_interval()
+        log.debug("Next poll in ~%.0fs (adaptive)", job.interval)
+
+
+def api_monitor_loop() -> bool:
+    """
+    Poll the statuses API over a keep-alive connection.
+    Returns True on a clean exit, False if the API blocked us and the
+    caller should fall back to the headless browser.
+    """
+    client = TruthApiClient(base_url=API_BASE, user_agent=USER_AGENT)
+    proc = psutil.Process(os.getpid())
+    first_poll = len(seen_hashes) == 0
+    blocked = False
+    log.info("API monitor started against %s. Polling every %ss.", API_BASE, POLL_INTERVAL)
+
+    def poll():
+        nonlocal first_poll, blocked
+        cpu_before = time.process_time()
+        catchup.gap_threshold = GAP_FACTOR * job.interval
+        try:
+            if not first_poll and CATCHUP_MODE and catchup.due():
+                catch_up(lambda last_id: crawl_api(client, last_id, CATCHUP_MAX_PAGES, CATCHUP_MAX_SECONDS))
+            with tracer.span("api_poll"):
+                statuses = client.poll()
+            posts = select_new_posts(statuses)
+        except ApiBlockedError as e:
+            log.warning("API blocked (%s).", e)
+            blocked = True
+            scheduler.remove("api")
+            return
+        catchup.observe(statuses)
+        if first_poll:
+            seed_from_posts(posts)
+            first_poll = False
+        else:
+            notify_new_posts(posts)
+        catchup.mark_poll()
+        mark_startup("first poll")
+
+        cpu_ms = (time.process_time() - cpu_before) * 1000
+        rss_mb = proc.memory_info().rss / (1024 * 1024)
+        log.debug("API poll: %.1f ms wall, %.1f ms CPU, RSS %.1f MB", client.stats['last_ms'], cpu_ms, rss_mb)
+        adapt_interval(job)
+
+    job = scheduler.add(PollJob("api", poll, POLL_INTERVAL))
+    try:
+        scheduler.run(exit_event)
+    finally:
+        log.info("%s", client.summary())
+        client.close()
+    return not blocked
+
+
+def multi_account_loop() -> None:
+    # Run the asyncio engine over ACCOUNTS, one seen store per account
+    def on_post(state, post, label):
+        log.debug("New @%s post detected -> Hash: %s", state.handle, post['hash'])
+        if post.get("priority"):
+            label = f"Priority: {label}"
+        posts_detected.inc(label=label)
+        archive_post(post, state.handle)
+        notify(post["raw_text"], post["normalized"], label, url=state.url, post=post,
+               priority=post.get("priority", False))
+        publish_post(post, label, url=state.url)
+
+    accounts = []
+    for entry in ACCOUNTS:
+        handle, _, interval = entry.partition(":")
+        path = os.path.join(APP_DATA_DIR, f"seen_{handle.lower()}.bin")
+        try:
+            store = SeenStore(path)
+        except OSError as e:
+            log.warning("Could not open seen store for @%s (%s); using memory only.", handle, e)
+            store = SeenStore()
+        accounts.append(AccountState(handle, store, float(interval) if interval else None))
+
+    engine = AsyncMonitor(
+        accounts, on_post, lambda: exit_flag,
+        poll_interval=POLL_INTERVAL,
+        concurrency=ACCOUNT_CONCURRENCY,
+        page_max_age=MAX_PAGE_AGE,
+        launch_kwargs={"executable_path": HEADLESS_PATH, "args": BROWSER_ARGS},
+        user_agent=USER_AGENT,
+        blocked_resource_types=BLOCKED_RESOURCE_TYPES,
+    )
+    try:
+        engine.run_forever()
+    finally:
+        for state in accounts:
+            state.seen.close()
+
+
+def monitor_loop():
+    mark_startup("monitor started")
+    start_metrics()
+    sampler.start()
+    start_notifier()
+    start_sinks()
+
+    if ACCOUNTS:
+        multi_account_loop()
+        return
+
+    if USE_API:
+        if api_monitor_loop():
+            return
+        log.info("Falling back to the headless browser.")
+
+    context, page = start_browser()
+    mark_startup("browser ready")
+    first_poll   = len(seen_hashes) == 0   # nothing seen yet (no persisted store, API path did not seed)
+    loaded_at    = time.monotonic()        # when the current page last finished loading the feed
+    live = attach_live_feed(page)
+
+    def rotate_if_needed():
+        # Swap in a pre-warmed browser when a memory / age / error threshold is crossed
+        nonlocal context, page, live, loaded_at
+        forced = f"errors {job.failures}" if job.failures >= RESTART_AFTER_FAILURES else None
+        cause = rotation.check(forced)
+        if not cause:
+            return
+        with tracer.span("rotate", cause=cause):
+            if forced:
+                # the old driver may be what is failing: stop it, then start on a fresh one
+                context, page = rotation.rotate(
+                    cause, (context, page), start_fn=start_browser, close_fn=close_browser, prewarm=False,
+                )
+            else:
+                p = getattr(page, "_playwright", None)
+                context, page = rotation.rotate(
+                    cause, (context, page),
+                    start_fn=lambda: start_browser(p),
+                    close_fn=lambda old: close_browser(old, stop_playwright=False),
+                )
+        loaded_at = time.monotonic()
+        live = attach_live_feed(page)
+
+    def poll():
+        nonlocal first_poll
+        if job.failures >= RESTART_AFTER_FAILURES:
+            rotate_if_needed()
+
+        log.debug("Polling for posts…")
+        poll_start = time.perf_counter()
+        # a page that has only just loaded (start-up, error rotation) is read as-is
+        if time.monotonic() - loaded_at > FRESH_PAGE_MAX_AGE:
+            load_feed(
+                page, lambda: page.reload(wait_until="domcontentloaded"),
+                min_statuses(MIN_READY_POSTS, READY_TIMEOUT), phase_timer,
+            )
+
+        catchup.gap_threshold = GAP_FACTOR * job.interval
+        with phase_timer.phase("extract+notify"):
+            if first_poll:
+                seed_seen_hashes(page)
+                first_poll = False
+            elif CATCHUP_MODE and catchup.due():
+                catch_up(lambda last_id: crawl_feed(
+                    page, last_id, CATCHUP_MAX_PAGES, CATCHUP_MAX_SECONDS, phase_timer))
+            else:
+                check_for_new_posts(page)
+        phase_timer.record("poll", time.perf_counter() - poll_start)
+        catchup.mark_poll()
+        mark_startup("first poll")
+        rotation.mark_poll_done()
+        adapt_interval(job)
+
+        # rotate right after a poll so the pre-warm overlaps the idle gap
+        rotate_if_needed()
+
+    def pump_live():
+        # Handle statuses pushed by the in-page observer since the last pump
+        if live is None:
+            return
+        with tracer.span("live_pump"):
+            live.pump()
+            pushed = live.drain()
+        if pushed and not first_poll:
+            log.debug("Live feed pushed %s statuses", len(pushed))
+            notify_new_posts(select_new_posts(pushed))
+
+    if LIVE_MODE:
+        job = scheduler.add(PollJob("poll", poll, LIVE_HEARTBEAT))
+        scheduler.add(PollJob("live", pump_live, LIVE_PUMP_INTERVAL, jitter=0, priority=-1), delay=LIVE_PUMP_INTERVAL)
+        log.info("Monitor loop started in live mode. Heartbeat reload every %ss.", LIVE_HEARTBEAT)
+    else:
+        job = scheduler.add(PollJob("poll", poll, POLL_INTERVAL))
+        log.info("Monitor loop started. Polling every %ss.", POLL_INTERVAL)
+    scheduler.run(exit_event)
+    if live:
+        log.info("%s", live.summary())
+    if getattr(page, "_sniffer", None):
+        log.info("%s", page._sniffer.summary())
+
+    log.debug("Exiting monitor loop, cleaning up…")
+    close_browser(context)
+
+
+# ----------------------------
+# Tracing (--trace / tray menu)
+# ----------------------------
+def set_tracing(enabled: bool) -> None:
+    tracer.enabled = enabled
+    log.info("Tracing %s", "on" if enabled else "off")
+
+
+def save_trace(path: str = None) -> str:
+    # Write the span buffer as Chrome trace JSON (open in Perfetto / chrome://tracing)
+    if not tracer.events:
+        log.info("No trace spans recorded%s.", "" if tracer.enabled else " (tracing is off; start with --trace)")
+        return None
+    path = path or TRACE_PATH or os.path.join(
+        APP_DATA_DIR, "traces", f"trace-{datetime.now():%Y%m%d-%H%M%S}.json")
+    try:
+        return tracer.dump(path)
+    except OSError as e:
+        log.warning("Could not write trace to %s: %s", path, e)
+        return None
+
+
+# ----------------------------
+# Shutdown
+# ----------------------------
+def request_exit() -> None:
+    # Ask the monitor loop (and any waits on exit_event) to stop
+    global exit_flag
+    exit_flag = True
+    exit_event.set()
+
+
+def shutdown() -> None:
+    # Stop background workers, print the summary and flush persistent state
+    sampler.stop()
+    if metrics_server:
+        metrics_server.stop()
+    if notifier:
+        notifier.stop()
+    if sinks:
+        sinks.stop()
+    if archive:
+        archive.stop()
+    report_summary()
+    if tracer.events:
+        save_trace()
+
+    # Flush the seen-post store and posting-rate model
+    seen_hashes.close()
+    similar_posts.close()
+    if adaptive_interval:
+        adaptive_interval.model.save()
@@ -0,0 +1,266 @@
+# notifier.py - Trump Watcher
+# Asynchronous, coalescing notification dispatcher with pluggable backends
+
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_COALESCE_WINDOW = 3.0     # after a toast, notices within this many seconds are merged
+DEFAULT_MAX_PER_MINUTE = 6        # toasts shown per rolling minute; the rest are merged
+DEFAULT_QUEUE_SIZE = 200
+MESSAGE_MAX_CHARS = 200
+MIXED_TITLE = "{count} new posts" # summary across several accounts
+
+
+class Notice:
+    # One thing to tell the user about
+    def __init__(self, label: str, message: str, url: str = None, post: dict = None, priority: bool = False):
+        self.label = label
+        self.message = message
+        self.url = url
+        self.post = post or {}
+        self.priority = priority      # shown on its own right away (keyword alert rules)
+        self.created = time.time()
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+class NullBackend:
+    # Records notifications without showing them - for headless runs
+    name = "none"
+
+    def __init__(self):
+        self.shown = []
+
+    def show(self, title: str, message: str, url: str = None) -> None:
+        self.shown.append((title, message, url))
+
+
+class StdoutBackend:
+    # Prints notifications - for Linux / daemon mode
+    name = "stdout"
+
+    def show(self, title: str, message: str, url: str = None) -> None:
+        print(f"[{datetime.now()}] {title}: {message}" + (f" <{url}>" if url else ""), flush=True)
+
+
+class ToastBackend:
+    """
+    Native Windows toasts via winotify. winotify is imported on first use,
+    and the per-label template (icons, audio, button) is built once.
+    """
+    name = "toast"
+
+    def __init__(self, app_id: str, icon_path: str, hero_path: str = None,
+                 action_label: str = "View on TruthSocial"):
+        self.app_id = app_id
+        self.icon_path = icon_path
+        self.hero_path = hero_path
+        self.action_label = action_label
+        self._winotify = None
+        self._templates = {}
+
+    def _template(self, title: str) -> dict:
+        template = self._templates.get(title)
+        if template is None:
+            if self._winotify is None:
+                import winotify
+                self._winotify = winotify
+            template = {
+                "app_id": self.app_id,
+                "title": title,
+                "icon": self.icon_path,
+                "duration": "long",          # banner stays up ~25s
+            }
+            self._templates[title] = template
+        return template
+
+    def show(self, title: str, message: str, url: str = None) -> None:
+        template = self._template(title)
+        toast = self._winotify.Notification(msg=message, **template)
+        # Only add a hero image if that method exists
+        if self.hero_path and hasattr(toast, "add_image"):
+            toast.add_image(src=self.hero_path)
+        if url:
+            toast.add_actions(label=self.action_label, launch=url)
+        toast.set_audio(self._winotify.audio.Default, loop=False)
+        toast.show()
+
+
+# ----------------------------
+# Dispatcher
+# ----------------------------
+class NotificationDispatcher:
+    """
+    Bounded queue + one worker thread in front of a backend.
+
+    A notice that arrives alone is shown at once. Notices that follow a
+    toast within coalesce_window (or queue up behind one) are merged into
+    one summary toast, and at most max_per_minute toasts are shown per
+    rolling minute - extra notices keep accumulating into the next summary
+    instead of being shown one by one. A summary spanning several sources
+    (notice URLs, i.e. accounts) gets MIXED_TITLE and no link. Priority
+    notices skip all of this: they are shown alone as soon as they arrive.
+    submit() never blocks the caller.
+    """
+
+    def __init__(self, backend, coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+                 max_per_minute: int = DEFAULT_MAX_PER_MINUTE,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, summary_title: str = "{count} new posts",
+                 on_shown=None, ready=None, ready_timeout: float = 15.0):
+        self.backend = backend
+        self.coalesce_window = coalesce_window
+        self.max_per_minute = max_per_minute
+        self.summary_title = summary_title
+        self.on_shown = on_shown          # callback(list_of_notices) after each toast
+        self.ready = ready                # threading.Event the first toast waits for (e.g. the AUMID shortcut)
+        self.ready_timeout = ready_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._shown_at = deque()
+        self._last_shown = float("-inf")
+        self._stop = threading.Event()
+        self._thread = None
+        self.submitted = 0
+        self.dropped = 0
+        self.toasts = 0
+        self.coalesced = 0
+        self.priority = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+            self._thread.start()
+
+    def submit(self, notice: Notice) -> bool:
+        try:
+            self._queue.put_nowait(notice)
+        except queue.Full:
+            self.dropped += 1
+            log.warning("Notification queue full — dropped %r", notice.label)
+            return False
+        self.submitted += 1
+        return True
+
+    def _collect_batch(self, first: Notice) -> list:
+        # Gather everything that arrives within the coalesce window (and while rate-limited)
+        batch = [first]
+        deadline = time.monotonic() + self.coalesce_window
+        while True:
+            if self._stop.is_set():
+                # shutting down: take whatever is queued and show it now
+                batch.extend(self._take_all())
+                break
+            wait = max(deadline - time.monotonic(), self._rate_limit_wait())
+            if wait <= 0:
+                break
+            try:
+                notice = self._queue.get(timeout=min(wait, 1.0))
+            except queue.Empty:
+                continue
+            if notice.priority:
+                self._show_priority(notice)
+            else:
+                batch.append(notice)
+        return batch
+
+    def _is_quiet(self) -> bool:
+        # No toast within the coalesce window and none owed to the rate limit
+        return (time.monotonic() - self._last_shown >= self.coalesce_window
+                and self._rate_limit_wait() <= 0)
+
+    def _rate_limit_wait(self) -> float:
+        # Seconds until another toast is allowed
+        now = time.monotonic()
+        while self._shown_at and now - self._shown_at[0] >= 60:
+            self._shown_at.popleft()
+        if len(self._shown_at) < self.max_per_minute:
+            return 0.0
+        return 60 - (now - self._shown_at[0])
+
+    def _render(self, batch: list):
+        if len(batch) == 1:
+            n = batch[0]
+            return n.label, n.message[:MESSAGE_MAX_CHARS], n.url
+        self.coalesced += len(batch) - 1
+        lines = []
+        for n in batch:
+            first_line = (n.message.strip().splitlines() or [""])[0]
+            lines.append(f"• {first_line}")
+        if len({n.url for n in batch}) > 1:
+            return MIXED_TITLE.format(count=len(batch)), "\n".join(lines)[:MESSAGE_MAX_CHARS], None
+        title = self.summary_title.format(count=len(batch))
+        return title, "\n".join(lines)[:MESSAGE_MAX_CHARS], batch[0].url
+
+    def _show(self, batch: list) -> None:
+        title, message, url = self._render(batch)
+        try:
+            self.backend.show(title, message, url)
+            self.toasts += 1
+        except Exception as e:
+            # Catch-all so we never crash on notification errors
+            self.errors += 1
+            log.error("Notification error: %s", e)
+        self._last_shown = time.monotonic()
+        self._shown_at.append(self._last_shown)
+        if self.on_shown:
+            try:
+                self.on_shown(batch)
+            except Exception as e:
+                log.warning("Notification callback failed: %s", e)
+
+    def _show_priority(self, notice: Notice) -> None:
+        self.priority += 1
+        self._show([notice])
+
+    def _run(self) -> None:
+        # Only this thread waits for the backend to be ready; submit() keeps queueing meanwhile
+        if self.ready is not None and not self.ready.wait(self.ready_timeout):
+            log.warning("Notification backend not ready after %.0fs; showing toasts anyway.", self.ready_timeout)
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if first.priority:
+                self._show_priority(first)
+                continue
+            if self._is_quiet() and self._queue.empty():
+                self._show([first])
+            else:
+                self._show(self._collect_batch(first))
+        self._drain()
+
+    def _take_all(self) -> list:
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _drain(self) -> None:
+        batch = self._take_all()
+        if batch:
+            self._show(batch)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        # Flush anything queued and stop the worker
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def summary(self) -> str:
+        return (f"notifications: {self.submitted} submitted, {self.toasts} toasts via {self.backend.name}, "
+                f"{self.coalesced} coalesced, {self.priority} priority, {self.dropped} dropped, "
+                f"{self.errors} errors")
@@ -0,0 +1,173 @@
+# readiness.py - Trump Watcher
+# Condition-based page readiness: wait for what we need, not for networkidle
+
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from extraction import STATUS_SELECTOR
+from scheduler import percentile
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_CONDITION_TIMEOUT = 10.0   # seconds per condition attempt
+DEFAULT_ATTEMPTS = 3               # scroll + re-wait this many times before giving up
+PHASE_HISTORY = 256                # samples kept per phase
+SCROLL_JS = "window.scrollTo(0, document.body.scrollHeight)"
+STOP_LOADING_JS = "window.stop()"
+
+# In-page predicate; arg is [selector, count]
+MIN_STATUSES_JS = r"""([sel, n]) => {
+    let count = 0;
+    for (const b of document.querySelectorAll(sel)) {
+        if (!b.innerHTML.includes("Pinned Truth") && ++count >= n) return true;
+    }
+    return false;
+}"""
+
+
+class Condition:
+    # A named in-page predicate with its own timeout
+    def __init__(self, name: str, js: str, arg, timeout: float = DEFAULT_CONDITION_TIMEOUT):
+        self.name = name
+        self.js = js
+        self.arg = arg
+        self.timeout = timeout
+
+
+def min_statuses(n: int, timeout: float = DEFAULT_CONDITION_TIMEOUT) -> Condition:
+    # At least n non-pinned status wrappers in the DOM
+    return Condition(f"min_statuses({n})", MIN_STATUSES_JS, [STATUS_SELECTOR, n], timeout)
+
+
+class PhaseTimer:
+    """
+    Per-phase wall-clock samples (navigate, wait:<condition>, scroll, ...)
+    so slow polls can be attributed. Use `with timer.phase("name"):`.
+    With a tracing.Tracer, every recorded phase is also emitted as a span.
+    """
+
+    def __init__(self, history: int = PHASE_HISTORY, tracer=None):
+        self.history = history
+        self.tracer = tracer
+        self.samples = {}
+        self.timeouts = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.samples.setdefault(name, deque(maxlen=self.history)).append(seconds)
+        if self.tracer is not None:
+            # record() runs as the phase ends, so the span started `seconds` ago
+            self.tracer.complete(name, time.perf_counter() - seconds, seconds, "phase")
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed_out(self, name: str) -> None:
+        self.timeouts[name] = self.timeouts.get(name, 0) + 1
+
+    def summary(self) -> str:
+        lines = []
+        for name, values in self.samples.items():
+            vals = list(values)
+            lines.append(f"phase {name}: n={len(vals)} mean {1000 * sum(vals) / len(vals):.0f} ms, "
+                         f"p95 {1000 * percentile(vals, 95):.0f} ms, max {1000 * max(vals):.0f} ms"
+                         + (f", {self.timeouts[name]} timeouts" if name in self.timeouts else ""))
+        return "\n".join(lines)
+
+
+# ----------------------------
+# Sync API
+# ----------------------------
+def wait_for(page, condition: Condition, timer: PhaseTimer = None) -> bool:
+    # Wait until the condition holds; False on timeout
+    name = f"wait:{condition.name}"
+    start = time.perf_counter()
+    try:
+        page.wait_for_function(condition.js, arg=condition.arg, timeout=condition.timeout * 1000)
+        return True
+    except Exception as e:
+        if "Timeout" not in type(e).__name__ and "Timeout" not in str(e):
+            raise
+        if timer:
+            timer.timed_out(name)
+        return False
+    finally:
+        if timer:
+            timer.record(name, time.perf_counter() - start)
+
+
+def stop_loading(page) -> None:
+    # Abort in-flight subresource loads once we have what we need
+    try:
+        page.evaluate(STOP_LOADING_JS)
+    except Exception as e:
+        log.warning("window.stop() failed: %s", e)
+
+
+def load_feed(page, navigate, condition: Condition, timer: PhaseTimer = None,
+              attempts: int = DEFAULT_ATTEMPTS) -> bool:
+    """
+    navigate() starts the load (goto/reload with wait_until="commit" or
+    "domcontentloaded"). Then wait for the condition, scrolling to the
+    bottom between attempts to trigger lazy loading. Stops remaining
+    loads as soon as the condition holds. Returns False if it never did.
+    """
+    timer = timer or PhaseTimer()
+    with timer.phase("navigate"):
+        navigate()
+    for attempt in range(attempts):
+        if wait_for(page, condition, timer):
+            stop_loading(page)
+            return True
+        with timer.phase("scroll"):
+            page.evaluate(SCROLL_JS)
+    log.warning("Page not ready after %s attempts (%s)", attempts, condition.name)
+    return False
+
+
+# ----------------------------
+# Async API (same behaviour, for async_monitor)
+# ----------------------------
+async def async_wait_for(page, condition: Condition, timer: PhaseTimer = None) -> bool:
+    name = f"wait:{condition.name}"
+    start = time.perf_counter()
+    try:
+        await page.wait_for_function(condition.js, arg=condition.arg, timeout=condition.timeout * 1000)
+        return True
+    except Exception as e:
+        if "Timeout" not in type(e).__name__ and "Timeout" not in str(e):
+            raise
+        if timer:
+            timer.timed_out(name)
+        return False
+    finally:
+        if timer:
+            timer.record(name, time.perf_counter() - start)
+
+
+async def async_load_feed(page, navigate, condition: Condition, timer: PhaseTimer = None,
+                          attempts: int = DEFAULT_ATTEMPTS) -> bool:
+    # navigate is a coroutine function here
+    timer = timer or PhaseTimer()
+    with timer.phase("navigate"):
+        await navigate()
+    for attempt in range(attempts):
+        if await async_wait_for(page, condition, timer):
+            try:
+                await page.evaluate(STOP_LOADING_JS)
+            except Exception as e:
+                log.warning("window.stop() failed: %s", e)
+            return True
+        with timer.phase("scroll"):
+            await page.evaluate(SCROLL_JS)
+    log.warning("Page not ready after %s attempts (%s)", attempts, condition.name)
+    return False
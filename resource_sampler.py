@@ -0,0 +1,202 @@
+# resource_sampler.py - Trump Watcher
+# Background sampler for our own process and the browser tree we launched
+
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+import psutil
+
+from scheduler import percentile
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_SAMPLE_INTERVAL = 5.0      # seconds between samples
+DEFAULT_CAPACITY = 720             # samples kept (1 hour at 5 s)
+BROWSER_PROCESS_NAMES = ("headless_shell", "chrome", "chromium")
+
+Sample = namedtuple("Sample", [
+    "ts",               # time.time() of the sample
+    "browser_rss_mb",   # summed RSS of the browser tree
+    "browser_cpu_s",    # summed user+system CPU seconds of the browser tree
+    "browser_handles",  # handles (Windows) / fds (POSIX) of the browser tree
+    "browser_procs",    # processes in the browser tree
+    "self_rss_mb",
+    "self_cpu_s",
+    "self_handles",
+])
+
+STAT_FIELDS = ("browser_rss_mb", "browser_cpu_s", "browser_handles", "browser_procs",
+               "self_rss_mb", "self_cpu_s", "self_handles")
+
+
+def _is_browser(proc) -> bool:
+    try:
+        name = proc.name().lower()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+    return any(b in name for b in BROWSER_PROCESS_NAMES)
+
+
+def _handles(proc) -> int:
+    if hasattr(proc, "num_handles"):
+        return proc.num_handles()
+    return proc.num_fds()
+
+
+class ResourceSampler:
+    """
+    Samples RSS, CPU time and handle counts for this process and for the
+    browser process tree(s) it launched, into a fixed-size ring buffer.
+
+    Browser roots are found among our own descendants (the Playwright
+    driver's Chromium children) when refresh_roots() is called after a
+    launch, and are then tracked by PID - no machine-wide process scan.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 capacity: int = DEFAULT_CAPACITY, on_sample=None):
+        self.interval = interval
+        self.samples = deque(maxlen=capacity)
+        self.on_sample = on_sample
+        self._self_proc = psutil.Process(os.getpid())
+        self._roots = {}          # pid -> psutil.Process
+        self._procs = {}          # pid -> psutil.Process (cached so cpu_times stays cheap)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ----------------------------
+    # Browser tree discovery
+    # ----------------------------
+    def refresh_roots(self) -> list:
+        # Find browser root processes among our descendants; returns their PIDs
+        roots = {}
+        try:
+            for proc in self._self_proc.children(recursive=True):
+                if not _is_browser(proc):
+                    continue
+                try:
+                    parent = proc.parent()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    parent = None
+                if parent is None or not _is_browser(parent):
+                    roots[proc.pid] = proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
+            log.warning("Browser process discovery failed: %s", e)
+        with self._lock:
+            self._roots = roots
+        return list(roots)
+
+    def _tree(self) -> list:
+        with self._lock:
+            roots = dict(self._roots)
+        tree = []
+        for pid, root in roots.items():
+            try:
+                tree.append(root)
+                tree.extend(root.children(recursive=True))
+            except psutil.NoSuchProcess:
+                with self._lock:
+                    self._roots.pop(pid, None)
+        # reuse cached Process objects so repeated calls are consistent
+        with self._lock:
+            procs = [self._procs.setdefault(proc.pid, proc) for proc in tree]
+            live = {p.pid for p in procs}
+            for pid in list(self._procs):
+                if pid not in live:
+                    del self._procs[pid]
+        return procs
+
+    # ----------------------------
+    # Sampling
+    # ----------------------------
+    def browser_rss_mb(self) -> float:
+        # Current RSS of the tracked browser tree(s), measured now
+        total = 0
+        for proc in self._tree():
+            try:
+                total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    def sample_once(self) -> Sample:
+        if not self._roots:
+            self.refresh_roots()
+        rss = cpu = handles = count = 0
+        for proc in self._tree():
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    t = proc.cpu_times()
+                    cpu += t.user + t.system
+                    handles += _handles(proc)
+                count += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        me = self._self_proc
+        with me.oneshot():
+            t = me.cpu_times()
+            sample = Sample(
+                time.time(), rss / (1024 * 1024), cpu, handles, count,
+                me.memory_info().rss / (1024 * 1024), t.user + t.system, _handles(me),
+            )
+        self.samples.append(sample)
+        if self.on_sample:
+            self.on_sample(sample)
+        return sample
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception as e:
+                log.warning("Resource sample failed: %s", e)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # ----------------------------
+    # Statistics
+    # ----------------------------
+    def stats(self) -> dict:
+        # {field: {"peak", "mean", "p50", "p95", "p99"}} over the ring buffer
+        samples = list(self.samples)
+        result = {}
+        for field in STAT_FIELDS:
+            values = [getattr(s, field) for s in samples]
+            result[field] = {
+                "peak": max(values) if values else 0.0,
+                "mean": sum(values) / len(values) if values else 0.0,
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+        return result
+
+    def summary(self) -> str:
+        st = self.stats()
+        lines = [f"resource samples: {len(self.samples)} (every {self.interval:.0f}s)"]
+        for field in ("browser_rss_mb", "self_rss_mb", "browser_handles", "browser_procs"):
+            s = st[field]
+            lines.append(f"  {field}: peak {s['peak']:.1f}, mean {s['mean']:.1f}, "
+                         f"p50 {s['p50']:.1f}, p95 {s['p95']:.1f}, p99 {s['p99']:.1f}")
+        if len(self.samples) >= 2:
+            first, last = self.samples[0], self.samples[-1]
+            span = max(last.ts - first.ts, 1e-9)
+            # a rotated browser restarts its CPU counters, so clamp at zero
+            browser_cpu = max(last.browser_cpu_s - first.browser_cpu_s, 0.0)
+            lines.append(f"  cpu: browser {100 * browser_cpu / span:.1f}%, "
+                         f"self {100 * (last.self_cpu_s - first.self_cpu_s) / span:.1f}% over the window")
+        return "\n".join(lines)
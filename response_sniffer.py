@@ -0,0 +1,84 @@
+# response_sniffer.py - Trump Watcher
+# Capture the feed's own timeline XHR/fetch JSON instead of scraping the DOM
+
+import re
+import time
+
+from truth_api import status_to_post
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+TIMELINE_URL_RE = re.compile(r"/api/v1/accounts/[^/?]+/statuses")
+PINNED_QUERY_RE = re.compile(r"[?&]pinned=true")
+
+
+class TimelineSniffer:
+    """
+    Listens to page responses and keeps the timeline API calls the front end
+    makes on load / reload / scroll. collect() decodes everything captured
+    since the previous collect() into post dicts with exact status IDs.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self._responses = []
+        self.captured = 0
+        self.decoded = 0
+        self.decode_errors = 0
+        self.last_ms = 0.0
+        page.on("response", self._on_response)
+
+    def _on_response(self, response) -> None:
+        # Event handler: only remember the response, decode it later on the monitor thread
+        if not TIMELINE_URL_RE.search(response.url):
+            return
+        if response.request.resource_type not in ("xhr", "fetch") or not response.ok:
+            return
+        self._responses.append(response)
+        self.captured += 1
+
+    def collect(self):
+        """
+        Return posts (newest first, deduped by status id) from every
+        timeline payload seen since the last call, or None if no payload
+        was captured - the caller should then fall back to the DOM.
+        """
+        responses, self._responses = self._responses, []
+        if not responses:
+            return None
+
+        start = time.perf_counter()
+        by_id = {}
+        for response in responses:
+            try:
+                statuses = response.json()
+            except Exception as e:
+                self.decode_errors += 1
+                log.warning("Could not decode timeline payload %s: %s", response.url, e)
+                continue
+            if not isinstance(statuses, list):
+                continue
+            pinned = bool(PINNED_QUERY_RE.search(response.url))
+            for status in statuses:
+                post = status_to_post(status)
+                if pinned:
+                    post["pinned"] = True
+                if post["id"]:
+                    # a status seen in both lists keeps its pinned flag
+                    if post["id"] in by_id:
+                        post["pinned"] = post["pinned"] or by_id[post["id"]]["pinned"]
+                    by_id[post["id"]] = post
+            self.decoded += 1
+        self.last_ms = (time.perf_counter() - start) * 1000
+
+        if not by_id:
+            return None
+        return sorted(by_id.values(), key=lambda p: int(p["id"]) if p["id"].isdigit() else 0, reverse=True)
+
+    def summary(self) -> str:
+        return (f"timeline sniffer: {self.captured} payloads captured, {self.decoded} decoded, "
+                f"{self.decode_errors} decode errors")
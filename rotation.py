@@ -0,0 +1,117 @@
+# rotation.py - Trump Watcher
+# Threshold-triggered, pre-warmed browser rotation
+
+import gc
+import time
+from collections import Counter, deque
+
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+ROTATION_HISTORY = 50          # rotations kept for the summary
+PROCESS_RSS_GROWTH = 0.10      # our RSS must grow this much past its post-rotation level to trigger again
+
+
+class RotationManager:
+    """
+    Decides when the headless browser should be replaced and does it
+    without a cold gap: the replacement is launched and loaded first, the
+    old one is torn down afterwards, then after_teardown() (a GC pass by
+    default) runs.
+
+    Triggers (any one is enough): headless browser RSS, our own RSS, page
+    age, or a caller-supplied reason such as repeated poll failures.
+    Thresholds of 0/None are disabled. A swap frees little of our own
+    memory, so once our RSS has triggered a rotation it only triggers
+    again after growing PROCESS_RSS_GROWTH past its post-rotation level.
+
+    rotate(..., prewarm=False) tears the old browser down first - for
+    error rotations, where the old driver may be what is broken.
+    """
+
+    def __init__(self, headless_mem_fn, process_mem_fn, *,
+                 max_headless_mb: float = None, max_process_mb: float = None,
+                 max_page_age: float = None, after_teardown=gc.collect):
+        self.after_teardown = after_teardown
+        self.headless_mem_fn = headless_mem_fn
+        self.process_mem_fn = process_mem_fn
+        self.max_headless_mb = max_headless_mb
+        self.max_process_mb = max_process_mb
+        self.max_page_age = max_page_age
+        self.page_started = time.time()
+        self.last_poll_end = time.time()
+        self.rotations = 0
+        self.process_floor = 0.0       # our RSS (MB) right after the last rotation
+        self.causes = Counter()
+        self.history = deque(maxlen=ROTATION_HISTORY)   # (cause, prewarm_s, teardown_s, blind_s)
+
+    def mark_poll_done(self) -> None:
+        # Called after each successful poll of the current page
+        self.last_poll_end = time.time()
+
+    def check(self, forced_reason: str = None):
+        # Return the reason a rotation is due, or None
+        if forced_reason:
+            return forced_reason
+        if self.max_page_age and time.time() - self.page_started >= self.max_page_age:
+            return "page-age"
+        if self.max_headless_mb:
+            headless_mb = self.headless_mem_fn()
+            if headless_mb >= self.max_headless_mb:
+                return f"headless-rss {headless_mb:.0f}MB"
+        if self.max_process_mb:
+            process_mb = self.process_mem_fn()
+            if process_mb >= max(self.max_process_mb, self.process_floor * (1 + PROCESS_RSS_GROWTH)):
+                return f"process-rss {process_mb:.0f}MB"
+        return None
+
+    def rotate(self, cause: str, old, start_fn, close_fn, prewarm: bool = True):
+        """
+        old is the current (context, page). start_fn() must return a new,
+        fully loaded (context, page); close_fn(context) tears one down.
+        Returns the new pair. With prewarm, if the replacement fails to
+        start, the old browser is kept and the error is re-raised; without
+        it the old one is already gone and the next rotation starts afresh.
+        """
+        started = time.time()
+        if prewarm:
+            log.info("Rotating browser (%s) — pre-warming replacement", cause)
+            new = start_fn()
+            ready = time.time()
+            close_fn(old[0])
+            self.after_teardown()
+            done = time.time()
+            prewarm_s, teardown_s = ready - started, done - ready
+        else:
+            log.info("Restarting browser (%s)", cause)
+            close_fn(old[0])
+            self.after_teardown()
+            torn_down = time.time()
+            new = start_fn()
+            ready = time.time()
+            prewarm_s, teardown_s = ready - torn_down, torn_down - started
+        # time during which no page was polled: since the old page's last poll
+        # until the replacement was ready
+        blind_s = ready - min(self.last_poll_end, started)
+        kind = cause.split()[0]
+        self.rotations += 1
+        self.causes[kind] += 1
+        self.history.append((cause, prewarm_s, teardown_s, blind_s))
+        self.page_started = ready
+        if self.max_process_mb:
+            self.process_floor = self.process_mem_fn()
+        log.info("Browser rotated: pre-warm %.1fs, teardown %.1fs, blind window %.1fs",
+                 prewarm_s, teardown_s, blind_s)
+        return new
+
+    def summary(self) -> str:
+        if not self.rotations:
+            return "browser rotations: 0"
+        blinds = [h[3] for h in self.history]
+        causes = ", ".join(f"{k}={v}" for k, v in self.causes.most_common())
+        return (f"browser rotations: {self.rotations} ({causes}); blind window "
+                f"mean {sum(blinds) / len(blinds):.1f}s, max {max(blinds):.1f}s")
@@ -0,0 +1,236 @@
+# rules.py - Trump Watcher
+# Rule engine: blacklist phrases and keyword watchlists compiled into one matcher, plus regex rules
+
+import json
+import re
+from collections import Counter
+
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+SUPPRESS = "suppress"             # drop the post (cookie banners, sign-up prompts, ...)
+PRIORITY = "priority"             # notify at once, past coalescing and the toast rate limit
+TAG = "tag"                       # label the post (sinks see post["tags"])
+ACTIONS = (SUPPRESS, PRIORITY, TAG)
+SCAN_MAX_PHRASES = 48             # up to this many phrases, str.find per phrase beats the trie regex (bench_rules)
+
+
+class RuleError(ValueError):
+    # A rule file that cannot be read or compiled
+    pass
+
+
+class Rule:
+    """
+    One named rule: any of its phrases (matched from the start of a word)
+    or regexes firing counts as a hit. Both ignore case unless
+    case_sensitive=True. whole_word=True also requires phrases to end on a
+    word boundary ("tariff" then does not fire on "tariffs").
+    """
+
+    def __init__(self, name: str, action: str, phrases=(), regex=(), whole_word: bool = False,
+                 tag: str = None, case_sensitive: bool = False):
+        if action not in ACTIONS:
+            raise RuleError(f"Rule {name!r}: unknown action {action!r} (expected one of {', '.join(ACTIONS)})")
+        if isinstance(phrases, str):
+            phrases = [phrases]
+        if isinstance(regex, str):
+            regex = [regex]
+        self.name = name
+        self.action = action
+        self.phrases = [p if case_sensitive else p.lower() for p in phrases if p]
+        self.regex = list(regex)
+        self.whole_word = whole_word
+        self.tag = tag or name
+        self.case_sensitive = case_sensitive
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Rule":
+        try:
+            return cls(data["name"], data.get("action", TAG), data.get("phrases", ()), data.get("regex", ()),
+                       bool(data.get("whole_word")), data.get("tag"), bool(data.get("case_sensitive")))
+        except (KeyError, TypeError, AttributeError) as e:
+            raise RuleError(f"Invalid rule {data!r}: {e}") from None
+
+
+class RuleHit:
+    __slots__ = ("rule", "text", "start")
+
+    def __init__(self, rule: Rule, text: str, start: int):
+        self.rule = rule
+        self.text = text
+        self.start = start          # offset in the post text
+
+    def __repr__(self):
+        return f"RuleHit({self.rule.name!r}, {self.text!r}, {self.start})"
+
+
+class Verdict:
+    # What the rules say about one post
+    __slots__ = ("hits", "suppressed_by", "priority", "tags")
+
+    def __init__(self, hits: list):
+        self.hits = hits
+        self.suppressed_by = next((h for h in hits if h.rule.action == SUPPRESS), None)
+        self.priority = any(h.rule.action == PRIORITY for h in hits)
+        self.tags = sorted({h.rule.tag for h in hits if h.rule.action == TAG})
+
+
+_NO_HITS = Verdict([])            # shared by every post no rule fired on (read-only)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _trie_regex(trie: dict) -> str:
+    # Regex for a character trie: each node is one alternation keyed by its next
+    # character, so the engine follows a single path instead of trying every phrase.
+    # End-of-phrase nodes make the rest optional (greedy = longest phrase).
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(trie.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if "" in trie else body
+
+
+class RuleSet:
+    """
+    All phrases of all rules compiled into one matcher over the lowercased
+    post. Phrases (matched from the start of a word) live in a character
+    trie; with more than SCAN_MAX_PHRASES of them the trie becomes one
+    regex of zero-width lookaheads, so their cost is per character of text,
+    not per phrase - the watchlist can grow into the thousands. Below that,
+    a substring scan per phrase is faster than any regex and is used
+    instead. Where a phrase starts, the trie is walked along the longest
+    match to report every shorter phrase on its path too. Phrases of
+    case-sensitive rules are scanned for in the original text.
+
+    Regex rules are compiled on their own (case-insensitive) and each runs
+    once over the original text, so inline flags, backreferences and group
+    names behave as they do in a standalone pattern. Their cost is linear
+    in the number of regex rules (bench/bench_rules.py measures it), so
+    keep those to a handful and put plain words in phrases.
+    """
+
+    def __init__(self, rules: list, scan_max_phrases: int = SCAN_MAX_PHRASES):
+        self.rules = list(rules)
+        self.checked = 0
+        self.hits = Counter()       # rule name -> posts it fired on
+
+        self._trie = {}
+        self._phrases = {}          # phrase -> rules (the substring-scan path)
+        exact = {}                  # phrase -> rules, case-sensitive (always scanned)
+        for rule in self.rules:
+            for phrase in rule.phrases:
+                if rule.case_sensitive:
+                    exact.setdefault(phrase, []).append(rule)
+                    continue
+                node = self._trie
+                for ch in phrase:
+                    node = node.setdefault(ch, {})
+                node.setdefault("", []).append(rule)
+                self._phrases.setdefault(phrase, []).append(rule)
+        self._scan = len(self._phrases) <= scan_max_phrases
+        self._phrase_items = tuple(self._phrases.items())
+        self._exact_items = tuple(exact.items())
+        self._phrase_pattern = None
+        if self._trie and not self._scan:
+            self._phrase_pattern = re.compile(r"(?<!\w)(?=(" + _trie_regex(self._trie) + "))")
+
+        self._regex_rules = []      # (rule, compiled)
+        for rule in self.rules:
+            for source in rule.regex:
+                try:
+                    compiled = re.compile(source, 0 if rule.case_sensitive else re.IGNORECASE)
+                except re.error as e:
+                    raise RuleError(f"Rule {rule.name!r}: bad regex {source!r}: {e}") from None
+                if compiled.match(""):
+                    raise RuleError(f"Rule {rule.name!r}: regex {source!r} matches the empty string")
+                self._regex_rules.append((rule, compiled))
+
+    def __len__(self):
+        return len(self.rules)
+
+    def match(self, text: str) -> list:
+        # Every rule hit in text, in order of position
+        if not text:
+            return []
+        low = text.lower()
+        hits = []
+        if self._exact_items:
+            self._scan_phrases(text, self._exact_items, hits)
+        if self._scan:
+            self._scan_phrases(low, self._phrase_items, hits)
+        elif self._phrase_pattern is not None:
+            for m in self._phrase_pattern.finditer(low):
+                self._walk_trie(low, m.start(), m.end(1), hits)
+        for rule, compiled in self._regex_rules:
+            for m in compiled.finditer(text):
+                hits.append(RuleHit(rule, m.group(), m.start()))
+        if len(hits) > 1:
+            hits.sort(key=lambda h: h.start)
+        return hits
+
+    def _scan_phrases(self, text: str, items: tuple, hits: list) -> None:
+        # str.find per phrase, keeping matches that start a word
+        for phrase, rules in items:
+            if phrase in text:
+                pos = text.find(phrase)
+                while pos != -1:
+                    if pos == 0 or not _is_word_char(text[pos - 1]):
+                        self._add_phrase(text, pos, pos + len(phrase), rules, hits)
+                    pos = text.find(phrase, pos + 1)
+
+    def _walk_trie(self, low: str, start: int, end: int, hits: list) -> None:
+        # Follow the longest match through the trie; every phrase ending on the way is a hit
+        node = self._trie
+        for i in range(start, end):
+            node = node[low[i]]
+            rules = node.get("")
+            if rules:
+                self._add_phrase(low, start, i + 1, rules, hits)
+
+    @staticmethod
+    def _add_phrase(text: str, start: int, end: int, rules: list, hits: list) -> None:
+        at_boundary = end == len(text) or not _is_word_char(text[end])
+        for rule in rules:
+            if at_boundary or not rule.whole_word:
+                hits.append(RuleHit(rule, text[start:end], start))
+
+    def check(self, text: str) -> Verdict:
+        # match() + the combined verdict, counted per rule for the summary
+        hits = self.match(text)
+        self.checked += 1
+        if not hits:
+            return _NO_HITS
+        self.hits.update({h.rule.name for h in hits})
+        return Verdict(hits)
+
+    def summary(self) -> str:
+        top = ", ".join(f"{name} {count}" for name, count in self.hits.most_common(5))
+        return (f"rules: {len(self.rules)} rules, {self.checked} posts checked"
+                + (f", hits: {top}" if top else ""))
+
+
+def load_rules(path: str, base: list = ()) -> RuleSet:
+    """
+    RuleSet from a JSON file ({"rules": [{"name", "action", "phrases",
+    "regex", "whole_word", "tag", "case_sensitive"}, ...]} or a bare list), appended to the
+    base rules (the built-in boilerplate filter).
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RuleError(f"Could not read rules from {path}: {e}") from None
+    entries = data.get("rules", []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise RuleError(f"{path}: expected a list of rules")
+    rules = list(base) + [Rule.from_dict(entry) for entry in entries]
+    log.info("Loaded %s rules from %s", len(rules) - len(base), path)
+    return RuleSet(rules)
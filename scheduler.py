@@ -0,0 +1,210 @@
+# scheduler.py - Trump Watcher
+# Heap-based poll scheduler: per-source intervals, jitter, error backoff, lag stats
+
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+from collections import deque
+
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_JITTER = 0.1            # +/-10% of the interval
+DEFAULT_MAX_BACKOFF = 15 * 60   # never wait longer than this after errors
+DEFAULT_MAX_FAILURES = 6        # backoff exponent stops growing after this many failures
+LAG_HISTORY = 512               # lag samples kept per job
+
+
+def percentile(values, pct: float) -> float:
+    # Nearest-rank percentile of an iterable (0.0 if empty)
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+class PollJob:
+    """
+    One recurring poll. func() is called with no arguments; raising marks
+    the run as failed and pushes the next run out with exponential backoff.
+    deadline is how late (seconds) a run may start before it is skipped
+    rather than run stale; it defaults to the interval.
+    """
+
+    def __init__(self, name: str, func, interval: float, *, priority: int = 0,
+                 jitter: float = DEFAULT_JITTER, deadline: float = None,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF,
+                 max_failures: int = DEFAULT_MAX_FAILURES):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.priority = priority          # lower runs first when several jobs are due
+        self.jitter = jitter
+        self.deadline = deadline
+        self.max_backoff = max_backoff
+        self.max_failures = max_failures
+
+        self.planned = 0.0                # monotonic time this run was scheduled for
+        self.failures = 0                 # consecutive failures
+        self.runs = 0
+        self.errors = 0
+        self.missed = 0                   # runs skipped because their deadline passed
+        self.last_duration = 0.0
+        self.last_error = None
+        self.lags = deque(maxlen=LAG_HISTORY)   # actual - planned start, seconds
+        self.active = True
+
+    def next_delay(self, rng: random.Random) -> float:
+        # Interval with backoff on consecutive failures, then jitter
+        delay = self.interval
+        if self.failures:
+            delay = min(self.interval * 2 ** min(self.failures, self.max_failures), self.max_backoff)
+        if self.jitter:
+            delay *= 1 + rng.uniform(-self.jitter, self.jitter)
+        return max(delay, 0.0)
+
+    def lag_stats(self) -> dict:
+        lags = list(self.lags)
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "missed": self.missed,
+            "mean_ms": (sum(lags) / len(lags) * 1000) if lags else 0.0,
+            "p95_ms": percentile(lags, 95) * 1000,
+            "max_ms": max(lags) * 1000 if lags else 0.0,
+        }
+
+
+class PollScheduler:
+    """
+    Timer queue of PollJobs ordered by (due time, priority).
+
+    run(stop_event) drives jobs from the calling thread, sleeping on the
+    event between runs. For other drivers (e.g. asyncio) use
+    next_delay() / pop_due() / complete() directly.
+    """
+
+    def __init__(self, clock=time.monotonic, rng: random.Random = None, on_complete=None):
+        self.clock = clock
+        self.on_complete = on_complete    # callback(job, ok, duration) after every run
+        self.rng = rng or random.Random()
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.jobs = {}
+
+    def add(self, job: PollJob, delay: float = 0.0) -> PollJob:
+        with self._lock:
+            self.jobs[job.name] = job
+            self._push(job, self.clock() + delay)
+        return job
+
+    def remove(self, name: str) -> None:
+        # The job stays in self.jobs so its stats still show up in summary()
+        with self._lock:
+            job = self.jobs.get(name)
+            if job:
+                job.active = False      # stale heap entries are dropped lazily
+
+    def _push(self, job: PollJob, due: float) -> None:
+        job.planned = due
+        heapq.heappush(self._heap, (due, job.priority, next(self._seq), job))
+
+    def _drop_inactive(self) -> None:
+        while self._heap and not self._heap[0][3].active:
+            heapq.heappop(self._heap)
+
+    def next_delay(self):
+        # Seconds until the next job is due (0 if overdue), or None if empty
+        with self._lock:
+            self._drop_inactive()
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - self.clock())
+
+    def pop_due(self):
+        """
+        Return the next job whose time has come, or None. A run that would
+        start past its deadline is skipped: every slot that has gone by is
+        counted as missed and the job moves to its next slot after now (no
+        late runs, no catch-up bursts).
+        """
+        with self._lock:
+            while True:
+                self._drop_inactive()
+                if not self._heap:
+                    return None
+                now = self.clock()
+                due, _, _, job = self._heap[0]
+                if due > now:
+                    return None
+                heapq.heappop(self._heap)
+                lag = now - due
+                deadline = job.deadline if job.deadline is not None else job.interval
+                if lag > deadline and job.interval > 0:
+                    slots = math.floor(lag / job.interval) + 1
+                    job.missed += slots
+                    self._push(job, due + slots * job.interval)
+                    continue
+                job.lags.append(lag)
+                return job
+
+    def complete(self, job: PollJob, ok: bool, duration: float = 0.0, error=None) -> None:
+        # Record the outcome of a run and queue the next one
+        with self._lock:
+            job.runs += 1
+            job.last_duration = duration
+            if ok:
+                job.failures = 0
+            else:
+                job.errors += 1
+                job.failures += 1
+                job.last_error = error
+            if job.active:
+                now = self.clock()
+                # fixed-rate cadence: after a success the next run is relative to
+                # the planned start (unless the run overran that slot); after a
+                # failure the backoff delay counts from now
+                delay = job.next_delay(self.rng)
+                self._push(job, max(job.planned + delay, now) if ok else now + delay)
+        if self.on_complete:
+            self.on_complete(job, ok, duration)
+
+    def run_job(self, job: PollJob) -> bool:
+        start = time.perf_counter()
+        try:
+            job.func()
+        except Exception as e:
+            log.warning("Job %r failed (%s in a row): %s", job.name, job.failures + 1, e)
+            self.complete(job, False, time.perf_counter() - start, str(e))
+            return False
+        self.complete(job, True, time.perf_counter() - start)
+        return True
+
+    def run(self, stop_event: threading.Event) -> None:
+        # Dispatch jobs until stop_event is set or every job has been removed
+        while not stop_event.is_set():
+            delay = self.next_delay()
+            if delay is None:
+                break
+            if delay > 0 and stop_event.wait(delay):
+                break
+            job = self.pop_due()
+            if job is not None:
+                self.run_job(job)
+
+    def summary(self) -> str:
+        lines = []
+        for name, job in self.jobs.items():
+            s = job.lag_stats()
+            lines.append(f"job {name}: {s['runs']} runs, {s['errors']} errors, {s['missed']} missed, "
+                         f"lag mean {s['mean_ms']:.0f} ms / p95 {s['p95_ms']:.0f} ms / max {s['max_ms']:.0f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,177 @@
+# seen_store.py - Trump Watcher
+# Persistent, bounded store of already-notified post digests
+
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+# ----------------------------
+# Constants
+# ----------------------------
+DIGEST_SIZE = 16                      # bytes kept per post (truncated SHA-256)
+RECORD = struct.Struct(f"<{DIGEST_SIZE}sd")  # digest + last-seen unix time
+DEFAULT_MAX_ENTRIES = 50_000          # LRU cap
+DEFAULT_MAX_AGE = 180 * 24 * 3600     # drop digests not seen for ~6 months
+COMPACT_FACTOR = 2                    # rewrite the log once it holds 2x the live entries
+TOUCH_INTERVAL = 3600                 # a hit refreshes (and logs) last-seen at most this often
+
+
+def to_digest(h) -> bytes:
+    # Accept a hex SHA-256 string (as produced by hash_post) or raw bytes
+    if isinstance(h, str):
+        h = bytes.fromhex(h)
+    return bytes(h[:DIGEST_SIZE])
+
+
+class SeenStore:
+    """
+    Set-like store of post hashes with an LRU / time-window cap.
+
+    Digests are kept as 16-byte keys in an OrderedDict (oldest first) and
+    persisted to an append-only file of fixed-width records, so loading is
+    a single read + struct.iter_unpack. The log is compacted when it grows
+    past COMPACT_FACTOR x the live entry count. A hit moves the digest to
+    the end and refreshes its last-seen time (logged at most once per
+    TOUCH_INTERVAL), so the head is the oldest (to within TOUCH_INTERVAL)
+    and age eviction only has to look there. All methods take a lock, so
+    the monitor and tray threads can share one instance.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_age: float = DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._log = None
+        self._log_records = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_ms = 0.0
+        if path:
+            self._load()
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def _load(self) -> None:
+        start = time.perf_counter()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = b""
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                data = f.read()
+        usable = len(data) - len(data) % RECORD.size   # ignore a torn final record
+        for digest, seen_at in RECORD.iter_unpack(data[:usable]):
+            self._entries[digest] = seen_at
+            self._entries.move_to_end(digest)
+        self._log_records = usable // RECORD.size
+        self._evict(time.time())
+
+        if usable != len(data) or self._log_records > COMPACT_FACTOR * max(len(self._entries), 1):
+            self._compact()
+        else:
+            self._log = open(self.path, "ab")
+        self.load_ms = (time.perf_counter() - start) * 1000
+
+    def _compact(self) -> None:
+        # Rewrite the log with only the live entries, atomically
+        if self._log:
+            self._log.close()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(RECORD.pack(d, t) for d, t in self._entries.items()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._log_records = len(self._entries)
+        self._log = open(self.path, "ab")
+
+    def _append(self, digest: bytes, seen_at: float) -> None:
+        if not self._log:
+            return
+        self._log.write(RECORD.pack(digest, seen_at))
+        self._log.flush()
+        self._log_records += 1
+        if self._log_records > COMPACT_FACTOR * max(self.max_entries, len(self._entries)):
+            self._compact()
+
+    # ----------------------------
+    # Eviction
+    # ----------------------------
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.max_age
+        while self._entries:
+            digest, seen_at = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_entries and seen_at >= cutoff:
+                break
+            del self._entries[digest]
+            self.evictions += 1
+
+    def _touch(self, digest: bytes, now: float) -> None:
+        # Seen again: most recently used, and not to be aged out for another max_age
+        self._entries.move_to_end(digest)
+        if now - self._entries[digest] >= TOUCH_INTERVAL:
+            self._entries[digest] = now
+            self._append(digest, now)
+
+    # ----------------------------
+    # Set interface
+    # ----------------------------
+    def __contains__(self, h) -> bool:
+        digest = to_digest(h)
+        with self._lock:
+            if digest in self._entries:
+                self._touch(digest, time.time())
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, h) -> None:
+        digest = to_digest(h)
+        now = time.time()
+        with self._lock:
+            if digest in self._entries:
+                self._touch(digest, now)
+                return
+            self._entries[digest] = now
+            self._append(digest, now)
+            self._evict(now)
+
+    def check_and_add(self, h) -> bool:
+        # Atomically test membership and insert; returns True if already seen
+        with self._lock:
+            seen = h in self
+            if not seen:
+                self.add(h)
+            return seen
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_ms": self.load_ms,
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"seen store: {s['size']} entries, {s['hits']} hits, {s['misses']} misses, "
+                f"{s['evictions']} evictions, loaded in {s['load_ms']:.1f} ms")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log:
+                self._log.close()
+                self._log = None
@@ -0,0 +1,276 @@
+# simhash_index.py - Trump Watcher
+# Near-duplicate / edit detection: 64-bit SimHash signatures with banded (LSH) lookup
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+SIG_BITS = 64
+DEFAULT_BANDS = 8                 # 8 x 8-bit bands: any pair within 7 bits shares a band
+DEFAULT_MAX_DISTANCE = 10         # Hamming distance that still counts as "the same post"
+DEFAULT_MAX_ENTRIES = 5000        # recent posts kept in the index
+DIFF_MAX_CHARS = 120
+LANE_BITS = 20                    # per-bit counter width in the packed accumulator (posts < 1M words)
+TOKEN_CACHE_SIZE = 4096           # recent words whose packed hash is kept
+COMPACT_FACTOR = 2                # rewrite the index log once it holds 2x max_entries lines
+
+_WORD_RE = re.compile(r"\w+")
+
+
+# _BYTE_LANES[v] has a 1 in lane i for every set bit i of the byte v
+_BYTE_LANES = [sum(1 << (bit * LANE_BITS) for bit in range(8) if (v >> bit) & 1) for v in range(256)]
+_LANE_MASK = (1 << LANE_BITS) - 1
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _token_lanes(token: str) -> int:
+    # The token's 64-bit hash spread out one bit per LANE_BITS-wide lane, so summing
+    # these counts the set bits of every position at once (one big-int add per word)
+    h = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    lanes = 0
+    for i, byte in enumerate(h):
+        lanes |= _BYTE_LANES[byte] << (8 * i * LANE_BITS)
+    return lanes
+
+
+def simhash(text: str) -> int:
+    # 64-bit SimHash over lower-cased words; word order is deliberately ignored so
+    # the same post gathered in a different order gets the same signature
+    features = _WORD_RE.findall(text.lower())[:_LANE_MASK]
+    if not features:
+        return 0
+    counts = sum(map(_token_lanes, features))
+    # bit set in more than half the words = positive SimHash weight
+    words = len(features)
+    sig = 0
+    for bit in range(SIG_BITS):
+        if 2 * ((counts >> (bit * LANE_BITS)) & _LANE_MASK) > words:
+            sig |= 1 << bit
+    return sig
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def short_diff(old: str, new: str, max_chars: int = DIFF_MAX_CHARS) -> str:
+    # Word-level "-removed +added" summary of an edit
+    old_words, new_words = old.split(), new.split()
+    parts = []
+    matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op in ("replace", "delete"):
+            parts.append("-" + " ".join(old_words[i1:i2]))
+        if op in ("replace", "insert"):
+            parts.append("+" + " ".join(new_words[j1:j2]))
+    diff = " ".join(parts)
+    return diff if len(diff) <= max_chars else diff[:max_chars - 1] + "…"
+
+
+class SimHashEntry:
+    __slots__ = ("key", "sig", "text", "post_id")
+
+    def __init__(self, key: str, sig: int, text: str, post_id: str):
+        self.key = key
+        self.sig = sig
+        self.text = text
+        self.post_id = post_id
+
+
+class SimHashIndex:
+    """
+    Keeps SimHash signatures of recent posts. Each signature is split into
+    `bands` chunks; candidates are posts sharing at least one chunk, so a
+    lookup touches a handful of buckets instead of every post. With 8 bands
+    any pair within 7 differing bits is guaranteed to be found; pairs up to
+    max_distance are found with high probability. One-word edits of a
+    40-word post typically differ by 3-8 bits, unrelated posts by 20+.
+
+    With a path, every add is appended to a JSON-lines log (replayed on
+    start, compacted past COMPACT_FACTOR x max_entries lines), so an edit
+    made while the watcher was down is still matched to its post.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES, bands: int = DEFAULT_BANDS,
+                 max_distance: int = DEFAULT_MAX_DISTANCE):
+        if SIG_BITS % bands:
+            raise ValueError("bands must divide 64")
+        self.path = path
+        self.max_entries = max_entries
+        self.bands = bands
+        self.band_bits = SIG_BITS // bands
+        self.max_distance = max_distance
+        self._entries = OrderedDict()          # key -> SimHashEntry, oldest first
+        self._by_id = {}                       # post id -> key
+        self._buckets = [dict() for _ in range(bands)]   # band value -> set of keys
+        self._lock = threading.Lock()
+        self._log = None
+        self._log_lines = 0
+        self._last = (None, 0)                 # (text, sig) of the last lookup, reused by add()
+        self.lookups = 0
+        self.candidates_checked = 0
+        if path:
+            self._load()
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+    def _load(self) -> None:
+        # Replay the JSON-lines log (one line per add, oldest first)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            torn = False
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            data = json.loads(line)
+                            self._insert(data["key"], int(data["sig"]), data["text"], data.get("id"))
+                        except (ValueError, KeyError, TypeError):
+                            torn = True
+                            continue
+                        self._log_lines += 1
+                        torn = not line.endswith("\n")
+            if torn or self._log_lines > COMPACT_FACTOR * max(len(self._entries), 1):
+                self._compact()
+            else:
+                self._log = open(self.path, "a", encoding="utf-8")
+        except OSError as e:
+            log.warning("SimHash index not persisted (%s); edits are only matched within this run.", e)
+            self._log = None
+
+    def _compact(self) -> None:
+        # Rewrite the log with only the live entries, atomically
+        if self._log:
+            self._log.close()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(self._line(entry) for entry in self._entries.values())
+        os.replace(tmp_path, self.path)
+        self._log_lines = len(self._entries)
+        self._log = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _line(entry) -> str:
+        return json.dumps({"key": entry.key, "sig": entry.sig, "text": entry.text, "id": entry.post_id}) + "\n"
+
+    def _append(self, entry) -> None:
+        if not self._log:
+            return
+        try:
+            self._log.write(self._line(entry))
+            self._log.flush()
+            self._log_lines += 1
+            if self._log_lines > COMPACT_FACTOR * self.max_entries:
+                self._compact()
+        except OSError as e:
+            log.warning("SimHash index no longer persisted: %s", e)
+            self._log = None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log:
+                self._log.close()
+                self._log = None
+
+    def _band_values(self, sig: int):
+        mask = (1 << self.band_bits) - 1
+        return [(sig >> (i * self.band_bits)) & mask for i in range(self.bands)]
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band, value in enumerate(self._band_values(entry.sig)):
+            bucket = self._buckets[band].get(value)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][value]
+        if entry.post_id and self._by_id.get(entry.post_id) == key:
+            del self._by_id[entry.post_id]
+
+    def _sig(self, text: str) -> int:
+        # classify() then add() of the same post hash it once
+        last_text, last_sig = self._last
+        if text == last_text:
+            return last_sig
+        sig = simhash(text)
+        self._last = (text, sig)
+        return sig
+
+    def _insert(self, key: str, sig: int, text: str, post_id: str = None):
+        self._remove(key)
+        entry = SimHashEntry(key, sig, text, post_id or "")
+        self._entries[key] = entry
+        for band, value in enumerate(self._band_values(sig)):
+            self._buckets[band].setdefault(value, set()).add(key)
+        if post_id:
+            self._by_id[post_id] = key
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        return entry
+
+    def add(self, key: str, text: str, post_id: str = None) -> None:
+        sig = self._sig(text)
+        with self._lock:
+            self._append(self._insert(key, sig, text, post_id))
+
+    def nearest(self, text: str):
+        # (entry, distance) of the closest indexed post within max_distance, else (None, None)
+        sig = self._sig(text)
+        with self._lock:
+            self.lookups += 1
+            candidates = set()
+            for band, value in enumerate(self._band_values(sig)):
+                candidates |= self._buckets[band].get(value, set())
+            self.candidates_checked += len(candidates)
+            best, best_d = None, None
+            for key in candidates:
+                entry = self._entries[key]
+                d = hamming(sig, entry.sig)
+                if d <= self.max_distance and (best_d is None or d < best_d):
+                    best, best_d = entry, d
+            return best, best_d
+
+    def classify(self, text: str, post_id: str = None):
+        """
+        Return (kind, entry) where kind is:
+          "duplicate" - same content as an indexed post (e.g. text gathered in a different order)
+          "updated"   - an edit of an indexed post (same status id, or a close signature)
+          "new"       - nothing similar indexed, or the similar post is a different status id
+        """
+        with self._lock:
+            same_id = self._entries.get(self._by_id.get(post_id)) if post_id else None
+        if same_id is not None:
+            if same_id.text == text or self._sig(text) == same_id.sig:
+                return "duplicate", same_id
+            return "updated", same_id
+
+        entry, distance = self.nearest(text)
+        if entry is None or (post_id and entry.post_id and entry.post_id != post_id):
+            return "new", None
+        if distance == 0:
+            return "duplicate", entry
+        return "updated", entry
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def summary(self) -> str:
+        per_lookup = self.candidates_checked / self.lookups if self.lookups else 0.0
+        return (f"simhash index: {len(self)} posts, {self.lookups} lookups, "
+                f"{per_lookup:.1f} candidates per lookup")
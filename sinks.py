@@ -0,0 +1,293 @@
+# sinks.py - Trump Watcher
+# Fan-out delivery of detected posts to webhooks, JSON-lines files and commands
+
+import json
+import os
+import queue
+import random
+import subprocess
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from http_pool import HttpPool
+from scheduler import percentile
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_QUEUE_SIZE = 500          # posts waiting per sink before new ones are dropped
+DEFAULT_BATCH_SIZE = 10           # posts per delivery
+DEFAULT_BATCH_WAIT = 1.0          # seconds to wait for a batch to fill
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 2.0        # seconds, doubled per retry
+DEFAULT_BACKOFF_MAX = 120.0
+COMMAND_TIMEOUT = 30              # seconds per command run
+LATENCY_HISTORY = 256
+WEBHOOK_FORMATS = ("json", "slack", "discord")
+
+
+class SinkError(Exception):
+    # A delivery failed; retryable=False sends the batch straight to the dead-letter file
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def post_payload(post: dict, label: str, url: str = None) -> dict:
+    # The JSON shape every sink receives for one detected post
+    return {
+        "id": post.get("id") or None,
+        "label": label,
+        "text": post.get("normalized") or post.get("raw_text", ""),
+        "url": url,
+        "timestamp": post.get("timestamp") or None,
+        "update_of": post.get("update_of") or None,
+        "priority": bool(post.get("priority")),
+        "tags": post.get("tags") or [],
+        "hash": post.get("hash"),
+        "detected_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+# ----------------------------
+# Sinks
+# ----------------------------
+class WebhookSink:
+    """
+    POSTs each batch as JSON over a keep-alive connection pool.
+    format "json" sends {"posts": [...]}; "slack" / "discord" send one
+    chat message per batch ({"text": ...} / {"content": ...}).
+    5xx / 429 / network errors are retried, other 4xx are not.
+    """
+
+    def __init__(self, url: str, fmt: str = "json", headers: dict = None, timeout: float = 10):
+        if fmt not in WEBHOOK_FORMATS:
+            raise ValueError(f"Unknown webhook format {fmt!r} (expected one of {', '.join(WEBHOOK_FORMATS)})")
+        parts = urlsplit(url)
+        self.name = f"webhook:{parts.hostname}"
+        self.format = fmt
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.pool = HttpPool(f"{parts.scheme}://{parts.netloc}", timeout=timeout,
+                             default_headers=dict(headers or {}, **{"Content-Type": "application/json"}))
+
+    def _body(self, batch: list) -> dict:
+        if self.format == "json":
+            return {"posts": batch}
+        text = "\n\n".join(f"*{p['label']}*: {p['text']}" + (f"\n{p['url']}" if p["url"] else "")
+                           for p in batch)
+        return {"text": text} if self.format == "slack" else {"content": text[:2000]}
+
+    def deliver(self, batch: list) -> None:
+        body = json.dumps(self._body(batch)).encode("utf-8")
+        try:
+            resp = self.pool.request("POST", self.path, body=body)
+        except OSError as e:
+            raise SinkError(f"{type(e).__name__}: {e}")
+        if resp.status >= 300:
+            retryable = resp.status >= 500 or resp.status == 429
+            raise SinkError(f"HTTP {resp.status}", retryable=retryable)
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class FileSink:
+    # Appends one JSON object per line
+    def __init__(self, path: str):
+        self.name = f"file:{os.path.basename(path)}"
+        self.path = path
+
+    def deliver(self, batch: list) -> None:
+        lines = "".join(json.dumps(p, ensure_ascii=False) + "\n" for p in batch)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            raise SinkError(str(e))
+
+    def close(self) -> None:
+        pass
+
+
+class CommandSink:
+    # Runs a command per batch with the posts as a JSON array on stdin; non-zero exit = failure
+    def __init__(self, command: str, timeout: float = COMMAND_TIMEOUT):
+        self.name = f"command:{command.split()[0] if command.split() else command}"
+        self.command = command
+        self.timeout = timeout
+
+    def deliver(self, batch: list) -> None:
+        try:
+            result = subprocess.run(self.command, shell=True, input=json.dumps(batch).encode("utf-8"),
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            raise SinkError(f"timed out after {self.timeout:.0f}s")
+        except OSError as e:
+            raise SinkError(str(e))
+        if result.returncode != 0:
+            err = result.stderr.decode("utf-8", "replace").strip()[:200]
+            raise SinkError(f"exit {result.returncode}: {err}")
+
+    def close(self) -> None:
+        pass
+
+
+# ----------------------------
+# Delivery
+# ----------------------------
+class DeadLetterFile:
+    # JSON-lines record of batches that could not be delivered
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, sink_name: str, batch: list, error: str) -> None:
+        record = {"sink": sink_name, "error": error,
+                  "failed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"), "posts": batch}
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            log.warning("Could not write dead letter for %s: %s", sink_name, e)
+
+
+class SinkWorker:
+    """
+    One thread per sink with its own bounded queue: posts are batched,
+    delivered, retried with exponential backoff + jitter, and written to
+    the dead-letter file when retries run out. A slow or failing sink
+    only ever delays itself.
+    """
+
+    def __init__(self, sink, dead_letter: DeadLetterFile = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 batch_size: int = DEFAULT_BATCH_SIZE, batch_wait: float = DEFAULT_BATCH_WAIT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX):
+        self.sink = sink
+        self.dead_letter = dead_letter
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"sink-{sink.name}", daemon=True)
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+        self.stats = {"queued": 0, "delivered": 0, "batches": 0, "retries": 0,
+                      "failures": 0, "dead_lettered": 0, "dropped": 0}
+        self.last_error = None
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def put(self, payload: dict) -> bool:
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    def _next_batch(self) -> list:
+        try:
+            batch = [self._queue.get(timeout=1.0)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, batch: list) -> None:
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                self.sink.deliver(batch)
+                self.latencies.append(time.perf_counter() - start)
+                self.stats["delivered"] += len(batch)
+                self.stats["batches"] += 1
+                return
+            except SinkError as e:
+                error, retryable = str(e), e.retryable
+            except Exception as e:
+                error, retryable = f"{type(e).__name__}: {e}", True
+            self.latencies.append(time.perf_counter() - start)
+            self.stats["failures"] += 1
+            self.last_error = error
+            log.warning("Sink %s failed (attempt %s): %s", self.sink.name, attempt + 1, error)
+            if not retryable or attempt >= self.max_retries or self._stop.is_set():
+                self.stats["dead_lettered"] += len(batch)
+                if self.dead_letter:
+                    self.dead_letter.write(self.sink.name, batch, error)
+                return
+            delay = min(self.backoff_base * 2 ** attempt, self.backoff_max)
+            attempt += 1
+            self.stats["retries"] += 1
+            # a stop request cuts the backoff short; the batch then gets one last try
+            if self._stop.wait(delay * random.uniform(0.8, 1.2)):
+                attempt = self.max_retries
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._deliver(batch)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        # Deliver what is queued (one attempt each), then close the sink
+        self._stop.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            # still mid-delivery; closing the sink under it would break that request
+            log.warning("Sink %s did not stop within %.0fs; leaving it open.", self.sink.name, timeout)
+            return
+        self.sink.close()
+
+    def summary(self) -> str:
+        s = self.stats
+        lat = list(self.latencies)
+        return (f"sink {self.sink.name}: {s['delivered']}/{s['queued']} delivered in {s['batches']} batches, "
+                f"{s['retries']} retries, {s['dead_lettered']} dead-lettered, {s['dropped']} dropped, "
+                f"latency p50 {1000 * percentile(lat, 50):.0f} ms / p95 {1000 * percentile(lat, 95):.0f} ms"
+                + (f", last error: {self.last_error}" if self.last_error else ""))
+
+
+class SinkManager:
+    # Fans each published post out to every sink's worker; publish() never blocks
+    def __init__(self, dead_letter_path: str = None):
+        self.dead_letter = DeadLetterFile(dead_letter_path) if dead_letter_path else None
+        self.workers = []
+
+    def add(self, sink, **options) -> SinkWorker:
+        worker = SinkWorker(sink, self.dead_letter, **options)
+        worker.start()
+        self.workers.append(worker)
+        return worker
+
+    def publish(self, payload: dict) -> None:
+        for worker in self.workers:
+            if not worker.put(payload):
+                log.warning("Sink %s queue full — dropped post %s", worker.sink.name, payload.get('id'))
+
+    def stop(self, timeout: float = 5.0) -> None:
+        for worker in self.workers:
+            worker.stop(timeout)
+
+    def summary(self) -> str:
+        return "\n".join(worker.summary() for worker in self.workers)
@@ -0,0 +1,10 @@
+# conftest.py - Trump Watcher
+# Tests import the app modules from the repository root, with the app data folder in a temp dir
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# config reads APPDATA once at import: keep the seen store, archive and logs out of the real profile
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="trumpwatcher-tests-")
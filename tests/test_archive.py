@@ -0,0 +1,32 @@
+# test_archive.py - Trump Watcher
+# PostArchive: rows with and without a status id, edits, search order
+
+from archive import PostArchive, archive_record
+
+ACCOUNT = "someone"
+
+
+def record(text, status_id=None):
+    return archive_record({"id": status_id, "text": text}, ACCOUNT)
+
+
+def test_rows_without_an_id_never_take_a_status_id():
+    archive = PostArchive(":memory:")
+    assert archive.ingest([record("first tariff post", "100"), record("tariff post with no id")]) == 2
+    # a status id right after the existing one used to collide with the id-less row
+    assert archive.ingest([record("second tariff post", "101"), record("third tariff post", "102")]) == 2
+    assert archive.count() == 4
+    ids = [r[0] for r in archive.conn.execute("SELECT id FROM posts ORDER BY id")]
+    assert ids == [-1, 100, 101, 102]
+    found = archive.search("tariff")
+    assert [r["status_id"] for r in found] == ["102", "101", "100", None]
+
+
+def test_repeats_are_ignored_and_edits_update_in_place():
+    archive = PostArchive(":memory:")
+    archive.ingest([record("original words here", "7"), record("no id words here")])
+    assert archive.ingest([record("original words here", "7"), record("no id words here")]) == 0
+    assert archive.ingest([record("edited words here", "7")]) == 1
+    assert archive.count() == 2
+    assert archive.search("edited")[0]["status_id"] == "7"
+    assert archive.search("original") == []
@@ -0,0 +1,106 @@
+# test_browser_worker.py - Trump Watcher
+# BrowserWorker with a stub page in the spawned child: RPC round trip, hangs, crashes, restarts
+
+import os
+import threading
+import time
+
+import pytest
+
+import browser_worker
+from browser_worker import BrowserHangError, BrowserWorker, BrowserWorkerError, RemotePage, RestartLimitError
+
+
+class StubPage:
+    # Stands in for a Playwright page; expressions name what the stub should do
+    def evaluate(self, expression, arg=None):
+        if expression == "pid":
+            return os.getpid()
+        if expression == "hang":
+            time.sleep(60)
+        if expression == "raise":
+            raise ValueError("bad selector")
+        return {"expression": expression, "arg": arg}
+
+    def goto(self, url, **kwargs):
+        return object()          # like a Response: never sent back
+
+    def reload(self, **kwargs):
+        return object()
+
+    def wait_for_function(self, expression, arg=None, timeout=None):
+        return object()
+
+
+def stub_main(conn, heartbeat, options):
+    # Worker entry point without a browser; options["heartbeat"]=False plays a wedged process
+    stop = threading.Event()
+    if options.get("heartbeat", True):
+        threading.Thread(target=browser_worker._beat, args=(heartbeat, stop), daemon=True).start()
+    conn.send(("ready", os.getpid()))
+    browser_worker._serve(conn, StubPage())
+    stop.set()
+    conn.send(("closed", None))
+
+
+@pytest.fixture
+def make_worker(monkeypatch):
+    monkeypatch.setattr(browser_worker, "REPLY_POLL", 0.05)
+    workers = []
+
+    def make(**options):
+        worker = BrowserWorker(options, op_deadline=10, launch_deadline=30, target=stub_main)
+        worker.start()
+        workers.append(worker)
+        return worker
+    yield make
+    for worker in workers:
+        worker.close()
+
+
+def test_remote_page_round_trip(make_worker):
+    worker = make_worker()
+    page = RemotePage(worker)
+    assert page.evaluate("posts", {"known": {"1": "ab"}}) == {"expression": "posts", "arg": {"known": {"1": "ab"}}}
+    assert page.goto("https://example.invalid", wait_until="domcontentloaded", timeout=1000) is None
+    assert page.reload(timeout=1000) is None
+    assert page.wait_for_function("() => true", timeout=1000) is None
+    # an error in the page is reported, and the worker keeps serving
+    with pytest.raises(BrowserWorkerError, match="ValueError: bad selector"):
+        page.evaluate("raise")
+    assert page.evaluate("pid") == worker.pid
+
+
+def test_missed_deadline_kills_the_worker_and_the_next_call_respawns(make_worker):
+    worker = make_worker()
+    first = worker.pid
+    start = time.monotonic()
+    with pytest.raises(BrowserHangError, match="deadline"):
+        worker.call("evaluate", "hang", None, deadline=0.5)
+    assert time.monotonic() - start < 5
+    assert worker.pid is None
+    assert worker.call("evaluate", "pid", None) not in (None, first)
+
+
+def test_lost_heartbeat_is_a_hang(make_worker, monkeypatch):
+    monkeypatch.setattr(browser_worker, "HEARTBEAT_TIMEOUT", 0.5)
+    worker = make_worker(heartbeat=False)
+    with pytest.raises(BrowserHangError, match="stopped responding"):
+        worker.call("evaluate", "hang", None)
+
+
+def test_a_crashed_worker_is_restarted_and_the_call_retried(make_worker, monkeypatch):
+    monkeypatch.setattr(browser_worker, "MAX_RESTARTS", 1)
+    worker = make_worker()
+    first = worker.pid
+    crashes = browser_worker.worker_stats["crashes"]
+    worker._process.kill()
+    second = worker.call("evaluate", "pid", None)
+    assert second != first and second == worker.pid
+    assert browser_worker.worker_stats["crashes"] == crashes + 1
+
+    # past MAX_RESTARTS in the window, the worker stays down
+    worker._process.kill()
+    with pytest.raises(RestartLimitError):
+        worker.call("evaluate", "pid", None)
+
@@ -0,0 +1,62 @@
+# test_catchup.py - Trump Watcher
+# crawl_api against a fake client: since_id / max_id paging, stop at the last id, page cap
+
+import pytest
+
+import catchup
+from catchup import crawl_api
+
+PAGE = 5
+
+
+class FakeClient:
+    # A timeline of integer status ids answered like the statuses endpoint (newest first)
+    def __init__(self, newest, include_since=False):
+        self.ids = list(range(newest, 0, -1))
+        self.include_since = include_since
+        self.calls = []
+
+    def fetch_statuses(self, since_id=None, max_id=None, limit=40, conditional=False):
+        self.calls.append((since_id, max_id, limit))
+        low = int(since_id) if since_id else 0
+        page = [i for i in self.ids
+                if (i >= low if self.include_since else i > low) and (max_id is None or i < int(max_id))]
+        return [{"id": str(i), "content": f"<p>post {i}</p>"} for i in page[:limit]]
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    monkeypatch.setattr(catchup, "API_PAGE_LIMIT", PAGE)
+
+
+def ids(posts):
+    return [int(p["id"]) for p in posts]
+
+
+def test_pages_back_with_max_id_until_the_last_seen_id():
+    client = FakeClient(newest=22)
+    posts, complete = crawl_api(client, "10")
+    assert complete
+    assert ids(posts) == list(range(22, 10, -1))
+    assert client.calls == [("10", None, PAGE), ("10", "18", PAGE), ("10", "13", PAGE)]
+
+
+def test_a_full_last_page_needs_one_empty_page_to_finish():
+    client = FakeClient(newest=20)
+    posts, complete = crawl_api(client, "10")
+    assert complete and ids(posts) == list(range(20, 10, -1))
+    assert [max_id for _, max_id, _ in client.calls] == [None, "16", "11"]
+
+
+def test_the_last_seen_post_itself_is_never_returned():
+    client = FakeClient(newest=13, include_since=True)
+    posts, complete = crawl_api(client, "10")
+    assert complete and ids(posts) == [13, 12, 11]
+
+
+def test_stops_at_the_page_limit_and_reports_incomplete():
+    client = FakeClient(newest=100)
+    posts, complete = crawl_api(client, "10", max_pages=2)
+    assert not complete
+    assert ids(posts) == list(range(100, 90, -1))
+    assert len(client.calls) == 2
@@ -0,0 +1,80 @@
+# test_extraction.py - Trump Watcher
+# FeedWatermark and the top-of-feed fast path, with the in-page scan replayed in Python
+
+import zlib
+
+from extraction import EXTRACT_NEW_POSTS_JS, FeedWatermark, scrape_new_posts
+
+
+def status(post_id, text, pinned=False):
+    return {"id": post_id, "author": "Donald J. Trump", "text": text, "media": [],
+            "pinned": pinned, "timestamp": ""}
+
+
+class FakePage:
+    # Runs EXTRACT_NEW_POSTS_JS's loop over a list of statuses (newest first)
+    def __init__(self, statuses):
+        self.statuses = statuses
+
+    def evaluate(self, js, known):
+        assert js == EXTRACT_NEW_POSTS_JS
+        posts, scanned, stopped = [], 0, False
+        for block in self.statuses:
+            post = dict(block)
+            scanned += 1
+            if post["pinned"]:
+                continue
+            post["fp"] = format(zlib.crc32(post["text"].encode()), "x")
+            if post["id"] and known.get(post["id"]) == post["fp"]:
+                stopped = True
+                break
+            posts.append(post)
+        return {"posts": posts, "scanned": scanned, "stopped": stopped}
+
+
+def test_update_keeps_the_newest_ids_last_and_evicts_the_oldest():
+    wm = FeedWatermark(size=3)
+    wm.update([{"id": "3", "fp": "c"}, {"id": "2", "fp": "b"}, {"id": "1", "fp": "a"}])
+    assert list(wm.known()) == ["1", "2", "3"]
+    wm.update([{"id": "5", "fp": "e"}, {"id": "4", "fp": "d"}, {"id": "", "fp": "x"}, {"id": "9"}])
+    assert wm.known() == {"3": "c", "4": "d", "5": "e"}
+    # a re-handled (edited) id moves to the newest end with its new fingerprint
+    wm.update([{"id": "3", "fp": "c2"}])
+    assert list(wm.known().items()) == [("4", "d"), ("5", "e"), ("3", "c2")]
+
+
+def test_record_scan_counts_only_unchanged_polls_as_hits():
+    wm = FeedWatermark()
+    wm.record_scan([], 1, True)
+    wm.record_scan([{"id": "2"}], 2, True)
+    wm.record_scan([{"id": "1"}], 20, False)
+    assert (wm.polls, wm.hits, wm.blocks_scanned, wm.last_scanned) == (3, 1, 23, 20)
+    assert wm.hit_rate() == 1 / 3
+    assert "1/3 polls unchanged" in wm.summary()
+
+
+def test_scrape_new_posts_stops_at_the_first_known_status():
+    wm = FeedWatermark()
+    page = FakePage([status("0", "pinned post", pinned=True), status("2", "second"), status("1", "first")])
+    first = scrape_new_posts(page, wm)
+    assert [p["id"] for p in first] == ["2", "1"]
+    wm.update(first)
+
+    assert scrape_new_posts(page, wm) == []
+    assert (wm.hits, wm.last_scanned) == (1, 2)
+
+    page.statuses.insert(1, status("3", "third"))
+    assert [p["id"] for p in scrape_new_posts(page, wm)] == ["3"]
+    assert wm.last_scanned == 3
+
+
+def test_an_edited_post_is_returned_again():
+    wm = FeedWatermark()
+    page = FakePage([status("2", "second"), status("1", "first")])
+    wm.update(scrape_new_posts(page, wm))
+    page.statuses[0] = status("2", "second, edited")
+    edited = scrape_new_posts(page, wm)
+    assert [(p["id"], p["text"]) for p in edited] == [("2", "second, edited")]
+    assert wm.hits == 0
+    wm.update(edited)
+    assert scrape_new_posts(page, wm) == [] and wm.hits == 1
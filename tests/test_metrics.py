@@ -0,0 +1,73 @@
+# test_metrics.py - Trump Watcher
+# Scrape a local MetricsServer: exposition format, metric types, label escaping
+
+import re
+import urllib.error
+import urllib.request
+
+import pytest
+
+import monitor
+from metrics import CONTENT_TYPE, MetricsRegistry, MetricsServer
+
+NAME_RE = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+
+
+def scrape(registry, path="/metrics"):
+    server = MetricsServer(registry, port=0)
+    assert server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}{path}", timeout=5) as resp:
+            return resp.headers["Content-Type"], resp.read().decode("utf-8")
+    finally:
+        server.stop()
+
+
+def families(text):
+    # {name: type} from the # TYPE lines
+    return dict(line.split()[2:4] for line in text.splitlines() if line.startswith("# TYPE "))
+
+
+def test_scrape_renders_every_type_with_escaped_labels():
+    registry = MetricsRegistry("test_")
+    posts = registry.counter("posts_total", "Posts", ("label",))
+    posts.inc(label='say "hi"\\now\nnext')
+    registry.gauge("queue", "Queued", fn=lambda: 2.5)
+    lag = registry.histogram("lag_seconds", "Lag", buckets=(1, 5))
+    lag.observe(0.5)
+    lag.observe(3)
+
+    content_type, text = scrape(registry)
+    assert content_type == CONTENT_TYPE
+    assert families(text) == {"test_posts_total": "counter", "test_queue": "gauge",
+                              "test_lag_seconds": "histogram"}
+    lines = text.splitlines()
+    assert 'test_posts_total{label="say \\"hi\\"\\\\now\\nnext"} 1' in lines
+    assert "test_queue 2.5" in lines
+    assert lines[-5:] == ['test_lag_seconds_bucket{le="1"} 1', 'test_lag_seconds_bucket{le="5"} 2',
+                          'test_lag_seconds_bucket{le="+Inf"} 2', "test_lag_seconds_sum 3.5",
+                          "test_lag_seconds_count 2"]
+
+
+def test_unknown_paths_are_404():
+    with pytest.raises(urllib.error.HTTPError) as raised:
+        scrape(MetricsRegistry(), "/other")
+    assert raised.value.code == 404
+
+
+def test_monitor_metrics_are_well_formed():
+    monitor.posts_detected.inc(label="new")
+    monitor.poll_seconds.observe(0.3, job="feed")
+    _, text = scrape(monitor.metrics)
+    types = families(text)
+    assert all(NAME_RE.match(name) and name.startswith("trumpwatcher_") for name in types)
+    assert types["trumpwatcher_poll_duration_seconds"] == "histogram"
+    assert types["trumpwatcher_posts_detected_total"] == "counter"
+    assert types["trumpwatcher_seen_posts"] == "gauge"
+    # counters end in _total, and every sample belongs to a declared family
+    assert all(name.endswith("_total") for name, kind in types.items() if kind == "counter")
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            sample = re.split(r"[{ ]", line, 1)[0]
+            assert re.sub(r"_(bucket|sum|count)$", "", sample) in types or sample in types
+    assert 'trumpwatcher_poll_duration_seconds_count{job="feed"} 1' in text
@@ -0,0 +1,90 @@
+# test_monitor.py - Trump Watcher
+# Monitor start-up ordering: the browser launch never waits for the AUMID shortcut
+
+import time
+
+import pytest
+
+import monitor
+from notifier import NullBackend
+
+
+class BrowserStarted(Exception):
+    pass
+
+
+def test_browser_launch_does_not_wait_for_the_shortcut(monkeypatch):
+    monkeypatch.setattr(monitor, "notifier", None)
+    monkeypatch.setattr(monitor, "NOTIFY_BACKEND", "none")
+    monkeypatch.setattr(monitor, "SHORTCUT_WAIT", 5.0)
+    monkeypatch.setattr(monitor.sampler, "start", lambda: None)
+    monkeypatch.setattr(monitor, "start_sinks", lambda: None)
+    launched = []
+
+    def start_browser():
+        launched.append(time.monotonic())
+        raise BrowserStarted()
+
+    monkeypatch.setattr(monitor, "start_browser", start_browser)
+    monitor.shortcut_ready.clear()
+    try:
+        start = time.monotonic()
+        with pytest.raises(BrowserStarted):
+            monitor.monitor_loop()
+        assert launched[0] - start < 1.0
+
+        # toasts are held until the shortcut exists, then shown
+        monitor.notify("raw", "queued before the shortcut", "New Trump post")
+        time.sleep(0.2)
+        backend = monitor.notifier.backend
+        assert isinstance(backend, NullBackend) and backend.shown == []
+        monitor.shortcut_ready.set()
+        until = time.monotonic() + 3
+        while not backend.shown and time.monotonic() < until:
+            time.sleep(0.01)
+        assert backend.shown and backend.shown[0][1] == "queued before the shortcut"
+    finally:
+        monitor.shortcut_ready.set()
+        if monitor.notifier:
+            monitor.notifier.stop()
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    def new_context(self, **kwargs):
+        raise RuntimeError("context refused")
+
+    def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.browser = FakeBrowser()
+        self.stopped = False
+        self.chromium = self
+
+    def launch(self, **kwargs):
+        return self.browser
+
+    def start(self):
+        return self
+
+    def stop(self):
+        self.stopped = True
+
+
+def test_a_failed_browser_start_closes_the_browser_and_driver(monkeypatch):
+    fake = FakePlaywright()
+    monkeypatch.setattr(monitor, "sync_playwright", lambda: fake)
+    with pytest.raises(RuntimeError):
+        monitor.start_browser()
+    assert fake.browser.closed and fake.stopped
+
+    # a driver handed in (pre-warming a replacement) belongs to the caller
+    shared = FakePlaywright()
+    with pytest.raises(RuntimeError):
+        monitor.start_browser(shared)
+    assert shared.browser.closed and not shared.stopped
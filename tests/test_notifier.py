@@ -0,0 +1,67 @@
+# test_notifier.py - Trump Watcher
+# NotificationDispatcher: lone notices go out at once, bursts are merged, mixed sources stay neutral
+
+import time
+
+from notifier import Notice, NotificationDispatcher, NullBackend
+
+WINDOW = 0.3
+
+
+def dispatcher():
+    backend = NullBackend()
+    d = NotificationDispatcher(backend, coalesce_window=WINDOW, max_per_minute=100,
+                               summary_title="{count} new Trump posts")
+    d.start()
+    return d, backend
+
+
+def wait_for(backend, count, timeout=3.0):
+    until = time.monotonic() + timeout
+    while len(backend.shown) < count and time.monotonic() < until:
+        time.sleep(0.01)
+    return backend.shown
+
+
+def test_a_lone_notice_is_shown_without_waiting_for_the_window():
+    d, backend = dispatcher()
+    start = time.monotonic()
+    d.submit(Notice("New Trump post", "hello there", "https://a"))
+    assert wait_for(backend, 1) == [("New Trump post", "hello there", "https://a")]
+    assert time.monotonic() - start < WINDOW
+    d.stop()
+
+
+def test_a_burst_after_a_toast_is_merged_into_one_summary():
+    d, backend = dispatcher()
+    d.submit(Notice("New Trump post", "one", "https://a"))
+    wait_for(backend, 1)
+    d.submit(Notice("New Trump post", "two", "https://a"))
+    d.submit(Notice("New Trump post", "three", "https://a"))
+    shown = wait_for(backend, 2)
+    d.stop()
+    assert len(shown) == 2
+    assert shown[1] == ("2 new Trump posts", "• two\n• three", "https://a")
+
+
+def test_a_summary_across_accounts_has_a_neutral_title_and_no_link():
+    d, backend = dispatcher()
+    d.submit(Notice("New @a post", "first", "https://a"))
+    wait_for(backend, 1)
+    d.submit(Notice("New @a post", "second", "https://a"))
+    d.submit(Notice("New @b post", "third", "https://b"))
+    shown = wait_for(backend, 2)
+    d.stop()
+    assert shown[1] == ("2 new posts", "• second\n• third", None)
+
+
+def test_priority_notices_are_never_merged():
+    d, backend = dispatcher()
+    d.submit(Notice("New Trump post", "one", "https://a"))
+    wait_for(backend, 1)
+    d.submit(Notice("New Trump post", "two", "https://a"))
+    d.submit(Notice("Priority: New Trump post", "urgent", "https://a", priority=True))
+    shown = wait_for(backend, 3)
+    d.stop()
+    assert shown[1] == ("Priority: New Trump post", "urgent", "https://a")
+    assert shown[2] == ("New Trump post", "two", "https://a")
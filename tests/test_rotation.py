@@ -0,0 +1,37 @@
+# test_rotation.py - Trump Watcher
+# RotationManager triggers and teardown order
+
+from rotation import RotationManager
+
+
+def make(process_mb):
+    mem = {"process": process_mb}
+    manager = RotationManager(lambda: 0.0, lambda: mem["process"], max_process_mb=400,
+                              after_teardown=lambda: None)
+    return manager, mem
+
+
+def test_process_rss_does_not_retrigger_after_every_poll():
+    manager, mem = make(500)
+    assert manager.check().startswith("process-rss")
+    manager.rotate("process-rss", ("old", None), lambda: ("new", None), lambda context: None)
+    assert manager.check() is None                  # still above the cap, but no growth
+    mem["process"] = 560                            # > 10% past the post-rotation level
+    assert manager.check().startswith("process-rss")
+
+
+def test_error_rotation_tears_down_before_starting():
+    manager, _ = make(0)
+    order = []
+    new = manager.rotate("errors 3", ("old", None), lambda: order.append("start") or ("new", None),
+                         lambda context: order.append(f"close {context}"), prewarm=False)
+    assert new == ("new", None)
+    assert order == ["close old", "start"]
+
+
+def test_prewarm_rotation_starts_first():
+    manager, _ = make(0)
+    order = []
+    manager.rotate("page-age", ("old", None), lambda: order.append("start") or ("new", None),
+                   lambda context: order.append(f"close {context}"))
+    assert order == ["start", "close old"]
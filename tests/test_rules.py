@@ -0,0 +1,93 @@
+# test_rules.py - Trump Watcher
+# Rule engine: phrase / regex matching and rule-file errors
+
+import json
+
+import pytest
+
+import extraction
+import rules
+from rules import PRIORITY, SUPPRESS, TAG, Rule, RuleError, RuleSet, load_rules
+
+
+def names(hits):
+    return [h.rule.name for h in hits]
+
+
+@pytest.fixture(params=[True, False], ids=["scan", "trie"])
+def phrase_path(request, monkeypatch):
+    # Run phrase tests on both the substring-scan and the trie-regex path
+    monkeypatch.setattr(rules, "SCAN_MAX_PHRASES", 1000 if request.param else 0)
+
+
+def test_phrases_are_case_insensitive_and_start_at_a_word(phrase_path):
+    rs = RuleSet([Rule("trade", PRIORITY, ["tariff"])])
+    assert names(rs.match("Big TARIFF news")) == ["trade"]
+    assert rs.match("antitariff") == []
+
+
+def test_nested_and_overlapping_phrases(phrase_path):
+    rs = RuleSet([Rule("a", TAG, ["tariffs on china"]), Rule("b", TAG, ["tariffs"]), Rule("c", TAG, ["on china"])])
+    assert sorted(names(rs.match("Tariffs on China now"))) == ["a", "b", "c"]
+
+
+def test_whole_word(phrase_path):
+    rs = RuleSet([Rule("trade", TAG, ["tariff"], whole_word=True)])
+    assert rs.match("tariffs") == []
+    assert names(rs.match("a tariff.")) == ["trade"]
+
+
+def test_regex_is_case_insensitive():
+    rs = RuleSet([Rule("maga", TAG, regex=[r"\bMAGA\b"])])
+    assert names(rs.match("MAGA rally")) == ["maga"]
+    assert names(rs.match("maga rally")) == ["maga"]
+
+
+@pytest.mark.parametrize("patterns", [
+    [r"(?i)maga"],                          # inline global flags
+    [r"(a)\1"],                             # numbered backreference
+    [r"(?P<x>maga)", r"(?P<x>rally)"],      # the same group name in two patterns
+])
+def test_standalone_regex_features(patterns):
+    rs = RuleSet([Rule(f"r{i}", TAG, regex=[p]) for i, p in enumerate(patterns)]
+                 + [Rule("boilerplate", SUPPRESS, ["learn more"])])
+    assert rs.match("aa maga rally")
+
+
+def test_bad_regex_raises_rule_error():
+    with pytest.raises(RuleError):
+        RuleSet([Rule("bad", TAG, regex=["(unclosed"])])
+    with pytest.raises(RuleError):
+        RuleSet([Rule("empty", TAG, regex=["x*"])])
+
+
+def test_load_rules_turns_every_problem_into_rule_error(tmp_path):
+    path = tmp_path / "rules.json"
+    for body in ('{"rules": [{"name": "x", "regex": ["(?P<a>"]}]}', '{"rules": [{"name": "x", "action": "nope"}]}',
+                 "not json", '{"rules": {"name": "x"}}'):
+        path.write_text(body, encoding="utf-8")
+        with pytest.raises(RuleError):
+            load_rules(str(path))
+
+
+def test_load_rules_appends_to_base(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"rules": [{"name": "polls", "action": "tag", "regex": [r"\bpolls?\b"]}]}),
+                    encoding="utf-8")
+    rs = load_rules(str(path), base=[Rule("boilerplate", SUPPRESS, ["learn more"])])
+    verdict = rs.check("Learn more about the POLLS")
+    assert verdict.suppressed_by.rule.name == "boilerplate"
+    assert verdict.tags == ["polls"]
+
+
+def test_case_sensitive_rules_match_exact_case_only(phrase_path):
+    rs = RuleSet([Rule("banner", SUPPRESS, ["Learn more"], case_sensitive=True),
+                  Rule("loud", TAG, regex=["FAKE NEWS"], case_sensitive=True)])
+    assert names(rs.match("Learn more about cookies")) == ["banner"]
+    assert names(rs.match("fake news, we will learn more")) == []
+    assert names(rs.match("FAKE NEWS")) == ["loud"]
+
+
+def test_builtin_boilerplate_filter_keeps_exact_case():
+    assert extraction.find_boilerplate("Tomorrow we will learn more about the deal") is None
+    assert extraction.find_boilerplate("Truth Social uses cookies. Learn more") == "Truth Social uses cookies"
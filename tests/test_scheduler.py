@@ -0,0 +1,60 @@
+# test_scheduler.py - Trump Watcher
+# PollScheduler with a fake clock: deadlines, missed slots and lag stats
+
+import random
+
+from scheduler import PollJob, PollScheduler
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make(interval=60.0, deadline=None):
+    clock = FakeClock()
+    scheduler = PollScheduler(clock=clock, rng=random.Random(1))
+    job = scheduler.add(PollJob("poll", lambda: None, interval, jitter=0, deadline=deadline))
+    return clock, scheduler, job
+
+
+def test_on_time_run_records_its_lag():
+    clock, scheduler, job = make()
+    clock.now += 2.5
+    assert scheduler.pop_due() is job
+    assert list(job.lags) == [2.5]
+    assert job.missed == 0
+
+
+def test_late_run_is_skipped_to_the_next_slot():
+    clock, scheduler, job = make(interval=60.0)
+    planned = job.planned
+    clock.now += 90                       # past the 60 s deadline
+    assert scheduler.pop_due() is None    # not run late in the same call
+    assert job.missed == 2                # slots at +0 and +60 both went by
+    assert not job.lags
+    assert job.planned == planned + 120   # next slot after now
+    assert scheduler.next_delay() == 30
+
+
+def test_several_missed_slots_are_all_counted():
+    clock, scheduler, job = make(interval=10.0, deadline=2.0)
+    planned = job.planned
+    clock.now += 35
+    assert scheduler.pop_due() is None
+    assert job.missed == 4                # slots at +0, +10, +20, +30
+    assert job.planned == planned + 40
+    clock.now = job.planned + 1
+    assert scheduler.pop_due() is job
+    assert list(job.lags) == [1]
+
+
+def test_other_due_jobs_still_run_when_one_is_skipped():
+    clock, scheduler, late = make(interval=60.0)
+    other = scheduler.add(PollJob("other", lambda: None, 600.0, jitter=0), delay=80)
+    clock.now += 90
+    assert scheduler.pop_due() is other
+    assert late.missed == 2
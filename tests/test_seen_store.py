@@ -0,0 +1,68 @@
+# test_seen_store.py - Trump Watcher
+# SeenStore: LRU / age eviction, and last-seen refreshes surviving a reload
+
+import seen_store
+from seen_store import SeenStore
+
+DAY = 24 * 3600
+
+
+class FakeTime:
+    def __init__(self, now: float = 1_000_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def digest(n: int) -> str:
+    return f"{n:02x}" * 32
+
+
+def test_a_hit_keeps_a_digest_from_ageing_out(monkeypatch, tmp_path):
+    clock = FakeTime()
+    monkeypatch.setattr(seen_store.time, "time", clock)
+    path = str(tmp_path / "seen.bin")
+    store = SeenStore(path, max_age=10 * DAY)
+    store.add(digest(1))
+    store.add(digest(2))
+    clock.now += 8 * DAY
+    assert digest(1) in store            # refreshed, and now the most recent
+    clock.now += 8 * DAY
+    store.add(digest(3))                 # evicts what was not seen for 10 days
+    assert digest(2) not in store
+    assert digest(1) in store
+    store.close()
+
+    # the refresh was logged, so a restart keeps it
+    clock.now += 5 * DAY
+    reloaded = SeenStore(path, max_age=10 * DAY)
+    assert digest(1) in reloaded
+    assert len(reloaded) == 2
+    reloaded.close()
+
+
+def test_repeated_hits_are_logged_at_most_once_per_interval(monkeypatch, tmp_path):
+    clock = FakeTime()
+    monkeypatch.setattr(seen_store.time, "time", clock)
+    path = tmp_path / "seen.bin"
+    store = SeenStore(str(path))
+    store.add(digest(1))
+    for _ in range(100):
+        clock.now += 10
+        assert digest(1) in store
+    assert path.stat().st_size == seen_store.RECORD.size
+    clock.now += seen_store.TOUCH_INTERVAL
+    assert digest(1) in store
+    assert path.stat().st_size == 2 * seen_store.RECORD.size
+    store.close()
+
+
+def test_lru_cap_drops_the_least_recently_seen():
+    store = SeenStore(max_entries=2)
+    store.add(digest(1))
+    store.add(digest(2))
+    assert digest(1) in store
+    store.add(digest(3))
+    assert digest(2) not in store
+    assert digest(1) in store and digest(3) in store
@@ -0,0 +1,62 @@
+# test_simhash_index.py - Trump Watcher
+# SimHash signatures and the index: edits, near-duplicates, persistence across restarts
+
+import hashlib
+
+from simhash_index import SIG_BITS, SimHashIndex, simhash, _WORD_RE
+
+POST = ("the failing new york times is reporting that our great tariffs are hurting farmers "
+        "which is totally false farmers are doing better than ever before thanks to trade")
+EDIT = POST.replace("totally false", "completely false")
+
+
+def reference_simhash(text: str) -> int:
+    # The textbook per-bit +1 / -1 weight loop
+    weights = [0] * SIG_BITS
+    for word in _WORD_RE.findall(text.lower()):
+        h = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(SIG_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+def test_packed_simhash_matches_the_reference():
+    for text in (POST, EDIT, "", "one", "a a b", "Ünïcode wörds 中文 mixed IN", POST * 50):
+        assert simhash(text) == reference_simhash(text)
+
+
+def test_edit_and_duplicate_detection():
+    index = SimHashIndex()
+    index.add("h1", POST, "101")
+    assert index.classify(POST, "101")[0] == "duplicate"
+    kind, entry = index.classify(EDIT, "101")
+    assert kind == "updated" and entry.key == "h1"
+    assert index.classify("something else entirely about the border wall", "102")[0] == "new"
+
+
+def test_index_survives_a_restart(tmp_path):
+    path = str(tmp_path / "simhash.jsonl")
+    index = SimHashIndex(path)
+    index.add("h1", POST, "101")
+    index.close()
+
+    restarted = SimHashIndex(path)
+    kind, entry = restarted.classify(EDIT, "101")
+    assert kind == "updated" and entry.text == POST
+    restarted.close()
+
+
+def test_log_is_compacted_and_a_torn_line_ignored(tmp_path):
+    path = tmp_path / "simhash.jsonl"
+    index = SimHashIndex(str(path), max_entries=3)
+    for i in range(20):
+        index.add(f"h{i}", f"post number {i} with some words", str(i))
+    index.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "half')
+
+    restarted = SimHashIndex(str(path), max_entries=3)
+    assert len(restarted) == 3
+    assert restarted.classify("post number 19 with some words", "19")[0] == "duplicate"
+    restarted.close()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
@@ -0,0 +1,125 @@
+# test_sinks.py - Trump Watcher
+# Webhook delivery against a local HTTP server: batching, retry on 5xx, dead letters
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from sinks import DeadLetterFile, SinkWorker, WebhookSink
+
+
+class Hook(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.received.append(body)
+            status = server.statuses.pop(0) if server.statuses else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hook():
+    # A webhook endpoint answering with the queued statuses (then 200)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Hook)
+    server.received, server.statuses, server.lock = [], [], threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/hook"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def worker(url, **options):
+    options = dict({"batch_wait": 0.3, "backoff_base": 0.01}, **options)
+    w = SinkWorker(WebhookSink(url), **options)
+    w.start()
+    return w
+
+
+def wait_until(predicate, timeout=5.0):
+    until = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < until:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_posts_are_delivered_in_batches(hook):
+    w = worker(hook.url, batch_size=3)
+    for n in range(5):
+        w.put({"id": str(n)})
+    assert wait_until(lambda: w.stats["delivered"] == 5)
+    w.stop()
+    assert [[p["id"] for p in body["posts"]] for body in hook.received] == [["0", "1", "2"], ["3", "4"]]
+    assert w.stats["batches"] == 2 and w.stats["retries"] == 0
+
+
+def test_5xx_is_retried_with_backoff_until_delivered(hook):
+    hook.statuses[:] = [503, 502]
+    w = worker(hook.url)
+    w.put({"id": "1"})
+    assert wait_until(lambda: w.stats["delivered"] == 1)
+    w.stop()
+    assert len(hook.received) == 3 and all(body == hook.received[0] for body in hook.received)
+    assert w.stats["retries"] == 2 and w.stats["failures"] == 2 and w.last_error == "HTTP 502"
+
+
+def test_batch_goes_to_the_dead_letter_file_after_max_retries(hook, tmp_path):
+    hook.statuses[:] = [500] * 10
+    path = tmp_path / "dead_letter.jsonl"
+    w = worker(hook.url, max_retries=2)
+    w.dead_letter = DeadLetterFile(str(path))
+    w.put({"id": "1"})
+    assert wait_until(lambda: w.stats["dead_lettered"] == 1)
+    w.stop()
+    assert len(hook.received) == 3
+    record = json.loads(path.read_text(encoding="utf-8"))
+    assert record["sink"] == "webhook:127.0.0.1" and record["error"] == "HTTP 500"
+    assert record["posts"] == [{"id": "1"}]
+
+
+def test_4xx_is_dead_lettered_without_retrying(hook, tmp_path):
+    hook.statuses[:] = [400]
+    w = worker(hook.url)
+    w.dead_letter = DeadLetterFile(str(tmp_path / "dead_letter.jsonl"))
+    w.put({"id": "1"})
+    assert wait_until(lambda: w.stats["dead_lettered"] == 1)
+    w.stop()
+    assert len(hook.received) == 1 and w.stats["retries"] == 0
+
+
+class StuckSink:
+    name = "stuck"
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.closed = False
+
+    def deliver(self, batch):
+        self.release.wait(5)
+
+    def close(self):
+        self.closed = True
+
+
+def test_stop_leaves_a_sink_open_while_its_worker_is_still_delivering():
+    sink = StuckSink()
+    w = SinkWorker(sink, batch_wait=0)
+    w.start()
+    w.put({"id": "1"})
+    assert wait_until(lambda: w._queue.empty())
+    w.stop(timeout=0.1)
+    assert not sink.closed
+    sink.release.set()
+    w._thread.join(2)
@@ -0,0 +1,75 @@
+# test_truth_api.py - Trump Watcher
+# TruthApiClient against a scripted pool: blocked vs retryable errors, conditional requests
+
+import json
+
+import pytest
+
+from http_pool import HttpResponse
+from truth_api import ApiBlockedError, ApiError, TruthApiClient
+
+
+class FakePool:
+    # Replays queued responses and records the headers of every request
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = []
+        self.stats = {"connections_opened": 0, "bytes_in": 0}
+
+    def request(self, method, path, headers=None):
+        self.sent.append((path, dict(headers or {})))
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+def response(status=200, data=None, **headers):
+    headers = {k.replace("_", "-"): v for k, v in headers.items()}
+    headers.setdefault("content-type", "application/json")
+    return HttpResponse(status, headers, json.dumps(data).encode() if data is not None else b"", 1.0)
+
+
+def client(*responses):
+    api = TruthApiClient(pool=FakePool(responses))
+    api.account_id = "1"
+    return api
+
+
+def test_503_is_retryable_not_blocked():
+    api = client(response(503))
+    with pytest.raises(ApiError) as raised:
+        api.poll()
+    assert not isinstance(raised.value, ApiBlockedError)
+
+
+def test_refusals_are_blocked():
+    for status in (403, 429):
+        with pytest.raises(ApiBlockedError):
+            client(response(status)).poll()
+
+
+def test_without_server_validators_no_conditional_headers_are_sent():
+    api = client(response(data=[]), response(data=[]))
+    api.poll()
+    api.poll()
+    assert api.pool.sent[1][1] == {}
+
+
+def test_server_validators_are_echoed_back():
+    api = client(response(data=[], etag='"v1"', last_modified="Sat, 17 Oct 2026 10:00:00 GMT"),
+                 response(304))
+    api.poll()
+    assert api.poll() == []
+    assert api.pool.sent[1][1] == {"If-None-Match": '"v1"',
+                                   "If-Modified-Since": "Sat, 17 Oct 2026 10:00:00 GMT"}
+    assert api.stats["not_modified"] == 1
+
+
+def test_crawl_pages_do_not_replace_the_poll_validators():
+    api = client(response(data=[], etag='"poll"'), response(data=[], etag='"page"'), response(304))
+    api.poll()
+    api.fetch_statuses(max_id="50")
+    assert api.poll() == []
+    assert api.pool.sent[1][1] == {}
+    assert api.pool.sent[2][1] == {"If-None-Match": '"poll"'}
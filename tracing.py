@@ -0,0 +1,96 @@
+# tracing.py - Trump Watcher
+# Span recorder with a ring buffer and Chrome trace-event JSON export (chrome://tracing, Perfetto)
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+from watcher_log import get_logger
+
+log = get_logger(__name__)
+
+# ----------------------------
+# Constants
+# ----------------------------
+DEFAULT_CAPACITY = 20000          # spans kept; the oldest are dropped first
+_NULL_SPAN = nullcontext()        # returned by span() while tracing is off
+
+
+class Tracer:
+    """
+    Records named spans as Chrome trace "complete" events into a bounded
+    ring buffer. While disabled, span() returns a shared no-op context
+    manager and complete() returns at once, so instrumented code pays one
+    attribute check per span.
+
+    Spans nest by time on each thread, which is how Perfetto draws them.
+    """
+
+    def __init__(self, enabled: bool = False, capacity: int = DEFAULT_CAPACITY):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)   # (name, cat, start_s, dur_s, tid, args)
+        self.recorded = 0
+        self._origin = time.perf_counter()
+        self._threads = {}                     # tid -> thread name
+
+    def span(self, name: str, cat: str = "monitor", **args):
+        # with tracer.span("reload"): ...
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, cat, args)
+
+    @contextmanager
+    def _span(self, name: str, cat: str, args: dict):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, start, time.perf_counter() - start, cat, args)
+
+    def complete(self, name: str, start: float, duration: float, cat: str = "monitor", args: dict = None) -> None:
+        # Record an already-timed span; start is a time.perf_counter() value
+        if not self.enabled:
+            return
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        self.events.append((name, cat, start, duration, tid, args or None))
+        self.recorded += 1
+
+    def instant(self, name: str, cat: str = "monitor", **args) -> None:
+        # A zero-length marker (e.g. "rotation", "post detected")
+        self.complete(name, time.perf_counter(), 0.0, cat, args)
+
+    def clear(self) -> None:
+        self.events.clear()
+
+    def to_chrome(self) -> dict:
+        # {"traceEvents": [...]} with microsecond timestamps relative to tracer creation
+        pid = os.getpid()
+        trace = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "TrumpWatcher"}}]
+        for tid, thread_name in list(self._threads.items()):
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+        for name, cat, start, duration, tid, args in list(self.events):
+            event = {
+                "name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                "ts": round((start - self._origin) * 1e6, 1), "dur": round(duration * 1e6, 1),
+            }
+            if args:
+                event["args"] = {k: v if isinstance(v, (int, float, bool)) else str(v) for k, v in args.items()}
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str) -> str:
+        # Write the buffer as Chrome trace JSON; returns the path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome(), f)
+        log.info("Trace with %s spans written to %s", len(self.events), path)
+        return path
+
+    def summary(self) -> str:
+        return (f"trace: {self.recorded} spans recorded, {len(self.events)} buffered"
+                + ("" if self.enabled else " (off)"))
@@ -0,0 +1,199 @@
+# truth_api.py - Trump Watcher
+# Browserless polling backend for Truth Social's Mastodon-style statuses API
+
+import json
+import time
+from html import unescape
+from html.parser import HTMLParser
+
+from http_pool import HttpPool
+
+# ----------------------------
+# Constants
+# ----------------------------
+API_BASE_URL = "https://truthsocial.com"
+DEFAULT_ACCOUNT = "realDonaldTrump"
+PAGE_LIMIT = 20
+
+# Status codes that mean "you are being refused", not "try again later"
+# (503 and other 5xx are outages: plain ApiError, retried with backoff)
+BLOCKED_STATUSES = (401, 403, 406, 429, 451)
+
+
+class ApiError(Exception):
+    # Unexpected response from the statuses API
+    pass
+
+
+class ApiBlockedError(ApiError):
+    # The API refused us (auth wall, rate limit, bot challenge) - use the browser
+    pass
+
+
+# ----------------------------
+# Status -> post conversion
+# ----------------------------
+class _TextExtractor(HTMLParser):
+    # Flatten Mastodon status HTML: <p> and <br> become line breaks
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "br":
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("p", "blockquote", "h1", "h2", "h3"):
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    if not html:
+        return ""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    lines = [line.strip() for line in unescape("".join(parser.parts)).splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def status_to_post(status: dict) -> dict:
+    """
+    Convert a Mastodon status object into the same post dict that
+    extraction.scrape_feed() produces: id, author, text, media, pinned, timestamp.
+    """
+    source = status.get("reblog") or status
+    account = status.get("account") or {}
+    media = []
+    for item in source.get("media_attachments") or []:
+        kind = "video" if item.get("type") in ("video", "gifv") else "image"
+        url = (item.get("url") or item.get("remote_url") or "").split("?")[0]
+        if url:
+            media.append({"type": kind, "url": url})
+    return {
+        "id": str(status.get("id", "")),
+        "author": account.get("display_name") or account.get("acct") or "",
+        "text": html_to_text(source.get("content") or ""),
+        "media": media,
+        "pinned": bool(status.get("pinned")),
+        "timestamp": status.get("created_at") or "",
+    }
+
+
+# ----------------------------
+# API client
+# ----------------------------
+class TruthApiClient:
+    """
+    Polls /api/v1/accounts/:id/statuses over a keep-alive connection pool.
+    Each poll sends since_id plus whichever validators the server gave us
+    (If-None-Match for an ETag, If-Modified-Since for a Last-Modified), so
+    an unchanged timeline costs a single 304 with no body.
+    """
+
+    def __init__(self, account: str = DEFAULT_ACCOUNT, base_url: str = API_BASE_URL,
+                 user_agent: str = None, pool: HttpPool = None):
+        self.account = account.lstrip("@")
+        self.base_url = base_url.rstrip("/")
+        headers = {"Accept": "application/json"}
+        if user_agent:
+            headers["User-Agent"] = user_agent
+        self.pool = pool or HttpPool(self.base_url, default_headers=headers)
+        self.account_id = None
+        self.since_id = None
+        self.etag = None
+        self.last_modified = None
+        self.stats = {"polls": 0, "not_modified": 0, "new_posts": 0, "last_ms": 0.0, "total_ms": 0.0}
+
+    def _get_json(self, path: str, headers: dict = None):
+        resp = self.pool.request("GET", path, headers=headers)
+        if resp.status in BLOCKED_STATUSES:
+            raise ApiBlockedError(f"HTTP {resp.status} for {path}")
+        if resp.status == 304:
+            return resp, None
+        if resp.status != 200:
+            raise ApiError(f"HTTP {resp.status} for {path}")
+        if "json" not in resp.header("content-type", ""):
+            # bot challenges come back as 200 text/html
+            raise ApiBlockedError(f"Non-JSON response for {path} ({resp.header('content-type')})")
+        try:
+            return resp, json.loads(resp.body)
+        except ValueError as e:
+            raise ApiError(f"Bad JSON for {path}: {e}")
+
+    def lookup_account_id(self) -> str:
+        if self.account_id is None:
+            _, data = self._get_json(f"/api/v1/accounts/lookup?acct={self.account}")
+            if not isinstance(data, dict) or "id" not in data:
+                raise ApiError(f"Account lookup failed for {self.account!r}")
+            self.account_id = str(data["id"])
+        return self.account_id
+
+    def fetch_statuses(self, since_id: str = None, max_id: str = None,
+                       limit: int = PAGE_LIMIT, conditional: bool = False):
+        # Return the raw status list (newest first), or None on 304 Not Modified
+        query = f"?exclude_replies=true&limit={limit}"
+        if since_id:
+            query += f"&since_id={since_id}"
+        if max_id:
+            query += f"&max_id={max_id}"
+        headers = {}
+        if conditional:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+        path = f"/api/v1/accounts/{self.lookup_account_id()}/statuses{query}"
+        resp, data = self._get_json(path, headers)
+        if resp.status == 304:
+            return None
+        if conditional:
+            # validators belong to the poll URL, not crawl / backfill pages; only
+            # echo ones the server sent, as a date from our clock could skip a post
+            self.etag = resp.header("etag")
+            self.last_modified = resp.header("last-modified")
+        if not isinstance(data, list):
+            raise ApiError(f"Unexpected statuses payload: {type(data).__name__}")
+        return data
+
+    def poll(self) -> list:
+        """
+        Return posts newer than the last poll (newest first, like the feed).
+        The first call returns the current page of the timeline.
+        """
+        start = time.perf_counter()
+        statuses = self.fetch_statuses(since_id=self.since_id, conditional=True)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.stats["polls"] += 1
+        self.stats["last_ms"] = elapsed_ms
+        self.stats["total_ms"] += elapsed_ms
+
+        if statuses is None:
+            self.stats["not_modified"] += 1
+            return []
+
+        posts = [status_to_post(s) for s in statuses]
+        ids = [int(p["id"]) for p in posts if p["id"].isdigit() and not p["pinned"]]
+        if ids:
+            newest = str(max(ids))
+            if newest != self.since_id:
+                # new since_id means a new URL; old validators no longer apply
+                self.since_id = newest
+                self.etag = None
+                self.last_modified = None
+        self.stats["new_posts"] += len(posts)
+        return posts
+
+    def summary(self) -> str:
+        polls = self.stats["polls"]
+        mean = self.stats["total_ms"] / polls if polls else 0.0
+        return (f"api: {polls} polls, {self.stats['not_modified']} not modified, "
+                f"mean {mean:.1f} ms, {self.pool.stats['connections_opened']} connections opened, "
+                f"{self.pool.stats['bytes_in']} bytes in")
+
+    def close(self) -> None:
+        self.pool.close()
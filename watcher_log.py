@@ -0,0 +1,132 @@
+# watcher_log.py - Trump Watcher
+# Leveled logging with a background writer thread, JSON lines and a rotating posts log
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime
+
+# ----------------------------
+# Constants
+# ----------------------------
+ROOT_LOGGER = "trumpwatcher"
+POSTS_LOGGER = ROOT_LOGGER + ".posts"     # full text of every notified post (--debug)
+POSTS_LOG_MAX_BYTES = 2 * 1024 * 1024
+POSTS_LOG_BACKUPS = 3
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+FILE_BUFFER_RECORDS = 32                  # records buffered before a file write (WARNING+ flushes at once)
+IDLE_FLUSH_SECONDS = 1.0                  # buffered records are written once logging goes quiet this long
+TEXT_FORMAT = "[%(asctime)s] [%(levelname)s] %(message)s"
+
+_listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    # Logger under the app's root: get_logger(__name__)
+    name = "main" if name == "__main__" else name
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class JsonFormatter(logging.Formatter):
+    # One JSON object per line: ts, level, logger, msg (+ exc)
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name[len(ROOT_LOGGER) + 1:] or record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _PostsOnly(logging.Filter):
+    def __init__(self, include: bool):
+        super().__init__()
+        self.include = include
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.name.startswith(POSTS_LOGGER) == self.include
+
+
+class _FlushingListener(logging.handlers.QueueListener):
+    # Flushes the buffered handlers whenever the queue has been idle for a moment
+    def dequeue(self, block: bool):
+        while True:
+            try:
+                return self.queue.get(block=block, timeout=IDLE_FLUSH_SECONDS)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
+
+def _buffered(handler: logging.Handler) -> logging.Handler:
+    # Batch file writes; anything at WARNING or above is written immediately
+    return logging.handlers.MemoryHandler(FILE_BUFFER_RECORDS, flushLevel=logging.WARNING, target=handler)
+
+
+def setup_logging(level: int = logging.INFO, json_lines: bool = False, log_file: str = None,
+                  posts_log: str = None, console=sys.stdout) -> None:
+    """
+    Route every app logger through one queue to a background listener
+    thread, so logging calls on the monitor thread only enqueue a record
+    (and debug calls below `level` are dropped before formatting).
+
+    Handlers: console (or none), an optional size-rotated log file, and an
+    optional size-rotated posts log that only receives POSTS_LOGGER records.
+    """
+    global _listener
+    shutdown_logging()
+
+    formatter = JsonFormatter() if json_lines else logging.Formatter(TEXT_FORMAT, "%Y-%m-%d %H:%M:%S")
+    handlers = []
+    if console is not None:
+        stream = logging.StreamHandler(console)
+        stream.setFormatter(formatter)
+        stream.addFilter(_PostsOnly(False))
+        handlers.append(stream)
+    if log_file:
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        rotating = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8")
+        rotating.setFormatter(formatter)
+        file_handler = _buffered(rotating)
+        file_handler.addFilter(_PostsOnly(False))
+        handlers.append(file_handler)
+    if posts_log:
+        os.makedirs(os.path.dirname(os.path.abspath(posts_log)), exist_ok=True)
+        rotating = logging.handlers.RotatingFileHandler(
+            posts_log, maxBytes=POSTS_LOG_MAX_BYTES, backupCount=POSTS_LOG_BACKUPS, encoding="utf-8")
+        rotating.setFormatter(JsonFormatter() if json_lines else logging.Formatter("%(message)s"))
+        posts_handler = _buffered(rotating)
+        posts_handler.addFilter(_PostsOnly(True))
+        handlers.append(posts_handler)
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers[:] = [logging.handlers.QueueHandler(records)]
+    root.setLevel(level)
+    root.propagate = False
+    # the posts log is opt-in: without a file, post records are dropped at the call site
+    logging.getLogger(POSTS_LOGGER).setLevel(logging.INFO if posts_log else logging.CRITICAL + 1)
+    _listener = _FlushingListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    # Drain the queue and flush/close every handler (call on exit)
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        target = getattr(handler, "target", None)
+        handler.close()            # a MemoryHandler flushes into its target here
+        if target is not None:
+            target.close()
+    _listener = None